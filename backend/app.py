@@ -1,126 +1,150 @@
 # backend/app.py
-from flask import Flask, Blueprint, jsonify
+import importlib
+from flask import Flask, jsonify, g, request
 from flask_cors import CORS
 
-# Import all Blueprints
-from controllers.auth import auth_bp
-
-from controllers.buyer_listing.save_listing import save_listing_bp
-from controllers.buyer_listing.search_shortlist import search_shortlist_bp
-from controllers.buyer_listing.view_shortlist import view_shortlist_bp
-
-from controllers.loan_calculator.loan_calculator import loan_calculator_bp 
-
-from controllers.profile.create_profile import create_profile_bp
-from controllers.profile.view_profiles import view_profiles_bp
-from controllers.profile.update_profile import update_profile_bp
-from controllers.profile.suspend_profile import suspend_profile_bp
-from controllers.profile.reenable_profile import reenable_profile_bp
-from controllers.profile.search_profiles import search_profiles_bp
-
-from controllers.review.rate_review_agent import rate_review_agent_bp 
-from controllers.review.view_reviews import view_reviews_bp 
-from controllers.review.edit_review_agent import edit_review_agent_bp
-
-from controllers.used_car_listing.view_listing import view_listings_bp 
-from controllers.used_car_listing.create_listing import create_listing_bp 
-from controllers.used_car_listing.update_listing import update_listing_bp
-from controllers.used_car_listing.delete_listing import delete_listing_bp
-from controllers.used_car_listing.search_listings import search_listings_bp
-from controllers.used_car_listing.search_cars import search_cars_bp 
-from controllers.used_car_listing.track_view import track_view_bp
-from controllers.used_car_listing.track_shortlist import track_shortlist_bp
-from controllers.used_car_listing.get_reviews import user_reviews_bp
-from controllers.used_car_listing.get_metrics import get_metrics_bp
-
-from controllers.user.get_user_from_id import get_user_from_id_bp
-from controllers.user.get_id_from_username import get_id_from_username_bp
-from controllers.user.create_user import create_user_bp
-from controllers.user.view_users import view_users_bp
-from controllers.user.update_user import update_user_bp
-from controllers.user.suspend_user import suspend_user_bp
-from controllers.user.reenable_user import reenable_user_bp
-from controllers.user.search_users import search_users_bp
-
-
-from controllers.buyer_listing.remove_shortlist import remove_shortlist_bp
-
-
-
-
-from utils.listings import listings_bp
-
 from utils.db import init_db
+from utils.json_provider import FastJSONProvider
+from utils.logging_config import configure_logging
+from utils import metrics
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-app = Flask(__name__) 
-# Initialize CORS
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}) 
-
-# Initialize Database
-init_db()
-
-# Register all Blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(get_user_from_id_bp)
-app.register_blueprint(get_id_from_username_bp)
-app.register_blueprint(create_user_bp)
-app.register_blueprint(view_users_bp)
-app.register_blueprint(update_user_bp)
-app.register_blueprint(suspend_user_bp)
-app.register_blueprint(reenable_user_bp)
-app.register_blueprint(search_users_bp)
-app.register_blueprint(create_profile_bp)
-app.register_blueprint(view_profiles_bp)
-app.register_blueprint(update_profile_bp)
-app.register_blueprint(suspend_profile_bp)
-app.register_blueprint(reenable_profile_bp)
-app.register_blueprint(search_profiles_bp)
-app.register_blueprint(create_listing_bp)
-app.register_blueprint(listings_bp)
-app.register_blueprint(update_listing_bp)
-app.register_blueprint(delete_listing_bp)
-app.register_blueprint(search_listings_bp)
-app.register_blueprint(search_cars_bp) 
-app.register_blueprint(save_listing_bp)
-app.register_blueprint(search_shortlist_bp)
-app.register_blueprint(view_shortlist_bp)
-app.register_blueprint(track_view_bp)
-app.register_blueprint(track_shortlist_bp)
-app.register_blueprint(get_metrics_bp)
-app.register_blueprint(rate_review_agent_bp)   
-app.register_blueprint(view_reviews_bp)  
-app.register_blueprint(loan_calculator_bp)
-app.register_blueprint(view_listings_bp)
-app.register_blueprint(user_reviews_bp)
-app.register_blueprint(edit_review_agent_bp)
-
-app.register_blueprint(remove_shortlist_bp)
-
-
-# Define centralized error handlers
-@app.errorhandler(400)
-def bad_request(error):
-    return jsonify({"error": "Bad Request"}), 400
-
-@app.errorhandler(401)
-def unauthorized(error):
-    return jsonify({"error": "Unauthorized"}), 401
-
-@app.errorhandler(403)
-def forbidden(error):
-    return jsonify({"error": "Forbidden"}), 403
-
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({"error": "Not Found"}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({"error": "Internal Server Error"}), 500
+# Frontend origin allowed to call the API
+CORS_ORIGIN = "http://localhost:3000"
+
+# Blueprints registered by create_app, in order, as (module, blueprint attribute).
+# Controller modules are imported only when the application is built.
+BLUEPRINTS = (
+    ('controllers.auth', 'auth_bp'),
+    ('controllers.user.get_user_from_id', 'get_user_from_id_bp'),
+    ('controllers.user.get_id_from_username', 'get_id_from_username_bp'),
+    ('controllers.user.create_user', 'create_user_bp'),
+    ('controllers.user.view_users', 'view_users_bp'),
+    ('controllers.user.update_user', 'update_user_bp'),
+    ('controllers.user.suspend_user', 'suspend_user_bp'),
+    ('controllers.user.reenable_user', 'reenable_user_bp'),
+    ('controllers.user.search_users', 'search_users_bp'),
+    ('controllers.profile.create_profile', 'create_profile_bp'),
+    ('controllers.profile.view_profiles', 'view_profiles_bp'),
+    ('controllers.profile.update_profile', 'update_profile_bp'),
+    ('controllers.profile.suspend_profile', 'suspend_profile_bp'),
+    ('controllers.profile.reenable_profile', 'reenable_profile_bp'),
+    ('controllers.profile.search_profiles', 'search_profiles_bp'),
+    ('controllers.used_car_listing.create_listing', 'create_listing_bp'),
+    ('controllers.used_car_listing.bulk_import_listings', 'bulk_import_listings_bp'),
+    ('utils.listings', 'listings_bp'),
+    ('controllers.used_car_listing.update_listing', 'update_listing_bp'),
+    ('controllers.used_car_listing.delete_listing', 'delete_listing_bp'),
+    ('controllers.used_car_listing.search_listings', 'search_listings_bp'),
+    ('controllers.used_car_listing.search_cars', 'search_cars_bp'),
+    ('controllers.buyer_listing.save_listing', 'save_listing_bp'),
+    ('controllers.buyer_listing.search_shortlist', 'search_shortlist_bp'),
+    ('controllers.buyer_listing.view_shortlist', 'view_shortlist_bp'),
+    ('controllers.used_car_listing.track_view', 'track_view_bp'),
+    ('controllers.used_car_listing.track_shortlist', 'track_shortlist_bp'),
+    ('controllers.used_car_listing.get_metrics', 'get_metrics_bp'),
+    ('controllers.used_car_listing.export_listings', 'export_listings_bp'),
+    ('controllers.review.rate_review_agent', 'rate_review_agent_bp'),
+    ('controllers.review.view_reviews', 'view_reviews_bp'),
+    ('controllers.review.top_agents', 'top_agents_bp'),
+    ('controllers.loan_calculator.loan_calculator', 'loan_calculator_bp'),
+    ('controllers.used_car_listing.view_listing', 'view_listings_bp'),
+    ('controllers.used_car_listing.get_reviews', 'user_reviews_bp'),
+    ('controllers.review.edit_review_agent', 'edit_review_agent_bp'),
+    ('controllers.buyer_listing.remove_shortlist', 'remove_shortlist_bp'),
+    ('controllers.monitoring.cache_stats', 'cache_stats_bp'),
+    ('controllers.monitoring.metrics', 'metrics_bp'),
+)
+
+
+def create_app(init_database=None, cors=True):
+    """
+    Builds the Flask application: logging, CORS, database initialization, request
+    metrics, blueprints and error handlers. Database initialization (indexes and migrations) runs unless
+    `init_database` is False or INIT_DB_ON_START=false; the gunicorn config runs
+    it once in the master and turns it off for the workers. `cors=False` leaves
+    CORS headers to a server the app is mounted in (see asgi.py).
+    """
+    configure_logging()
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    # Initialize CORS
+    if cors:
+        CORS(app, resources={r"/api/*": {"origins": CORS_ORIGIN}})
+
+    # Initialize Database
+    if init_database is None:
+        init_database = os.getenv('INIT_DB_ON_START', 'true').lower() == 'true'
+    if init_database:
+        init_db()
+
+    if metrics.METRICS_ENABLED:
+        register_request_metrics(app)
+
+    # Register all Blueprints
+    register_blueprints(app, BLUEPRINTS)
+
+    register_error_handlers(app)
+    return app
+
+
+def register_blueprints(app, table):
+    """
+    Imports each controller module named in `table` and registers its blueprint.
+    """
+    for module_name, blueprint_name in table:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, blueprint_name))
+
+
+def register_request_metrics(app):
+    """
+    Records latency, response size and MongoDB command counts of every request,
+    labelled by route template, for the /metrics endpoint. Streamed responses
+    are timed up to the start of the stream and have no size recorded.
+    """
+    @app.before_request
+    def start_request_metrics():
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.request_metrics = metrics.start_request(route)
+
+    @app.after_request
+    def finish_request_metrics(response):
+        stats = g.pop('request_metrics', None)
+        if stats is not None:
+            metrics.finish_request(stats, request.method, response.status_code,
+                                   None if response.is_streamed else response.content_length)
+        return response
+
+
+def register_error_handlers(app):
+    """
+    Defines centralized error handlers.
+    """
+    @app.errorhandler(400)
+    def bad_request(error):
+        return jsonify({"error": "Bad Request"}), 400
+
+    @app.errorhandler(401)
+    def unauthorized(error):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    @app.errorhandler(403)
+    def forbidden(error):
+        return jsonify({"error": "Forbidden"}), 403
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"error": "Not Found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({"error": "Internal Server Error"}), 500
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server only; production runs wsgi:app under gunicorn (see gunicorn.conf.py)
+    create_app().run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true')
@@ -0,0 +1,65 @@
+# backend/asgi.py
+"""
+ASGI entry point, e.g. `gunicorn asgi:app -k asgi` from the backend directory.
+
+The routes in ASYNC_ROUTES are served natively on the event loop through the
+async model layer (models/aio) and pymongo's AsyncMongoClient. Every other
+request falls through to the Flask app, mounted as a WSGI application and run
+in a thread pool, so the whole API stays available while routes are ported.
+"""
+import contextlib
+import importlib
+import os
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+
+from app import CORS_ORIGIN, create_app
+from utils.async_db import close_async_clients
+
+# Controller modules whose `routes` are served by the async stack, in order
+ASYNC_ROUTES = (
+    'controllers.aio.listings',
+    'controllers.aio.shortlist',
+    'controllers.aio.reviews',
+    'controllers.aio.profiles',
+    'controllers.aio.users',
+)
+
+
+def collect_routes(table):
+    """
+    Imports each controller module named in `table` and returns their routes.
+    """
+    routes = []
+    for module_name in table:
+        routes.extend(importlib.import_module(module_name).routes)
+    return routes
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_async_clients()
+
+
+def create_asgi_app(flask_app=None):
+    """
+    Builds the ASGI application: the async routes first, then the Flask app
+    (built with create_app unless given) for everything else. CORS is handled
+    here for both, so the mounted Flask app is built without it.
+    WSGI_FALLBACK_THREADS bounds the threads serving the Flask fallback.
+    """
+    flask_app = flask_app or create_app(cors=False)
+    fallback = WSGIMiddleware(flask_app, workers=int(os.getenv('WSGI_FALLBACK_THREADS', '10')))
+    return Starlette(
+        routes=collect_routes(ASYNC_ROUTES) + [Mount('/', app=fallback)],
+        middleware=[Middleware(CORSMiddleware, allow_origins=[CORS_ORIGIN], allow_methods=['*'],
+                               allow_headers=['*'])],
+        lifespan=lifespan
+    )
+
+
+app = create_asgi_app()
@@ -0,0 +1,60 @@
+# backend/controllers/aio/listings.py
+
+from models.aio.used_car_listing import AsyncUsedCarListing
+from utils.asgi import api_route, json_body, json_response, not_modified
+
+class AsyncListingsController:
+    def routes(self):
+        return [
+            api_route('/api/view_listings', self.view_listings, methods=['GET']),
+            api_route('/api/view_listing/{listing_id}', self.view_listing_by_id, methods=['GET']),
+            api_route('/api/track_view', self.track_view, methods=['POST']),
+            api_route('/api/track_shortlist', self.track_shortlist, methods=['POST']),
+        ]
+
+    async def view_listings(self, request):
+        """
+        Async /api/view_listings: optional 'limit', 'cursor' and 'fields' query
+        parameters, 304 when If-None-Match holds the current ETag.
+        """
+        limit = request.query_params.get('limit')
+        cursor = request.query_params.get('cursor')
+        fields = request.query_params.get('fields')
+        etag = await AsyncUsedCarListing.get_listings_validator(limit, cursor, fields)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response, status_code = await AsyncUsedCarListing.get_all_listings(
+            limit=limit, cursor=cursor, fields=fields
+        )
+        return json_response(response, status_code, etag)
+
+    async def view_listing_by_id(self, request):
+        """
+        Async /api/view_listing/<listing_id> with If-None-Match and If-Modified-Since support.
+        """
+        listing_id = request.path_params['listing_id']
+        etag, last_modified = await AsyncUsedCarListing.get_listing_validators(listing_id)
+        if etag is not None:
+            cached = not_modified(request, etag, last_modified)
+            if cached is not None:
+                return cached
+        response, status_code = await AsyncUsedCarListing.get_listing_by_id(listing_id, version=etag)
+        return json_response(response, status_code, etag, last_modified)
+
+    async def track_view(self, request):
+        """
+        Async /api/track_view.
+        """
+        response, status_code = await AsyncUsedCarListing.track_view(await json_body(request))
+        return json_response(response, status_code)
+
+    async def track_shortlist(self, request):
+        """
+        Async /api/track_shortlist.
+        """
+        response, status_code = await AsyncUsedCarListing.track_shortlist(await json_body(request))
+        return json_response(response, status_code)
+
+async_listings_controller = AsyncListingsController()
+routes = async_listings_controller.routes()
@@ -0,0 +1,26 @@
+# backend/controllers/aio/profiles.py
+
+from models.aio.profile import AsyncProfile
+from utils.asgi import api_route, json_response, not_modified
+
+class AsyncProfilesController:
+    def routes(self):
+        return [
+            api_route('/api/view_profiles', self.view_profiles, methods=['GET']),
+        ]
+
+    async def view_profiles(self, request):
+        """
+        Async /api/view_profiles with optional 'role' filter, 304 when
+        If-None-Match holds the current ETag.
+        """
+        role = request.query_params.get('role')
+        etag = await AsyncProfile.get_profiles_validator(role)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response, status_code = await AsyncProfile.get_profiles(role)
+        return json_response(response, status_code, etag)
+
+async_profiles_controller = AsyncProfilesController()
+routes = async_profiles_controller.routes()
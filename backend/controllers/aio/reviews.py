@@ -0,0 +1,26 @@
+# backend/controllers/aio/reviews.py
+
+from models.aio.review import AsyncReview
+from utils.asgi import api_route, json_response
+
+class AsyncReviewsController:
+    def routes(self):
+        return [
+            api_route('/api/view_reviews/{agent_id}', self.view_reviews, methods=['GET']),
+        ]
+
+    async def view_reviews(self, request):
+        """
+        Async /api/view_reviews/<agent_id>: an agent's reviews and average rating,
+        with optional 'sort', 'limit' and 'cursor' query parameters.
+        """
+        response, status_code = await AsyncReview.get_reviews_and_average(
+            request.path_params['agent_id'],
+            sort=request.query_params.get('sort'),
+            limit=request.query_params.get('limit'),
+            cursor=request.query_params.get('cursor')
+        )
+        return json_response(response, status_code)
+
+async_reviews_controller = AsyncReviewsController()
+routes = async_reviews_controller.routes()
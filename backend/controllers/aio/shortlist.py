@@ -0,0 +1,28 @@
+# backend/controllers/aio/shortlist.py
+
+from models.aio.buyer_listing import AsyncBuyerListing
+from utils.asgi import api_route, json_response, not_modified
+
+class AsyncShortlistController:
+    def routes(self):
+        return [
+            api_route('/api/view_shortlist', self.view_shortlist, methods=['GET']),
+        ]
+
+    async def view_shortlist(self, request):
+        """
+        Async /api/view_shortlist: optional 'limit' and 'cursor' query parameters,
+        304 when If-None-Match holds the current ETag.
+        """
+        user_id = request.query_params.get('user_id')
+        limit = request.query_params.get('limit')
+        cursor = request.query_params.get('cursor')
+        etag = await AsyncBuyerListing.get_shortlist_validator(user_id, limit, cursor)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response, status_code = await AsyncBuyerListing.get_shortlist(user_id, limit, cursor)
+        return json_response(response, status_code, etag)
+
+async_shortlist_controller = AsyncShortlistController()
+routes = async_shortlist_controller.routes()
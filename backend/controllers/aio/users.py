@@ -0,0 +1,20 @@
+# backend/controllers/aio/users.py
+
+from models.aio.user import AsyncUser
+from utils.asgi import api_route, json_response
+
+class AsyncUsersController:
+    def routes(self):
+        return [
+            api_route('/api/get_user_id', self.get_user_id, methods=['GET']),
+        ]
+
+    async def get_user_id(self, request):
+        """
+        Async /api/get_user_id: the user document for the 'userid' query parameter.
+        """
+        response, status_code = await AsyncUser.get_user_by_id(request.query_params.get('userid'))
+        return json_response(response, status_code)
+
+async_users_controller = AsyncUsersController()
+routes = async_users_controller.routes()
@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from models.buyer_listing import BuyerListing
+from utils.conditional import not_modified, add_validators
 
 view_shortlist_bp = Blueprint('view_shortlist', __name__, url_prefix='/api')
 
@@ -13,9 +14,22 @@ class ViewShortlistController:
         view_shortlist_bp.add_url_rule('/view_shortlist', view_func=self.view_shortlist, methods=['GET'])
 
     def view_shortlist(self):
+        """
+        Endpoint to view a buyer's shortlist, with optional 'limit' and 'cursor'
+        query parameters; 304 when If-None-Match holds the current ETag.
+        """
         user_id = request.args.get('user_id')
-        response, status_code = BuyerListing.get_shortlist(user_id)
-        return jsonify(response), status_code
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        etag = BuyerListing.get_shortlist_validator(user_id, limit, cursor)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        response, status_code = BuyerListing.get_shortlist(user_id, limit, cursor)
+        result = jsonify(response)
+        if status_code == 200:
+            add_validators(result, etag)
+        return result, status_code
 
 # Instantiate the controller
 view_shortlist_controller = ViewShortlistController()
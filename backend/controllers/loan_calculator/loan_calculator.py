@@ -11,10 +11,16 @@ class LoanCalculatorController:
 
     def register_routes(self):
         loan_calculator_bp.add_url_rule('/loan_calculator', view_func=self.loan_calculator, methods=['POST'])
+        loan_calculator_bp.add_url_rule('/loan_calculator/batch', view_func=self.loan_calculator_batch, methods=['POST'])
 
     def loan_calculator(self): 
         data = request.get_json()
         response, status_code = LoanCalculator.calculate_loan(data)
         return jsonify(response), status_code
+
+    def loan_calculator_batch(self):
+        data = request.get_json()
+        response, status_code = LoanCalculator.calculate_loan_batch(data)
+        return jsonify(response), status_code
  
 loan_calculator_controller = LoanCalculatorController()
\ No newline at end of file
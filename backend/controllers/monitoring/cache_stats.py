@@ -0,0 +1,22 @@
+# backend/controllers/monitoring/cache_stats.py
+
+from flask import Blueprint, jsonify
+from utils import cache
+
+cache_stats_bp = Blueprint('cache_stats', __name__, url_prefix='/api')
+
+class CacheStatsController:
+    def __init__(self):
+        self.register_routes()
+
+    def register_routes(self):
+        cache_stats_bp.add_url_rule('/cache/stats', view_func=self.cache_stats, methods=['GET'])
+
+    def cache_stats(self):
+        """
+        Endpoint reporting hit, miss, eviction and invalidation counters of every
+        response cache in this worker process.
+        """
+        return jsonify({"caches": cache.stats()}), 200
+
+cache_stats_controller = CacheStatsController()
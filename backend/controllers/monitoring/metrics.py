@@ -0,0 +1,22 @@
+# backend/controllers/monitoring/metrics.py
+
+from flask import Blueprint, Response
+from utils import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+class MetricsController:
+    def __init__(self):
+        self.register_routes()
+
+    def register_routes(self):
+        metrics_bp.add_url_rule('/metrics', view_func=self.metrics, methods=['GET'])
+
+    def metrics(self):
+        """
+        Endpoint exposing request latency, response size and MongoDB command
+        metrics of this worker process in the Prometheus text format.
+        """
+        return Response(metrics.render(), status=200, mimetype=metrics.PROMETHEUS_MIMETYPE)
+
+metrics_controller = MetricsController()
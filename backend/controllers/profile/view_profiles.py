@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from models.profile import Profile
+from utils.conditional import not_modified, add_validators
 
 view_profiles_bp = Blueprint('view_profiles', __name__, url_prefix='/api')
 
@@ -15,10 +16,18 @@ class ViewProfilesController:
     def view_profiles(self):
         """
         Endpoint to view user profiles with optional filtering by role.
+        Answers 304 when If-None-Match holds the current ETag.
         Delegates processing to Profile.
         """
         role = request.args.get('role')
+        etag = Profile.get_profiles_validator(role)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
         response, status_code = Profile.get_profiles(role)
-        return jsonify(response), status_code
+        result = jsonify(response)
+        if status_code == 200:
+            add_validators(result, etag)
+        return result, status_code
  
 view_profiles_controller = ViewProfilesController()
@@ -0,0 +1,24 @@
+# backend/controllers/review/top_agents.py
+
+from flask import Blueprint, request, jsonify
+from models.review import Review
+
+top_agents_bp = Blueprint('top_agents', __name__, url_prefix='/api')
+
+class TopAgentsController:
+    def __init__(self):
+        self.register_routes()
+
+    def register_routes(self):
+        top_agents_bp.add_url_rule('/top_agents', view_func=self.top_agents, methods=['GET'])
+
+    def top_agents(self):
+        """
+        Endpoint for the buyer dashboard's best agents: the top agents by
+        Bayesian average rating, with an optional 'limit' query parameter.
+        Delegates processing to the Review model.
+        """
+        response, status_code = Review.get_top_agents(request.args.get('limit'))
+        return jsonify(response), status_code
+
+top_agents_controller = TopAgentsController()
@@ -20,9 +20,15 @@ class ViewReviewsController:
     def view_reviews(self, agent_id):
         """
         Endpoint for used car agents to view their reviews and average ratings.
+        Supports optional 'sort' ('recent' or 'rating'), 'limit' and 'cursor' query parameters.
         Delegates all processing to the ReviewModel.
         """
-        response, status_code = Review.get_reviews_and_average(agent_id)
+        response, status_code = Review.get_reviews_and_average(
+            agent_id,
+            sort=request.args.get('sort'),
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor')
+        )
         return jsonify(response), status_code
  
 view_reviews_controller = ViewReviewsController()
@@ -0,0 +1,31 @@
+# backend/controllers/used_car_listing/bulk_import_listings.py
+
+from flask import Blueprint, request, jsonify
+from models.used_car_listing import UsedCarListing
+from utils.bulk_import import detect_format, parse_rows
+
+bulk_import_listings_bp = Blueprint('bulk_import_listings', __name__, url_prefix='/api')
+
+class BulkImportListingsController:
+    def __init__(self):
+        self.register_routes()
+
+    def register_routes(self):
+        bulk_import_listings_bp.add_url_rule('/listings/bulk', view_func=self.bulk_import_listings, methods=['POST'])
+
+    def bulk_import_listings(self):
+        """
+        Endpoint to create many listings from a CSV (with header row) or JSON-lines upload.
+        The format comes from the Content-Type or an explicit format=csv|jsonl parameter;
+        pass ordered=true to stop at the first bad row.
+        The body is parsed as it streams in and delegated to UsedCarListing model.
+        """
+        fmt = detect_format(request.mimetype, request.args.get('format'))
+        if fmt is None:
+            return jsonify({"error": "Upload must be CSV (text/csv) or JSON lines (application/x-ndjson)."}), 415
+        ordered = request.args.get('ordered', '').lower() in ('1', 'true', 'yes')
+        rows = parse_rows(request.stream, fmt)
+        response, status_code = UsedCarListing.bulk_create_listings(rows, ordered=ordered)
+        return jsonify(response), status_code
+
+bulk_import_listings_controller = BulkImportListingsController()
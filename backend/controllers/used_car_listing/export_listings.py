@@ -0,0 +1,34 @@
+# backend/controllers/used_car_listing/export_listings.py
+
+from flask import Blueprint, Response, jsonify, request
+from models.used_car_listing import UsedCarListing
+from utils.export import NDJSON_MIMETYPE, gzip_chunks
+
+export_listings_bp = Blueprint('export_listings', __name__, url_prefix='/api')
+
+class ExportListingsController:
+    def __init__(self):
+        self.register_routes()
+
+    def register_routes(self):
+        export_listings_bp.add_url_rule('/export/listings', view_func=self.export_listings, methods=['GET'])
+
+    def export_listings(self):
+        """
+        Endpoint streaming every listing as newline-delimited JSON.
+        Accepts an optional updated_since (ISO 8601) for incremental pulls.
+        The stream is gzip-compressed when gzip=true is passed or the client
+        accepts gzip.
+        Delegates processing to UsedCarListing model.
+        """
+        chunks, status_code = UsedCarListing.export_listings(request.args.get('updated_since'))
+        if status_code != 200:
+            return jsonify(chunks), status_code
+
+        headers = {"Vary": "Accept-Encoding"}
+        if request.args.get('gzip', '').lower() in ('1', 'true', 'yes') or 'gzip' in request.accept_encodings:
+            chunks = gzip_chunks(chunks)
+            headers["Content-Encoding"] = "gzip"
+        return Response(chunks, status=200, mimetype=NDJSON_MIMETYPE, headers=headers, direct_passthrough=True)
+
+export_listings_controller = ExportListingsController()
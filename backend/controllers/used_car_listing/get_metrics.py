@@ -5,19 +5,39 @@ from models.used_car_listing import UsedCarListing
 
 get_metrics_bp = Blueprint('get_metrics', __name__, url_prefix='/api')
 
+# Query parameters selecting a metrics time series
+SERIES_PARAMS = ('start', 'end', 'granularity')
+
 class GetMetricsController:
     def __init__(self):
         self.register_routes()
 
     def register_routes(self):  
         get_metrics_bp.add_url_rule('/get_metrics/<seller_id>', view_func=self.get_metrics_by_seller, methods=['GET'])
+        get_metrics_bp.add_url_rule('/listing_metrics/<listing_id>', view_func=self.get_listing_metrics_series, methods=['GET'])
  
     def get_metrics_by_seller(self, seller_id):
         """
         Endpoint to retrieve metrics for all listings of a specific seller.
+        Pass live=true to include view/shortlist increments not yet flushed, and
+        any of start, end or granularity to include time series.
+        Delegates processing to UsedCarListing model.
+        """
+        live = request.args.get('live', '').lower() in ('1', 'true', 'yes')
+        series = None
+        if any(key in request.args for key in SERIES_PARAMS):
+            series = {key: request.args.get(key) for key in SERIES_PARAMS}
+        response, status_code = UsedCarListing.get_metrics_by_seller(seller_id, live=live, series=series)
+        return jsonify(response), status_code
+
+    def get_listing_metrics_series(self, listing_id):
+        """
+        Endpoint to retrieve the view/shortlist time series of a single listing.
+        Accepts optional start, end and granularity query parameters.
         Delegates processing to UsedCarListing model.
         """
-        response, status_code = UsedCarListing.get_metrics_by_seller(seller_id) 
+        series = {key: request.args.get(key) for key in SERIES_PARAMS}
+        response, status_code = UsedCarListing.get_metrics_series(listing_id=listing_id, **series)
         return jsonify(response), status_code
  
 get_metrics_controller = GetMetricsController()
@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from models.used_car_listing import UsedCarListing
+from utils.search import SEARCH_FILTER_PARAMS
 
 search_cars_bp = Blueprint('search_cars', __name__, url_prefix='/api')
 
@@ -14,7 +15,13 @@ class SearchCarsController:
 
     def search_cars(self):
         query = request.args.get('query')
-        response, status_code = UsedCarListing.search_cars(query)
+        response, status_code = UsedCarListing.search_cars(
+            query,
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor'),
+            fields=request.args.get('fields'),
+            filters={key: request.args.get(key) for key in SEARCH_FILTER_PARAMS}
+        )
         return jsonify(response), status_code
  
 search_cars_controller = SearchCarsController()
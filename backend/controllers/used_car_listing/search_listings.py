@@ -2,6 +2,7 @@
 
 from flask import Blueprint, request, jsonify
 from models.used_car_listing import UsedCarListing
+from utils.search import SEARCH_FILTER_PARAMS
 
 search_listings_bp = Blueprint('search_listings', __name__, url_prefix='/api')
 
@@ -15,10 +16,18 @@ class SearchListingsController:
     def search_listings(self):
         """
         Endpoint to search used car listings based on a query string.
+        Supports optional 'limit', 'cursor' and 'fields' query parameters,
+        plus the search filters and facets listed in SEARCH_FILTER_PARAMS.
         Delegates processing to UsedCarListingModel.
         """
         query = request.args.get('query')
-        response, status_code = UsedCarListing.search_listings(query) 
+        response, status_code = UsedCarListing.search_listings(
+            query,
+            limit=request.args.get('limit'),
+            cursor=request.args.get('cursor'),
+            fields=request.args.get('fields'),
+            filters={key: request.args.get(key) for key in SEARCH_FILTER_PARAMS}
+        )
         return jsonify(response), status_code
  
 search_listings_controller = SearchListingsController()
@@ -1,7 +1,8 @@
 # backend/controllers/used_car_agent/view_listings_controller.py
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from models.used_car_listing import UsedCarListing
+from utils.conditional import not_modified, add_validators
 
 view_listings_bp = Blueprint('view_listings', __name__, url_prefix='/api')
 
@@ -16,18 +17,41 @@ class ViewListingsController:
 
     def view_listings(self):
         """
-        Endpoint to retrieve all used car listings.
+        Endpoint to retrieve used car listings.
+        Supports optional 'limit', 'cursor' and 'fields' query parameters.
+        Answers 304 when If-None-Match holds the current ETag.
         Delegates processing to UsedCarListingModel.
         """
-        response, status_code = UsedCarListing.get_all_listings()
-        return jsonify(response), status_code
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
+        etag = UsedCarListing.get_listings_validator(limit, cursor, fields)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        response, status_code = UsedCarListing.get_all_listings(
+            limit=limit, cursor=cursor, fields=fields
+        )
+        result = jsonify(response)
+        if status_code == 200:
+            add_validators(result, etag)
+        return result, status_code
 
     def view_listing_by_id(self, listing_id):
         """
         Endpoint to retrieve a specific used car listing by its listing_id.
+        Supports If-None-Match and If-Modified-Since, answering 304 when unchanged.
         Delegates processing to UsedCarListingModel.
         """
-        response, status_code = UsedCarListing.get_listing_by_id(listing_id)
-        return jsonify(response), status_code
+        etag, last_modified = UsedCarListing.get_listing_validators(listing_id)
+        if etag is not None:
+            cached = not_modified(etag, last_modified)
+            if cached is not None:
+                return cached
+        response, status_code = UsedCarListing.get_listing_by_id(listing_id, version=etag)
+        result = jsonify(response)
+        if status_code == 200 and etag is not None:
+            add_validators(result, etag, last_modified)
+        return result, status_code
  
 view_listings_controller = ViewListingsController()
@@ -2,14 +2,7 @@ from flask import Blueprint, request, jsonify
 from models.user import User
 import logging
 
-# Configure Logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 get_id_from_username_bp = Blueprint('get_id_from_username', __name__, url_prefix='/api')
 
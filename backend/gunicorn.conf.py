@@ -0,0 +1,75 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings for the pre-fork production server: `gunicorn wsgi:app`, or
+`GUNICORN_WORKER_CLASS=asgi gunicorn asgi:app` for the asyncio stack.
+Every value can be overridden through the environment.
+
+The application is loaded in each worker after the fork (preload_app is off),
+so every worker builds its own MongoClient. Indexes and migrations are applied
+once in the master with a short-lived client before any worker starts.
+SIGTERM drains in-flight requests for up to graceful_timeout seconds, and
+workers are recycled after max_requests (+ jitter) requests.
+"""
+import multiprocessing
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+# gthread workers serve `threads` requests at a time; asgi workers up to
+# worker_connections concurrent connections on one event loop
+threads = int(os.getenv('GUNICORN_THREADS', '4')) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+preload_app = False
+
+# Worker recycling bounds memory growth; jitter keeps workers from restarting together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def on_starting(server):
+    """
+    Applies indexes and migrations once, then tells the workers to skip it.
+    utils.db is deliberately not imported here so no client exists before the fork.
+    """
+    if os.getenv('INIT_DB_ON_START', 'true').lower() == 'true':
+        from pymongo import MongoClient
+        from pymongo.errors import PyMongoError
+        from utils.migrations import migrate
+        from utils.logging_config import configure_logging
+
+        # Synchronous in the master; each worker installs its own queue listener
+        configure_logging(use_queue=False)
+        client = MongoClient(os.getenv('MONGO_URI'))
+        try:
+            migrate(client[os.getenv('DB_NAME')])
+        except PyMongoError as e:
+            server.log.error("Database initialization failed: %s", e)
+        finally:
+            client.close()
+    os.environ['INIT_DB_ON_START'] = 'false'
+
+
+def worker_exit(server, worker):
+    """
+    Writes buffered view/shortlist counters and queued log records before a
+    worker goes away.
+    """
+    listing_module = sys.modules.get('models.used_car_listing')
+    if listing_module is not None:
+        listing_module.listing_counters.stop()
+    logging_module = sys.modules.get('utils.logging_config')
+    if logging_module is not None:
+        logging_module.stop_logging()
@@ -0,0 +1,8 @@
+# backend/models/aio/__init__.py
+"""
+Asyncio variants of the model classes, built on pymongo's AsyncMongoClient and
+served by the ASGI app in asgi.py. They cover the high-traffic read and
+tracking paths and only await the database I/O: parameter parsing, response
+shaping, caches and version counters are the sync modules' own functions, so
+both stacks return identical payloads.
+"""
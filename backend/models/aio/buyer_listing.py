@@ -0,0 +1,56 @@
+# backend/models/aio/buyer_listing.py
+
+import logging
+from utils.async_db import async_db
+from utils.pagination import parse_page_limit, paginate_by_id_async
+from utils.versions import get_versions_async, make_etag
+from models.buyer_listing import ENTRY_PROJECTION, shortlist_response, shortlist_version
+from models.used_car_listing import LISTINGS_VERSION
+
+logger = logging.getLogger(__name__)
+
+shortlist_entries_collection = async_db['shortlist_entries']
+versions_collection = async_db['collection_versions']
+
+
+class AsyncBuyerListing:
+    @staticmethod
+    async def get_shortlist_validator(user_id, limit=None, cursor=None):
+        """
+        Returns the current ETag of a page of the user's shortlist: the user's
+        shortlist version plus the listings version, since listing edits are
+        written through to the entries.
+        """
+        versions = await get_versions_async(versions_collection, LISTINGS_VERSION, shortlist_version(user_id))
+        return make_etag('shortlist', user_id, limit, cursor, versions)
+
+    @staticmethod
+    async def get_shortlist(user_id, limit=None, cursor=None):
+        """
+        Retrieves the user's shortlist, newest first, from the denormalized
+        entries with one indexed read, like BuyerListing.get_shortlist.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            limit = parse_page_limit(limit, cursor)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            if limit is None:
+                entries = await shortlist_entries_collection.find(
+                    {"user_id": user_id}, ENTRY_PROJECTION
+                ).sort("_id", -1).to_list()
+                return shortlist_response(entries, limit), 200
+
+            entries, next_cursor = await paginate_by_id_async(
+                shortlist_entries_collection, {"user_id": user_id}, limit, cursor, ENTRY_PROJECTION
+            )
+            return shortlist_response(entries, limit, next_cursor), 200
+        except ValueError as e:
+            logger.warning("Invalid cursor: %s", cursor)
+            return {"error": str(e)}, 400  # Bad Request
+        except Exception as e:
+            logger.exception("Error in AsyncBuyerListing.get_shortlist: %s", e)
+            return {"error": "Failed to retrieve shortlist."}, 500
@@ -0,0 +1,34 @@
+# backend/models/aio/profile.py
+
+import logging
+from utils.async_db import async_db
+from utils.versions import get_versions_async, make_etag
+from models.profile import PROFILES_VERSION, profile_response, profiles_response
+
+logger = logging.getLogger(__name__)
+
+profiles_collection = async_db['profiles']
+versions_collection = async_db['collection_versions']
+
+
+class AsyncProfile:
+    @staticmethod
+    async def get_profiles_validator(role=None):
+        """
+        Returns the current ETag of the profile listing for the given role filter.
+        """
+        return make_etag('profiles', await get_versions_async(versions_collection, PROFILES_VERSION), role)
+
+    @staticmethod
+    async def get_profiles(role=None):
+        """
+        Retrieves profiles by role or all profiles if no role is provided.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            if role:
+                return profile_response(role, await profiles_collection.find_one({"role": role}))
+            return profiles_response(await profiles_collection.find().to_list())
+        except Exception as e:
+            logger.exception("Exception during fetching profiles: %s", e)
+            return {"error": "Failed to fetch profiles."}, 500  # Internal Server Error
@@ -0,0 +1,82 @@
+# backend/models/aio/review.py
+
+import asyncio
+import logging
+from utils.async_db import async_db
+from utils.ratings import RATING_SUMMARIES_COLLECTION
+from utils.pagination import paginate_by_id_async, paginate_by_key_async
+from models.review import REVIEW_ORDERS, parse_review_query, reviews_response, serialize_reviews
+from models.aio.user import AsyncUser
+
+logger = logging.getLogger(__name__)
+
+reviews_collection = async_db['reviews']
+rating_summaries_collection = async_db[RATING_SUMMARIES_COLLECTION]
+
+
+class AsyncReview:
+    @staticmethod
+    async def get_reviews_and_average(agent_id, sort=None, limit=None, cursor=None):
+        """
+        Retrieves the reviews and the rating summary of a specific agent, with
+        the same 'sort', 'limit' and 'cursor' handling as the sync model. The
+        summary point read and the reviews are fetched concurrently; the agent
+        lookup is only needed when the agent has no reviews yet.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            limit = parse_review_query(sort, limit, cursor)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            if limit is None:
+                reviews_read = AsyncReview.get_reviews_for_agent(agent_id, sort)
+            else:
+                reviews_read = AsyncReview.get_review_page(agent_id, sort, limit, cursor)
+            summary, reviews = await asyncio.gather(
+                rating_summaries_collection.find_one({"_id": agent_id}),
+                reviews_read
+            )
+            if summary is None:
+                _, agent_status = await AsyncUser.get_user_by_id(agent_id)
+                if agent_status != 200:
+                    return {"error": "Agent not found."}, 404  # Not Found
+
+            if limit is None:
+                return reviews_response(reviews, summary, limit), 200
+            reviews, next_cursor = reviews
+            return reviews_response(reviews, summary, limit, next_cursor), 200
+        except ValueError as e:
+            logger.warning("Invalid cursor: %s", cursor)
+            return {"error": str(e)}, 400  # Bad Request
+        except Exception as e:
+            logger.exception("Error in AsyncReview.get_reviews_and_average: %s", e)
+            return {"error": "An error occurred while retrieving reviews."}, 500
+
+    @staticmethod
+    async def get_reviews_for_agent(agent_id, sort=None):
+        """
+        Retrieves all reviews associated with a specific agent, in `sort` order
+        if one is given.
+        Returns a list of review dictionaries.
+        """
+        reviews = reviews_collection.find({"agent_id": agent_id})
+        if sort in REVIEW_ORDERS:
+            reviews = reviews.sort(REVIEW_ORDERS[sort])
+        return serialize_reviews(await reviews.to_list())
+
+    @staticmethod
+    async def get_review_page(agent_id, sort, limit, cursor=None):
+        """
+        Retrieves one keyset page of an agent's reviews, like Review.get_review_page.
+        Returns a tuple of (reviews, next_cursor); raises ValueError on a bad cursor.
+        """
+        if sort == 'rating':
+            reviews, next_cursor = await paginate_by_key_async(
+                reviews_collection, {"agent_id": agent_id}, 'rating', limit, cursor
+            )
+        else:
+            reviews, next_cursor = await paginate_by_id_async(reviews_collection, {"agent_id": agent_id}, limit, cursor)
+        return serialize_reviews(reviews), next_cursor
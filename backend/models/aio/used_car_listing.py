@@ -0,0 +1,165 @@
+# backend/models/aio/used_car_listing.py
+
+import asyncio
+import logging
+from datetime import datetime
+from utils.async_db import async_db, async_read_db
+from utils.cache import cache_key
+from utils.pagination import build_projection, paginate_by_id_async
+from utils.versions import get_versions_async, make_etag
+from models.used_car_listing import (
+    COUNTER_WRITE_BEHIND, LISTING_COUNTERS_VERSION, LISTINGS_NAMESPACE, LISTINGS_VERSION,
+    VALIDATOR_PROJECTION, UsedCarListing, cacheable_page, counter_update, listing_cache, listing_counters,
+    listing_validators, listings_response, parse_listing_id, parse_listing_query,
+    serialize_listing, tracked_response
+)
+
+logger = logging.getLogger(__name__)
+
+used_car_collection = async_db['used_car_listings']
+used_car_read_collection = async_read_db['used_car_listings']
+versions_collection = async_db['collection_versions']
+
+
+class AsyncUsedCarListing:
+    @staticmethod
+    async def get_listings_validator(*request_args):
+        """
+        Returns the current ETag of the listing collection views, for the given
+        request arguments, from one read of the version counters.
+        """
+        versions = await get_versions_async(versions_collection, LISTINGS_VERSION, LISTING_COUNTERS_VERSION)
+        UsedCarListing.observe_listings_version(versions[LISTINGS_VERSION])
+        return make_etag('listings', versions, request_args)
+
+    @staticmethod
+    async def get_listing_validators(listing_id):
+        """
+        Returns (etag, last_modified) for one listing, or (None, None) if it does not exist.
+        """
+        try:
+            oid = parse_listing_id(listing_id)
+        except ValueError:
+            return None, None
+        return listing_validators(listing_id, await used_car_collection.find_one({"_id": oid}, VALIDATOR_PROJECTION))
+
+    @staticmethod
+    async def find_listings(mongo_query, limit=None, cursor=None, fields=None):
+        """
+        Runs a listing query as one keyset page with optional field projection,
+        like UsedCarListing.find_listings.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            limit, requested_fields = parse_listing_query(limit, cursor, fields)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        projection = build_projection(requested_fields)
+        try:
+            listings, next_cursor = await paginate_by_id_async(
+                used_car_read_collection, mongo_query, limit, cursor, projection
+            )
+        except ValueError as e:
+            logger.warning("Invalid cursor: %s", cursor)
+            return {"error": str(e)}, 400  # Bad Request
+        return listings_response(listings, requested_fields, limit, next_cursor), 200
+
+    @staticmethod
+    async def get_all_listings(limit=None, cursor=None, fields=None):
+        """
+        Retrieves a page of used car listings, newest first. Shares the
+        listing cache (and its keys) with UsedCarListing.get_all_listings.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            key = cache_key('get_all_listings', limit, cursor, fields)
+            generation = listing_cache.generation(LISTINGS_NAMESPACE)
+            cached = listing_cache.get(LISTINGS_NAMESPACE, key)
+            if cached is not None:
+                return cached
+            response, status_code = await AsyncUsedCarListing.find_listings({}, limit, cursor, fields)
+            if status_code == 200 and cacheable_page(response):
+                listing_cache.set(LISTINGS_NAMESPACE, key, (response, status_code), generation=generation)
+            return response, status_code
+        except Exception as e:
+            logger.exception("Exception during retrieving all listings: %s", e)
+            return {"error": "Failed to retrieve listings."}, 500  # Internal Server Error
+
+    @staticmethod
+    async def get_listing_by_id(listing_id, version=None):
+        """
+        Retrieves a listing by its listing_id.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            oid = parse_listing_id(listing_id)
+        except ValueError as e:
+            logger.warning("Invalid listing_id %s: %s", listing_id, e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        key = cache_key('get_listing_by_id', str(oid), version)
+        generation = listing_cache.generation(LISTINGS_NAMESPACE)
+        cached = listing_cache.get(LISTINGS_NAMESPACE, key)
+        if cached is not None:
+            return cached
+
+        try:
+            listing = await used_car_collection.find_one({"_id": oid})
+            if listing:
+                serialized = serialize_listing(listing)
+                listing_cache.set(LISTINGS_NAMESPACE, key, ({"listing": serialized}, 200), generation=generation)
+                return {"listing": serialized}, 200
+            logger.warning("Listing not found with ID: %s", listing_id)
+            return {"error": "Listing not found."}, 404  # Not Found
+        except Exception as e:
+            logger.exception("Exception during retrieving listing by ID: %s", e)
+            return {"error": "Failed to retrieve listing."}, 500  # Internal Server Error
+
+    @staticmethod
+    async def _increment_counter(data, field, label):
+        """
+        Shared logic for track_view and track_shortlist. With write-behind enabled
+        the increment only touches the in-memory listing_counters buffer, whose
+        flush thread writes it; otherwise the $inc is awaited here.
+        Returns a tuple of (response_dict, status_code).
+        """
+        listing_id = (data or {}).get('listing_id')
+        try:
+            oid = parse_listing_id(listing_id)
+        except ValueError as e:
+            logger.warning("Invalid listing_id %s: %s", listing_id, e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            if COUNTER_WRITE_BEHIND:
+                listing_counters.increment(oid, field)
+            else:
+                result = await used_car_collection.update_one({"_id": oid}, counter_update(field))
+                if result.matched_count == 0:
+                    logger.warning("Listing with listing_id %s not found.", listing_id)
+                    return {"error": "Listing not found."}, 404  # Not Found
+                # Version bump and metric buckets go through the sync driver, off the loop
+                await asyncio.to_thread(UsedCarListing.counters_flushed, {oid: {field: 1}}, datetime.utcnow())
+            return tracked_response(label, listing_id)
+
+        except Exception as e:
+            logger.exception("Error tracking %s for listing_id %s: %s", label, listing_id, e)
+            return {"success": False, "error": f"Failed to track {label}."}, 500
+
+    @staticmethod
+    async def track_view(data):
+        """
+        Increments the view count for a listing.
+        Returns a tuple of (response_dict, status_code).
+        """
+        return await AsyncUsedCarListing._increment_counter(data, 'views', 'view')
+
+    @staticmethod
+    async def track_shortlist(data):
+        """
+        Increments the shortlist count for a listing.
+        Returns a tuple of (response_dict, status_code).
+        """
+        return await AsyncUsedCarListing._increment_counter(data, 'shortlists', 'shortlist')
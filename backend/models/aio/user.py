@@ -0,0 +1,45 @@
+# backend/models/aio/user.py
+
+import logging
+from bson import ObjectId
+from bson.errors import InvalidId
+from utils.async_db import async_db
+from models.user import parse_user_ids, user_response
+
+logger = logging.getLogger(__name__)
+
+users_collection = async_db['users']
+
+
+class AsyncUser:
+    @staticmethod
+    async def get_user_by_id(user_id):
+        """
+        Retrieves a user by their ObjectId.
+        Returns a tuple of (response_data, status_code).
+        """
+        try:
+            oid = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            logger.warning("Invalid user_id format: %s", user_id)
+            return {"error": "Invalid user_id."}, 400  # Bad Request
+
+        try:
+            return user_response(user_id, await users_collection.find_one({"_id": oid}))
+        except Exception as e:
+            logger.exception("Exception during fetching user by ID: %s", e)
+            return {"error": "Failed to fetch user."}, 500  # Internal Server Error
+
+    @staticmethod
+    async def get_usernames_by_ids(user_ids):
+        """
+        Resolves many user ids to usernames with a single $in query.
+        Invalid or unknown ids are left out of the result.
+        Returns a dict mapping the id string to the username.
+        """
+        object_ids = parse_user_ids(user_ids)
+        if not object_ids:
+            return {}
+
+        users = users_collection.find({"_id": {"$in": object_ids}}, {"username": 1})
+        return {str(user['_id']): user.get('username') async for user in users}
@@ -1,26 +1,85 @@
 # backend/models/buyer_listing.py
 
+import logging
+import os
+from datetime import datetime
 from utils.db import db
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
 from models.user import User 
+from utils.pagination import parse_page_limit, page_response, paginate_by_id
+from utils.search import query_filter
+from utils.versions import bump_version, get_versions, make_etag
 
 
-buyer_listing_collection = db['buyer_shortlists']
+logger = logging.getLogger(__name__)
+
+# One document per saved listing:
+# {user_id, listing_id, make, model, year, price, agent_id, seller_id, agent_name, seller_name, saved_at}
+shortlist_entries_collection = db['shortlist_entries']
 used_car_collection = db['used_car_listings']
 
+SHORTLIST_MAX_ENTRIES = int(os.getenv('SHORTLIST_MAX_ENTRIES', '500'))
+
+# Listing fields copied onto each shortlist entry; edits to any of them are
+# written through by BuyerListing.listing_updated
+SUMMARY_FIELDS = ('make', 'model', 'year', 'price', 'agent_id', 'seller_id')
+SUMMARY_PROJECTION = {field: 1 for field in SUMMARY_FIELDS}
+ENTRY_PROJECTION = {
+    "listing_id": 1, "make": 1, "model": 1, "year": 1, "price": 1, "agent_name": 1, "seller_name": 1
+}
+
 
 def serialize_listing(listing):
     if not listing:
         return None
-    listing['_id'] = str(listing['_id'])
-    listing['seller_id'] = str(listing['seller_id']) if listing.get('seller_id') else None
-    listing['created_at'] = listing['created_at'].isoformat() if listing.get('created_at') else None
+    # ObjectId and datetime values are encoded by the app's JSON provider
+    listing.setdefault('seller_id', None)
+    listing.setdefault('created_at', None)
     return listing
 
 def serialize_listings(listings):
     return [serialize_listing(listing) for listing in listings]
 
+
+def listing_summary(listing, usernames):
+    """
+    Returns the fields a shortlist entry keeps of `listing`, with the agent and
+    seller names resolved from `usernames` (id string -> username).
+    """
+    summary = {field: listing[field] for field in SUMMARY_FIELDS if field in listing}
+    summary['agent_name'] = usernames.get(str(listing.get('agent_id')), 'N/A')
+    summary['seller_name'] = usernames.get(str(listing.get('seller_id')), 'N/A')
+    return summary
+
+
+def serialize_entry(entry):
+    return {
+        "listingID": str(entry['listing_id']),
+        "make": entry.get('make', 'N/A'),
+        "model": entry.get('model', 'N/A'),
+        "year": entry.get('year', 'N/A'),
+        "price": entry.get('price', 'N/A'),
+        "agent_name": entry.get('agent_name', 'N/A'),
+        "seller_name": entry.get('seller_name', 'N/A')
+    }
+
+
+def shortlist_response(entries, limit, next_cursor=None):
+    """
+    Shapes the view_shortlist response from raw shortlist entries.
+    """
+    return page_response("shortlist", [serialize_entry(entry) for entry in entries], limit, next_cursor)
+
+
+def shortlist_version(user_id):
+    """
+    Name of the version counter bumped when a user's shortlist gains or loses an entry.
+    """
+    return f"shortlist:{user_id}"
+
+
 class BuyerListing:
     @staticmethod
     def save_listing(data):
@@ -40,83 +99,105 @@ class BuyerListing:
         except InvalidId:
             return {"error": "Invalid listing_id."}, 400
 
+        entry_key = {"user_id": user_id, "listing_id": listing_oid}
         try:
-            result = buyer_listing_collection.update_one(
-                {"user_id": user_id},
-                {"$addToSet": {"shortlist": listing_oid}},
-                upsert=True
-            )
-            if result.modified_count > 0 or result.upserted_id is not None:
-                return {"message": "Listing saved successfully."}, 200
-            else:
+            # The cap is checked before the write, so concurrent saves can overshoot it slightly
+            if shortlist_entries_collection.count_documents({"user_id": user_id}) >= SHORTLIST_MAX_ENTRIES:
+                if shortlist_entries_collection.find_one(entry_key, {"_id": 1}):
+                    return {"message": "Listing already in shortlist."}, 200
+                return {"error": f"Shortlist is full ({SHORTLIST_MAX_ENTRIES} listings)."}, 400
+
+            listing = used_car_collection.find_one({"_id": listing_oid}, SUMMARY_PROJECTION)
+            if not listing:
+                return {"error": "Listing not found."}, 404
+            usernames = User.get_usernames_by_ids([listing.get('agent_id'), listing.get('seller_id')])
+
+            try:
+                result = shortlist_entries_collection.update_one(
+                    entry_key,
+                    {"$setOnInsert": {**listing_summary(listing, usernames), "saved_at": datetime.utcnow()}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
                 return {"message": "Listing already in shortlist."}, 200
+            if result.upserted_id is None:
+                return {"message": "Listing already in shortlist."}, 200
+            bump_version(shortlist_version(user_id))
+            return {"message": "Listing saved successfully."}, 200
         except Exception as e:
-            print(f"Error in BuyerListing.save_listing: {e}")
+            logger.exception("Error in BuyerListing.save_listing: %s", e)
             return {"error": "Failed to save listing."}, 500
 
     @staticmethod
-    def get_shortlist(user_id):
+    def get_shortlist_validator(user_id, limit=None, cursor=None):
+        """
+        Returns the current ETag of a page of the user's shortlist: the user's
+        shortlist version plus the listings version, since listing edits are
+        written through to the entries.
+        """
+        from models.used_car_listing import LISTINGS_VERSION
+        versions = get_versions(LISTINGS_VERSION, shortlist_version(user_id))
+        return make_etag('shortlist', user_id, limit, cursor, versions)
+
+    @staticmethod
+    def get_shortlist(user_id, limit=None, cursor=None):
         """
-        Retrieves the user's shortlist with detailed listing information.
+        Retrieves the user's shortlist, newest first, from the denormalized
+        entries: one read on the user_id_id index, with no listing or user lookups.
+        `limit` and `cursor` are the raw query-string values; without them the
+        whole shortlist (at most SHORTLIST_MAX_ENTRIES entries) is returned.
         Returns a tuple of (response_dict, status_code).
         """
         try:
-            user = buyer_listing_collection.find_one({"user_id": user_id}) 
-            if user:
-                shortlist_ids = [str(oid) for oid in user.get('shortlist', [])] 
-                if not shortlist_ids:
-                    return {"shortlist": []}, 200 
-                # Fetch all listings in bulk 
-                listings_cursor = used_car_collection.find({"_id": {"$in": [ObjectId(lid) for lid in shortlist_ids]}})
- 
-                listings = list(listings_cursor) 
- 
-                enriched_shortlist = []
-                for listing in listings:
-                    listing_id_str = str(listing.get('_id'))
-                    make = listing.get('make', 'N/A')
-                    model = listing.get('model', 'N/A')
-                    year = listing.get('year', 'N/A')
-                    price = listing.get('price', 'N/A')
- 
-                    # Fetch agent_name
-                    agent_id = listing.get('agent_id')  
-                    if agent_id: 
-                        agent_response, agent_status = User.get_user_by_id(agent_id) 
-                        if agent_status == 200:
-                            agent_name = agent_response.get('user', {}).get('username', 'N/A')
-                        else:
-                            agent_name = 'N/A' 
-                    else:
-                        agent_name = 'N/A'
- 
-                    # Fetch seller_name
-                    seller_id = listing.get('seller_id')
-                    if seller_id:
-                        seller_response, seller_status = User.get_user_by_id(str(seller_id))
-                        if seller_status == 200:
-                            seller_name = seller_response.get('user', {}).get('username', 'N/A')
-                        else:
-                            seller_name = 'N/A'
-                    else:
-                        seller_name = 'N/A'
- 
-                    enriched_listing = {
-                        "listingID": listing_id_str,
-                        "make": make,
-                        "model": model,
-                        "year": year,
-                        "price": price,
-                        "agent_name": agent_name,
-                        "seller_name": seller_name
-                    } 
-                    enriched_shortlist.append(enriched_listing)
-
-                return {"shortlist": enriched_shortlist}, 200
-            return {"shortlist": []}, 200
+            limit = parse_page_limit(limit, cursor)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            if limit is None:
+                entries = shortlist_entries_collection.find({"user_id": user_id}, ENTRY_PROJECTION).sort("_id", -1)
+                return shortlist_response(entries, limit), 200
+
+            try:
+                entries, next_cursor = paginate_by_id(
+                    shortlist_entries_collection, {"user_id": user_id}, limit, cursor, ENTRY_PROJECTION
+                )
+            except ValueError as e:
+                logger.warning("Invalid cursor: %s", cursor)
+                return {"error": str(e)}, 400  # Bad Request
+            return shortlist_response(entries, limit, next_cursor), 200
         except Exception as e: 
+            logger.exception("Error in BuyerListing.get_shortlist: %s", e)
             return {"error": "Failed to retrieve shortlist."}, 500
 
+    @staticmethod
+    def listing_updated(listing):
+        """
+        Writes a listing's new summary fields through to every shortlist entry
+        that holds it. Called after a listing update; a failure is logged rather
+        than failing the update, and the entries keep their previous summary.
+        """
+        try:
+            usernames = User.get_usernames_by_ids([listing.get('agent_id'), listing.get('seller_id')])
+            shortlist_entries_collection.update_many(
+                {"listing_id": listing['_id']},
+                {"$set": listing_summary(listing, usernames)}
+            )
+        except Exception as e:
+            logger.exception("Failed to refresh shortlist entries of listing %s: %s", listing.get('_id'), e)
+
+    @staticmethod
+    def listing_deleted(listing_oid):
+        """
+        Removes a deleted listing from every shortlist. A failure is logged
+        rather than failing the deletion.
+        """
+        try:
+            shortlist_entries_collection.delete_many({"listing_id": listing_oid})
+        except Exception as e:
+            logger.exception("Failed to remove listing %s from shortlists: %s", listing_oid, e)
+
     @staticmethod
     def search_shortlist(data):
         """
@@ -137,7 +218,7 @@ class BuyerListing:
         try:
             return BuyerListing._search_shortlist_logic(user_id, query, listing_id)
         except Exception as e:
-            print(f"Error in BuyerListing.search_shortlist: {e}")
+            logger.exception("Error in BuyerListing.search_shortlist: %s", e)
             return {"error": "Failed to search shortlist."}, 500
 
     @staticmethod
@@ -145,23 +226,10 @@ class BuyerListing:
         """
         Internal method to handle the search logic.
         """
-        shortlist_doc = buyer_listing_collection.find_one({"user_id": user_id})
-        if not shortlist_doc:
-            return {"listings": []}, 200
-
-        shortlist_ids = shortlist_doc.get('shortlist', [])
-        # Convert all listing_ids to ObjectIds, skip invalid ones
-        valid_ids = []
-        for lid in shortlist_ids:
-            if isinstance(lid, ObjectId):
-                valid_ids.append(lid)
-            elif isinstance(lid, str):
-                try:
-                    valid_ids.append(ObjectId(lid))
-                except InvalidId:
-                    print(f"Invalid listing_id in shortlist: {lid}")
-                    continue  # Skip invalid IDs
-
+        valid_ids = [
+            entry['listing_id']
+            for entry in shortlist_entries_collection.find({"user_id": user_id}, {"listing_id": 1, "_id": 0})
+        ]
         if not valid_ids:
             return {"listings": []}, 200
 
@@ -177,11 +245,10 @@ class BuyerListing:
             except InvalidId:
                 return {"error": "Invalid listing_id parameter."}, 400
         elif query:
-            mongo_query["$or"] = [
-                {"make": {"$regex": query, "$options": "i"}},
-                {"model": {"$regex": query, "$options": "i"}},
-                {"year": {"$regex": query, "$options": "i"}}
-            ]
+            text_clause = query_filter(query)
+            if text_clause is None:
+                return {"listings": []}, 200
+            mongo_query = {"$and": [mongo_query, text_clause]}
 
         # Perform the search using UsedCarListing model
         from models.used_car_listing import UsedCarListing
@@ -205,16 +272,14 @@ class BuyerListing:
             except InvalidId:
                 return {"error": "Invalid listing_id."}, 400
 
-            # Update the document to remove the listing from the shortlist
-            result = buyer_listing_collection.update_one(
-                {"user_id": user_id},
-                {"$pull": {"shortlist": listing_oid}}
-            )
+            # Remove the listing's entry from the shortlist
+            result = shortlist_entries_collection.delete_one({"user_id": user_id, "listing_id": listing_oid})
 
-            if result.modified_count > 0:
+            if result.deleted_count > 0:
+                bump_version(shortlist_version(user_id))
                 return {"message": "Listing removed successfully."}, 200
             else:
                 return {"message": "Listing not found in shortlist or already removed."}, 404
         except Exception as e:
-            print(f"Error in BuyerListing.remove_from_shortlist: {e}")
+            logger.exception("Error in BuyerListing.remove_from_shortlist: %s", e)
             return {"error": "Failed to remove listing."}, 500
@@ -1,7 +1,10 @@
-from utils.loan_calculator import LoanCalculator as LoanCalcUtil
+import logging
+from utils.loan_calculator import LoanCalculator as LoanCalcUtil, BatchLoanCalculator
 
 from models.used_car_listing import UsedCarListing
 
+logger = logging.getLogger(__name__)
+
 class LoanCalculator:
     @staticmethod
     def calculate_loan(data):
@@ -17,7 +20,7 @@ class LoanCalculator:
                 annual_interest_rate = float(annual_interest_rate)
                 loan_term_months = int(loan_term_months)
                 down_payment = float(down_payment)
-            except ValueError:
+            except (TypeError, ValueError):
                 return {"error": "Invalid data types for one or more fields."}, 400
 
             # Validate input values
@@ -62,5 +65,81 @@ class LoanCalculator:
         except ValueError as ve:
             return {"error": str(ve)}, 400
         except Exception as e:
-            print(f"Error in LoanCalculator.calculate_loan: {e}")
+            logger.exception("Error in LoanCalculator.calculate_loan: %s", e)
+            return {"error": "An internal error occurred while processing the loan calculation."}, 500
+
+    @staticmethod
+    def calculate_loan_batch(data):
+        """
+        Calculates the payment grid for every combination of the given interest rates,
+        loan terms and down payments against a listing's price, fetching the listing once.
+        Expects data to contain 'listing_id', 'annual_interest_rates' and 'loan_terms_months',
+        and optionally 'down_payments' (defaults to [0]) and 'include_schedules'.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            if not data:
+                return {"error": "No input data provided."}, 400
+
+            listing_id = data.get('listing_id')
+            annual_interest_rates = data.get('annual_interest_rates')
+            loan_terms_months = data.get('loan_terms_months')
+            down_payments = data.get('down_payments', [0])
+            include_schedules = data.get('include_schedules', False)
+
+            # Type conversion and validation
+            if not isinstance(include_schedules, bool):
+                return {"error": "include_schedules must be true or false."}, 400
+            if not all(isinstance(axis, list) for axis in (annual_interest_rates, loan_terms_months, down_payments)):
+                return {"error": "Interest rates, loan terms and down payments must be lists of numbers."}, 400
+            try:
+                annual_interest_rates = [float(rate) for rate in annual_interest_rates]
+                # Kept as floats so BatchLoanCalculator rejects fractional terms instead of truncating them
+                loan_terms_months = [float(term) for term in loan_terms_months]
+                down_payments = [float(down_payment) for down_payment in down_payments]
+            except (TypeError, ValueError):
+                return {"error": "Interest rates, loan terms and down payments must be lists of numbers."}, 400
+
+            # Validate input values
+            # 0% financing is a valid scenario; BatchLoanCalculator repays it straight-line
+            if any(rate < 0 for rate in annual_interest_rates):
+                return {"error": "Annual interest rate cannot be negative."}, 400
+            if any(term <= 0 for term in loan_terms_months):
+                return {"error": "Loan term must be greater than zero months."}, 400
+            if any(down_payment < 0 for down_payment in down_payments):
+                return {"error": "Down payment cannot be negative."}, 400
+
+            listing_data, status_code = UsedCarListing.get_listing_by_id(listing_id)
+            if status_code != 200:
+                return {"error": "Car listing not found."}, status_code
+
+            listing = listing_data.get('listing')
+            if not listing:
+                return {"error": "Listing data not available."}, 500
+
+            principal = listing.get('price')
+            if principal is None:
+                return {"error": "Listing price not available."}, 500
+            if principal <= 0:
+                return {"error": "Listing price must be greater than zero."}, 400
+
+            # Perform the vectorized calculation
+            batch_calculator = BatchLoanCalculator(
+                principal=principal,
+                annual_interest_rates=annual_interest_rates,
+                loan_terms_months=loan_terms_months,
+                down_payments=down_payments
+            )
+
+            loan_details = batch_calculator.calculate()
+            loan_details["principal"] = principal
+            if include_schedules:
+                loan_details["schedules"] = batch_calculator.amortization_schedules()
+
+            return loan_details, 200
+
+        except ValueError as ve:
+            return {"error": str(ve)}, 400
+        except Exception as e:
+            logger.exception("Error in LoanCalculator.calculate_loan_batch: %s", e)
             return {"error": "An internal error occurred while processing the loan calculation."}, 500
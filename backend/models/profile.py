@@ -1,18 +1,16 @@
 # backend/models/profile.py
 
+import copy
 import logging
+import os
+import threading
+import time
 from utils.db import db
 from marshmallow import Schema, fields, ValidationError
 from models.user import User  
+from utils.versions import bump_version, get_versions, make_etag
 
-# Configure Logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 profiles_collection = db['profiles']
 
@@ -20,7 +18,7 @@ profiles_collection = db['profiles']
 def serialize_profile(profile):
     if not profile:
         return None
-    profile['_id'] = str(profile['_id'])
+    # ObjectId values are encoded by the app's JSON provider
     return profile
 
 
@@ -28,6 +26,126 @@ def serialize_profiles(profiles):
     return [serialize_profile(profile) for profile in profiles]
 
 
+def profile_response(role, profile):
+    """
+    Shapes the response of a profile lookup by role from the fetched document.
+    """
+    if profile:
+        logger.info("Profile retrieved for role '%s'.", role)
+        return {"profile": serialize_profile(profile)}, 200  # OK
+    logger.warning("Profile not found with role: %s", role)
+    return {"profile": None}, 404  # Not Found
+
+
+def profiles_response(profiles):
+    """
+    Shapes the response listing every profile.
+    """
+    serialized = serialize_profiles(profiles)
+    logger.info("All profiles retrieved successfully.")
+    return {"profiles": serialized}, 200
+
+
+# Seconds a loaded profile table is trusted before it is re-read from the database
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv('PROFILE_CACHE_TTL_SECONDS', '60'))
+
+# Seconds between reads of the profiles version by a cached lookup; 0 reads it on every lookup
+PROFILE_VERSION_CHECK_SECONDS = float(os.getenv('PROFILE_VERSION_CHECK_SECONDS', '1'))
+
+# Version counter behind the ETag of /api/view_profiles and the profile cache
+PROFILES_VERSION = 'profiles'
+
+
+class ProfileCache:
+    """
+    Process-wide copy of the profiles collection, keyed by role.
+    The whole (small) collection is loaded in one query and reused until it is
+    older than `ttl` seconds, invalidated by a profile write in this process,
+    or the shared version returned by `version` moves on because another
+    process wrote. The version is read at most every `check_interval` seconds.
+    """
+
+    def __init__(self, collection, ttl, version=None, check_interval=0):
+        self.collection = collection
+        self.ttl = ttl
+        self.version = version
+        self.check_interval = check_interval
+        self._profiles = None
+        self._loaded_at = 0.0
+        self._loaded_version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Read the version first, so a write racing the find is seen by the next check
+        version = self.version() if self.version is not None else None
+        profiles = {
+            profile['role']: serialize_profile(profile)
+            for profile in self.collection.find()
+        }
+        self._profiles = profiles
+        self._loaded_version = version
+        self._loaded_at = self._checked_at = time.monotonic()
+        return profiles
+
+    def _check_version(self):
+        """
+        Expires the table if the shared version changed since it was loaded.
+        The table is kept as the fallback should the reload fail.
+        """
+        if self.version is None or time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            version = self.version()
+        except Exception as e:
+            logger.exception("Failed to read profiles version, serving cached entries: %s", e)
+            return
+        with self._lock:
+            if version != self._loaded_version:
+                self._loaded_at = float('-inf')
+
+    def _current(self):
+        self._check_version()
+        profiles = self._profiles
+        if profiles is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return profiles
+        with self._lock:
+            profiles = self._profiles
+            if profiles is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return profiles
+            try:
+                return self._load()
+            except Exception as e:
+                if profiles is None:
+                    raise
+                # Keep serving the last good table rather than failing every login
+                logger.exception("Failed to refresh profile cache, serving stale entries: %s", e)
+                return profiles
+
+    def get(self, role):
+        """
+        Returns a copy of the serialized profile for `role`, or None if there is none.
+        """
+        profile = self._current().get(role)
+        return copy.deepcopy(profile) if profile else None
+
+    def invalidate(self):
+        """
+        Drops the cached table so the next lookup re-reads the collection.
+        """
+        with self._lock:
+            self._profiles = None
+
+
+def _profiles_version():
+    return get_versions(PROFILES_VERSION)[PROFILES_VERSION]
+
+
+profile_cache = ProfileCache(profiles_collection, PROFILE_CACHE_TTL_SECONDS,
+                             version=_profiles_version, check_interval=PROFILE_VERSION_CHECK_SECONDS)
+
+
 class CreateProfileSchema(Schema):
     role = fields.Str(required=True)
     rights = fields.List(fields.Str(), required=True)  # Defines rights as an array of strings
@@ -37,7 +155,28 @@ class CreateProfileSchema(Schema):
 class UpdateProfileSchema(Schema):
     rights = fields.List(fields.Str())  # Optional for partial updates
 
+
 class Profile:
+    @staticmethod
+    def profiles_changed():
+        """
+        Records a profile write: bumps the profiles version, so conditional GETs
+        and the profile caches of every worker see the change, then drops this
+        process's profile cache. Bumping first lets the reload record the new version.
+        """
+        try:
+            bump_version(PROFILES_VERSION)
+        except Exception as e:
+            logger.exception("Failed to bump profiles version: %s", e)
+        profile_cache.invalidate()
+
+    @staticmethod
+    def get_profiles_validator(role=None):
+        """
+        Returns the current ETag of the profile listing for the given role filter.
+        """
+        return make_etag('profiles', get_versions(PROFILES_VERSION), role)
+
     @staticmethod
     def create_profile(profile_data):
         """
@@ -48,26 +187,26 @@ class Profile:
         schema = CreateProfileSchema()
         try:
             validated_data = schema.load(profile_data)
-            print(validated_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during profile creation: {err.messages}")
+            logger.warning("Validation errors during profile creation: %s", err.messages)
             return{"error": err.messages},  400 # Bad Request
 
         try:
             existing_profile = profiles_collection.find_one({"role": validated_data['role']})
             if existing_profile:
-                logger.warning(f"Profile with role '{validated_data['role']}' already exists.")
+                logger.warning("Profile with role '%s' already exists.", validated_data['role'])
                 return{"error": "Profile with this role already exists."},  400 # Bad Request
 
             result = profiles_collection.insert_one(validated_data)
+            Profile.profiles_changed()
             if result.inserted_id:
-                logger.info(f"Profile created successfully with ID: {result.inserted_id}")
+                logger.info("Profile created successfully with ID: %s", result.inserted_id)
                 
                 return {"message": "Profile created successfully."}, 201  # Created
             logger.error("Failed to create profile without exception.")
             return{"error": "Failed to create profile."},  500  # Internal Server Error
         except Exception as e:
-            logger.exception(f"Exception during profile creation: {e}")
+            logger.exception("Exception during profile creation: %s", e)
             return{"error": "An error occurred while creating the profile."},  500  # Internal Server Error
 
     @staticmethod
@@ -77,17 +216,32 @@ class Profile:
         Returns a dictionary with 'data' and 'status_code'.
         """
         try:
-            profile = profiles_collection.find_one({"role": role})
-            if profile:
-                serialized = serialize_profile(profile)
-                logger.info(f"Profile retrieved for role '{role}'.")
-                return{"profile": serialized},  200  # OK
-            logger.warning(f"Profile not found with role: {role}")
-            return{"profile": None},  404  # Not Found
+            return profile_response(role, profiles_collection.find_one({"role": role}))
         except Exception as e:
-            logger.exception(f"Exception during fetching profile by role '{role}': {e}")
+            logger.exception("Exception during fetching profile by role '%s': %s", role, e)
             return{"profile": None},  500  # Internal Server Error
 
+    @staticmethod
+    def get_cached_profile(role):
+        """
+        Resolves a role to its profile from the process-wide cache, without a
+        database round trip while the cache is fresh. Used on the login path.
+        Returns the serialized profile, or None if the role has no profile.
+        """
+        return profile_cache.get(role)
+
+    @staticmethod
+    def has_right(role, right):
+        """
+        Checks whether the profile for `role` grants `right`, using the cache.
+        Suspended profiles grant nothing.
+        Returns True or False.
+        """
+        profile = profile_cache.get(role)
+        if not profile or profile.get('suspended'):
+            return False
+        return right in profile.get('rights', [])
+
     @staticmethod
     def get_profiles(role=None):
         """
@@ -99,12 +253,9 @@ class Profile:
                 profile_result = Profile.get_profile_by_role(role)
                 return profile_result
             else:
-                profiles = list(profiles_collection.find())
-                serialized = serialize_profiles(profiles)
-                logger.info("All profiles retrieved successfully.")
-                return{"profiles": serialized},  200
+                return profiles_response(profiles_collection.find())
         except Exception as e:
-            logger.exception(f"Exception during fetching profiles: {e}")
+            logger.exception("Exception during fetching profiles: %s", e)
             return{"error": "Failed to fetch profiles."},  500  # Internal Server Error
 
     @staticmethod
@@ -122,18 +273,19 @@ class Profile:
         try:
             validated_data = schema.load(update_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during profile update: {err.messages}")
+            logger.warning("Validation errors during profile update: %s", err.messages)
             return{"error": err.messages},  400  # Bad Request
 
         try:
             result = profiles_collection.update_one({"role": role}, {"$set": validated_data})
+            Profile.profiles_changed()
             if result.modified_count > 0:
-                logger.info(f"Profile with role '{role}' updated successfully.")
+                logger.info("Profile with role '%s' updated successfully.", role)
                 return{"message": "Profile updated successfully."},  200
-            logger.warning(f"No changes made to profile with role '{role}'.")
+            logger.warning("No changes made to profile with role '%s'.", role)
             return{"message": "No changes made to the profile."},  200
         except Exception as e:
-            logger.exception(f"Exception during profile update: {e}")
+            logger.exception("Exception during profile update: %s", e)
             return{"error": "Failed to update profile."},  500  # Internal Server Error
 
     @staticmethod
@@ -145,21 +297,19 @@ class Profile:
         """
         try:
             result = profiles_collection.update_one({"role": role}, {"$set": {"suspended": True}})
-            print(result)
+            Profile.profiles_changed()
             if result.modified_count > 0:
-                logger.info(f"Profile with role '{role}' suspended successfully.")
+                logger.info("Profile with role '%s' suspended successfully.", role)
                 # Suspend all users with this role
-                print("A")
                 suspend_result = User.suspend_users_by_role(role)
-                print(suspend_result)
                 if suspend_result[1] == 200:
                     return{"message": "Profile and associated users suspended successfully."},  200
-                logger.warning(f"Profile suspended but failed to suspend users with role '{role}'.")
+                logger.warning("Profile suspended but failed to suspend users with role '%s'.", role)
                 return{"error": "Profile suspended but failed to suspend associated users."},  500
-            logger.warning(f"Profile with role '{role}' not found for suspension.")
+            logger.warning("Profile with role '%s' not found for suspension.", role)
             return{"error": "Profile not found."},  404 # Not Found
         except Exception as e:
-            logger.exception(f"Exception during suspending profile '{role}': {e}")
+            logger.exception("Exception during suspending profile '%s': %s", role, e)
             return{"error": "Failed to suspend profile."},  500  # Internal Server Error
 
     @staticmethod
@@ -169,22 +319,21 @@ class Profile:
         Also re-enables all users with this role.
         Returns a dictionary with 'data' and 'status_code'.
         """
-        print("hello")
         try:
             result = profiles_collection.update_one({"role": role}, {"$set": {"suspended": False}}) 
+            Profile.profiles_changed()
             if result.modified_count > 0:
-                logger.info(f"Profile with role '{role}' re-enabled successfully.")
+                logger.info("Profile with role '%s' re-enabled successfully.", role)
                 # Re-enable all users with this role
                 reenable_result = User.reenable_users_by_role(role) 
-                print(f're result {reenable_result}')
                 if reenable_result[1] == 200:
                     return{"message": "Profile and associated users re-enabled successfully."},  200
-                logger.warning(f"Profile re-enabled but failed to re-enable users with role '{role}'.")
+                logger.warning("Profile re-enabled but failed to re-enable users with role '%s'.", role)
                 return{"error": "Profile re-enabled but failed to re-enable associated users."},  500
-            logger.warning(f"Profile with role '{role}' not found for re-enabling.")
+            logger.warning("Profile with role '%s' not found for re-enabling.", role)
             return{"error": "Profile not found."},  404  # Not Found
         except Exception as e:
-            logger.exception(f"Exception during re-enabling profile '{role}': {e}")
+            logger.exception("Exception during re-enabling profile '%s': %s", role, e)
             return{"error": "Failed to re-enable profile."},  500  # Internal Server Error
 
     @staticmethod
@@ -202,8 +351,8 @@ class Profile:
                 {"rights": {"$regex": query, "$options": "i"}}
             ]})
             serialized_profiles = serialize_profiles(cursor)
-            logger.info(f"Search completed for profiles with query: '{query}'")
+            logger.info("Search completed for profiles with query: '%s'", query)
             return{"profiles": serialized_profiles},  200 # OK
         except Exception as e:
-            logger.exception(f"Exception during searching profiles with query '{query}': {e}")
+            logger.exception("Exception during searching profiles with query '%s': %s", query, e)
             return{"error": "Failed to search profiles."},  500  # Internal Server Error
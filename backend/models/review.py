@@ -1,32 +1,107 @@
 # backend/models/review_model.py
 
+import logging
+import os
+import threading
 from utils.db import db
 from bson import ObjectId
 from bson.errors import InvalidId
 from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from models.user import User
+from utils.pagination import parse_limit, parse_page_limit, page_response, paginate_by_id, paginate_by_key
+from utils.ratings import (
+    RATING_SUMMARIES_COLLECTION, LEADERBOARDS_COLLECTION, AGENT_LEADERBOARD_ID, LEADERBOARD_SIZE,
+    rating_update, reconcile_rating_summaries, refresh_agent_leaderboard, summarize
+)
+
+logger = logging.getLogger(__name__)
 
 reviews_collection = db['reviews']
 used_car_collection = db['used_car_listings']  # Importing the used_car_listings collection
+rating_summaries_collection = db[RATING_SUMMARIES_COLLECTION]
+leaderboards_collection = db[LEADERBOARDS_COLLECTION]
+
+# Review orders accepted by view_reviews: 'recent' pages by _id (creation time),
+# 'rating' by rating then _id, both descending
+REVIEW_SORTS = ('recent', 'rating')
+# Sort of an unpaginated review listing for each of REVIEW_SORTS
+REVIEW_ORDERS = {'recent': [("_id", -1)], 'rating': [("rating", -1), ("_id", -1)]}
+
+DEFAULT_LEADERBOARD_LIMIT = 10
+# A leaderboard older than this is recomputed by the next reader
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv('LEADERBOARD_REFRESH_SECONDS', '300'))
+_leaderboard_refresh = threading.Lock()
 
 
 
 def serialize_review(review):
     if not review:
         return None
-    review['_id'] = str(review['_id'])
-    review['created_at'] = review['created_at'].isoformat() if review.get('created_at') else None
+    # ObjectId and datetime values are encoded by the app's JSON provider
+    review.setdefault('created_at', None)
     return review
 
 def serialize_reviews(reviews):
     return [serialize_review(review) for review in reviews]
 
+def parse_review_query(sort, limit, cursor):
+    """
+    Validates the raw 'sort', 'limit' and 'cursor' values of an agent's review listing.
+    Returns the page size, or None for every review; raises ValueError.
+    """
+    limit = parse_page_limit(limit, cursor)
+    if sort is not None and sort not in REVIEW_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(REVIEW_SORTS)}.")
+    return limit
+
+def reviews_response(reviews, summary, limit, next_cursor=None):
+    """
+    Shapes the view_reviews response: the reviews (and next_cursor when paged)
+    followed by the agent's rating summary.
+    """
+    return {**page_response("reviews", reviews, limit, next_cursor), **summarize(summary)}
+
 class Review:
+    @staticmethod
+    def apply_rating_change(agent_id, old_rating=None, new_rating=None):
+        """
+        Moves one review's contribution in the agent's rating summary from
+        `old_rating` to `new_rating` with a single atomic update. A failure is
+        logged and left for reconcile_rating_summaries to repair, so it never
+        fails the review write itself.
+        """
+        update = rating_update(old_rating, new_rating)
+        if update is None or agent_id is None:
+            return
+        try:
+            rating_summaries_collection.update_one({"_id": agent_id}, update, upsert=True)
+        except Exception as e:
+            logger.exception("Failed to update rating summary of agent %s: %s", agent_id, e)
+
+    @staticmethod
+    def reconcile_rating_summaries(agent_ids=None):
+        """
+        Rebuilds rating summaries from the reviews collection, for the given
+        agents or for every agent. Returns the number of summaries rebuilt.
+        """
+        return reconcile_rating_summaries(db, agent_ids)
+
+    @staticmethod
+    def get_rating_summary(agent_id):
+        """
+        Reads an agent's rating summary with a single point read.
+        Returns the raw summary document, or None if the agent has no reviews.
+        """
+        return rating_summaries_collection.find_one({"_id": agent_id})
+
     @staticmethod
     def rate_and_review_agent(role, user_id, listing_id, data):
         """
         Handles the logic for rating and reviewing an agent based on user_id and listing_id.
-        Validates input, fetches agent_id from listing, and creates a review entry.
+        Validates input, fetches agent_id from listing, and creates a review entry
+        with one conditional upsert; a repeat submission is reported from its result.
         Returns a tuple of (response_dict, status_code).
         """
         try:
@@ -51,21 +126,14 @@ class Review:
             if not isinstance(rating, (int, float)) or not (1 <= rating <= 5):
                 return {"error": "Rating must be a number between 1 and 5."}, 400
 
-            # Validate user_id and listing_id
+            # Validate listing_id
             try:
-                user_oid = user_id
-                listing_id_str = listing_id
                 listing_oid = ObjectId(listing_id)
-            except (InvalidId, TypeError) as e:
-                return {"error": "Invalid user_id or listing_id format."}, 400
+            except (InvalidId, TypeError):
+                return {"error": "Invalid listing_id format."}, 400
 
-            # Fetch the user
-            user = User.get_user_by_id(user_oid)
-            if not user:
-                return {"error": "User not found."}, 404
-
-            # Fetch the listing
-            listing = used_car_collection.find_one({"_id": listing_oid})
+            # Fetch the listing's agent
+            listing = used_car_collection.find_one({"_id": listing_oid}, {"agent_id": 1})
             if not listing:
                 return {"error": "Listing not found."}, 404
 
@@ -74,40 +142,49 @@ class Review:
                 return {"error": "Agent associated with the listing not found."}, 404
 
             # # Prevent users from reviewing themselves if agent_id and user_id are the same
-            # if agent_id == user_oid:
+            # if agent_id == user_id:
             #     return {"error": "You cannot review yourself."}, 403
-                
-            # Check if the combination of agent_id, listing_id, and reviewer_id already exists
-            existing_review = reviews_collection.find_one({
-                "agent_id": agent_id,
-                "listing_id": listing_oid,
-                "reviewer_id": user_oid
-            })
-            if existing_review:
-                logger.warning(f"User {user_id} has already reviewed agent {agent_id} for listing {listing_id}.")
-                return {"error": "You have already reviewed this agent for this listing."}, 400
 
-            # Create the review entry
-            review = {
+            # Create the review unless this user already reviewed this agent for this listing
+            review_key = {
                 "agent_id": agent_id,
-                "reviewer_id": user_oid,
+                "listing_id": listing_id,
+                "reviewer_id": user_id
+            }
+            review = {
                 "reviewer_role": role,  # 'buyer' or 'seller'
                 "rating": rating,
                 "review": review_text,
-                "listing_id": listing_id_str,
                 "created_at": datetime.utcnow()
             }
+            if not Review.create_review_once(review_key, review):
+                logger.warning("User %s has already reviewed agent %s for listing %s.", user_id, agent_id, listing_id)
+                return {"error": "You have already reviewed this agent for this listing."}, 400
 
-            success = Review.create_review(review)
-            if success:
-                return {"success": True, "message": "Review created successfully."}, 201
-            else:
-                return {"success": False, "error": "Failed to create review."}, 500
+            return {"success": True, "message": "Review created successfully."}, 201
 
         except Exception as e:
-            logger.exception(f"Error in Review.rate_and_review_agent: {e}")
+            logger.exception("Error in Review.rate_and_review_agent: %s", e)
             return {"error": "An error occurred while processing the review."}, 500
 
+    @staticmethod
+    def create_review_once(review_key, review_data):
+        """
+        Creates a review with a single conditional upsert on `review_key`
+        (agent_id, listing_id and reviewer_id), which the
+        agent_listing_reviewer_unique index makes atomic: of concurrent
+        submissions exactly one inserts, the others match it or hit the index.
+        Returns True if the review was created, False if it already existed.
+        """
+        try:
+            result = reviews_collection.update_one(review_key, {"$setOnInsert": review_data}, upsert=True)
+        except DuplicateKeyError:
+            return False
+        if result.upserted_id is None:
+            return False
+        Review.apply_rating_change(review_key['agent_id'], new_rating=review_data.get('rating'))
+        return True
+
     @staticmethod
     def create_review(review_data):
         """
@@ -116,61 +193,138 @@ class Review:
         """
         try:
             result = reviews_collection.insert_one(review_data)
-            return result.inserted_id is not None
+            if result.inserted_id is None:
+                return False
+            if isinstance(review_data.get('rating'), (int, float)):
+                Review.apply_rating_change(review_data.get('agent_id'), new_rating=review_data['rating'])
+            return True
         except Exception as e:
-            logger.exception(f"Error creating review: {e}")
+            logger.exception("Error creating review: %s", e)
             return False
 
     @staticmethod
-    def get_reviews_and_average(agent_id):
+    def get_reviews_and_average(agent_id, sort=None, limit=None, cursor=None):
         """
-        Retrieves all reviews and calculates the average rating for a specific agent.
+        Retrieves the reviews and the rating summary (average, count and 1-5 star
+        histogram) of a specific agent. The summary is a single point read; the
+        agent lookup is only needed when the agent has no reviews yet.
+        `sort` ('recent' or 'rating'), `limit` and `cursor` are the raw
+        query-string values; without a limit or cursor every review is returned.
         Returns a tuple of (response_dict, status_code).
         """
         try:
-            # Verify agent existence
-            agent = User.get_user_by_id(agent_id)
-            if not agent:
-                return {"error": "Agent not found."}, 404  # Not Found
+            limit = parse_review_query(sort, limit, cursor)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            summary = Review.get_rating_summary(agent_id)
+            if summary is None:
+                # Verify agent existence
+                _, agent_status = User.get_user_by_id(agent_id)
+                if agent_status != 200:
+                    return {"error": "Agent not found."}, 404  # Not Found
+
+            if limit is None:
+                reviews = Review.get_reviews_for_agent(agent_id, sort)
+                return reviews_response(reviews, summary, limit), 200
 
-            reviews = Review.get_reviews_for_agent(agent_id)
-            average_rating = Review.get_average_rating(agent_id)
-            return {"reviews": reviews, "average_rating": average_rating}, 200
+            try:
+                reviews, next_cursor = Review.get_review_page(agent_id, sort, limit, cursor)
+            except ValueError as e:
+                logger.warning("Invalid cursor: %s", cursor)
+                return {"error": str(e)}, 400  # Bad Request
+            return reviews_response(reviews, summary, limit, next_cursor), 200
 
         except Exception as e:
-            logger.exception(f"Error in Review.get_reviews_and_average: {e}")
+            logger.exception("Error in Review.get_reviews_and_average: %s", e)
             return {"error": "An error occurred while retrieving reviews."}, 500
 
     @staticmethod
-    def get_reviews_for_agent(agent_id):
+    def get_reviews_for_agent(agent_id, sort=None):
         """
-        Retrieves all reviews associated with a specific agent.
+        Retrieves all reviews associated with a specific agent, in `sort` order
+        if one is given.
         Returns a list of review dictionaries.
         """
         try:
             reviews = reviews_collection.find({"agent_id": agent_id})
+            if sort in REVIEW_ORDERS:
+                reviews = reviews.sort(REVIEW_ORDERS[sort])
             return serialize_reviews(reviews)
         except Exception as e:
-            logger.exception(f"Error fetching reviews for agent {agent_id}: {e}")
+            logger.exception("Error fetching reviews for agent %s: %s", agent_id, e)
             return []
 
+    @staticmethod
+    def get_review_page(agent_id, sort, limit, cursor=None):
+        """
+        Retrieves one keyset page of an agent's reviews, newest first or, with
+        sort='rating', highest rated first. Each page is a range scan on the
+        agent_id_id or agent_id_rating_id index.
+        Returns a tuple of (reviews, next_cursor); raises ValueError on a bad cursor.
+        """
+        if sort == 'rating':
+            reviews, next_cursor = paginate_by_key(reviews_collection, {"agent_id": agent_id}, 'rating', limit, cursor)
+        else:
+            reviews, next_cursor = paginate_by_id(reviews_collection, {"agent_id": agent_id}, limit, cursor)
+        return serialize_reviews(reviews), next_cursor
+
+    @staticmethod
+    def get_top_agents(limit=None):
+        """
+        Returns the top agents by Bayesian average rating from the precomputed
+        leaderboard: one point read, recomputed from the rating summaries when
+        it is older than LEADERBOARD_REFRESH_SECONDS. While one request
+        refreshes, others in the process keep serving the previous ranking,
+        which is also served if the refresh fails.
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            limit = parse_limit(limit, DEFAULT_LEADERBOARD_LIMIT)
+            if limit > LEADERBOARD_SIZE:
+                raise ValueError(f"limit must be between 1 and {LEADERBOARD_SIZE}.")
+        except ValueError as e:
+            logger.warning("Invalid leaderboard limit: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        try:
+            leaderboard = leaderboards_collection.find_one(
+                {"_id": AGENT_LEADERBOARD_ID}, {"entries": {"$slice": limit}, "refreshed_at": 1}
+            )
+            stale = leaderboard is None or (
+                (datetime.utcnow() - leaderboard['refreshed_at']).total_seconds() > LEADERBOARD_REFRESH_SECONDS
+            )
+            # Only wait for another thread's refresh when there is nothing to serve yet
+            if stale and _leaderboard_refresh.acquire(blocking=leaderboard is None):
+                try:
+                    leaderboard = refresh_agent_leaderboard(db)
+                except Exception as e:
+                    if leaderboard is None:
+                        raise
+                    # A stale ranking beats an error; the next reader retries the refresh
+                    logger.exception("Failed to refresh the agent leaderboard, serving the stale one: %s", e)
+                finally:
+                    _leaderboard_refresh.release()
+            return {
+                "agents": leaderboard['entries'][:limit],
+                "refreshed_at": leaderboard['refreshed_at'],
+            }, 200
+        except Exception as e:
+            logger.exception("Error in Review.get_top_agents: %s", e)
+            return {"error": "An error occurred while retrieving the agent leaderboard."}, 500
+
     @staticmethod
     def get_average_rating(agent_id):
         """
-        Calculates the average rating for a specific agent.
-        Returns the average rating as a float rounded to 2 decimal places, or None if no reviews exist.
+        Returns the average rating of a specific agent from its rating summary,
+        rounded to 2 decimal places, or None if no reviews exist.
         """
         try:
-            pipeline = [
-                {"$match": {"agent_id": agent_id}},
-                {"$group": {"_id": "$agent_id", "average_rating": {"$avg": "$rating"}}}
-            ]
-            result = list(reviews_collection.aggregate(pipeline))
-            if result:
-                return round(result[0]['average_rating'], 2)
-            return None
+            return summarize(Review.get_rating_summary(agent_id))["average_rating"]
         except Exception as e:
-            logger.exception(f"Error calculating average rating for agent {agent_id}: {e}")
+            logger.exception("Error calculating average rating for agent %s: %s", agent_id, e)
             return None
     @staticmethod
     def edit_review_agent(review_id, data):
@@ -225,18 +379,29 @@ class Review:
                 "review": review_text, 
             }
 
-            # Update the review in the database
-            result = reviews_collection.update_one(
+            # Update the review, reading back the rating it replaced atomically so
+            # concurrent edits each move the agent's summary by their own delta
+            previous = reviews_collection.find_one_and_update(
                 {"_id": review_obj_id},
-                {"$set": update_fields}
+                {"$set": update_fields},
+                projection={"agent_id": 1, "rating": 1, "review": 1},
+                return_document=ReturnDocument.BEFORE
             )
+            if previous is None:
+                return {"error": "Review not found."}, 404
 
-            if result.modified_count > 0:
+            if previous.get('rating') != rating or previous.get('review') != review_text:
+                old_rating = previous.get('rating')
+                Review.apply_rating_change(
+                    previous.get('agent_id'),
+                    old_rating if isinstance(old_rating, (int, float)) else None,
+                    rating
+                )
                 return {"success": True, "message": "Review updated successfully."}, 200
             else:
                 return {"success": False, "message": "No changes made to the review."}, 200
 
         except Exception as e:
-            logging.exception(f"Error in Review.edit_review_agent: {e}")
+            logger.exception("Error in Review.edit_review_agent: %s", e)
             return {"error": "An error occurred while editing the review."}, 500
 
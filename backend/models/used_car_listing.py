@@ -1,37 +1,174 @@
 import logging
-from utils.db import db
+import os
+import time
+from utils.db import db, read_db
+from utils.counters import CounterBuffer
 from bson import ObjectId
 from bson.errors import InvalidId
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from marshmallow import Schema, fields, ValidationError, validates_schema
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, parse_limit, parse_fields, build_projection, page_response, paginate_by_id
+)
+from utils.analytics import GRANULARITIES, bucket_start, parse_series_range, parse_timestamp, rollup
+from utils.export import EXPORT_BATCH_SIZE, ndjson_chunks
+from utils.bulk_import import chunked
+from utils.cache import make_cache, cache_key
+from utils.versions import bump_version, get_versions, make_etag
+from utils.logging_config import sampled
+from utils.search import (
+    SEARCHABLE_FIELDS, listing_search_tokens, query_filter, range_filters,
+    facet_pipeline, format_facets
+)
+from models.buyer_listing import BuyerListing, SUMMARY_FIELDS as SHORTLIST_SUMMARY_FIELDS
 
-# Configure Logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 used_car_collection = db['used_car_listings']
 reviews_collection = db['reviews']  # Added Reviews Collection
 users_collection = db['users']      # Added Users Collection
+listing_metrics_collection = db['listing_metrics']  # Hourly/daily view and shortlist buckets
+
+# Secondary-preferred handles for search, browse and analytics reads
+used_car_read_collection = read_db['used_car_listings']
+listing_metrics_read_collection = read_db['listing_metrics']
+
+# Hourly buckets expire after this many days; daily buckets are kept
+HOURLY_METRICS_RETENTION_DAYS = int(os.getenv('HOURLY_METRICS_RETENTION_DAYS', '90'))
+
+# Rows validated and written per insert_many in bulk imports, and the most
+# per-row errors a bulk import response reports
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '1000'))
+MAX_REPORTED_ROW_ERRORS = 1000
+
+# Read-through cache for listing reads; listing writes invalidate both namespaces.
+# Buffered view/shortlist counts can lag in cached responses by up to the TTL.
+# Entries are counted, not sized, so only pages of up to DEFAULT_PAGE_SIZE listings go in.
+listing_cache = make_cache('listings', max_entries=2048, default_ttl=60)
+LISTINGS_NAMESPACE = 'listings'
+SELLER_METRICS_NAMESPACE = 'seller_metrics'
+SELLER_METRICS_CACHE_TTL = float(os.getenv('SELLER_METRICS_CACHE_TTL', '5'))
+
+# Version counters behind the ETags of listing responses: content writes bump the
+# first, counter flushes the second (list and detail payloads carry the counts)
+LISTINGS_VERSION = 'used_car_listings'
+LISTING_COUNTERS_VERSION = 'listing_counters'
+
+# Counter flushes run about once a second, so each process bumps the counters
+# version at most this often; the list ETag, and the 304s of dashboards polling
+# it, can therefore lag view/shortlist counts by up to this many seconds.
+COUNTERS_VERSION_INTERVAL = float(os.getenv('COUNTERS_VERSION_INTERVAL', '60'))
+_counters_version_bumped_at = None
+
+# Listings version this process's cached listing reads were taken under
+_cached_listings_version = None
+
+# View/shortlist counters are buffered and written behind unless disabled
+COUNTER_WRITE_BEHIND = os.getenv('COUNTER_WRITE_BEHIND', 'true').lower() == 'true'
+listing_counters = CounterBuffer(
+    used_car_collection,
+    flush_interval_ms=int(os.getenv('COUNTER_FLUSH_INTERVAL_MS', '1000')),
+    max_events=int(os.getenv('COUNTER_FLUSH_MAX_EVENTS', '500')),
+    on_flush=lambda batch, flushed_at: UsedCarListing.counters_flushed(batch, flushed_at),
+    touch_field='counted_at'
+)
 
 def serialize_listing(listing):
     if not listing:
         return None
-    listing['_id'] = str(listing['_id'])
-    listing['agent_id'] = str(listing['agent_id']) if listing.get('agent_id') else None
-    listing['seller_id'] = str(listing['seller_id']) if listing.get('seller_id') else None
-    listing['created_at'] = listing['created_at'].isoformat() if listing.get('created_at') else None
+    # ObjectId and datetime values are encoded by the app's JSON provider
+    listing.setdefault('agent_id', None)
+    listing.setdefault('seller_id', None)
+    listing.setdefault('created_at', None)
     listing['views'] = listing.get('views', 0)  # Ensure views are included
     listing['shortlists'] = listing.get('shortlists', 0)  # Ensure shortlists are included
-    logger.debug(f"Serialized listing: {listing}")
+    listing.pop('search_tokens', None)  # Internal search index field
     return listing
 
 def serialize_listings(listings):
     return [serialize_listing(listing) for listing in listings]
 
+# Fields a client may request through the 'fields' projection parameter
+LISTING_FIELDS = (
+    'make', 'model', 'year', 'price', 'agent_id', 'seller_id',
+    'views', 'shortlists', 'suspended', 'created_at', 'updated_at'
+)
+
+def project_listing(listing, requested_fields):
+    """
+    Drops the defaults serialize_listing fills in for fields that were not requested.
+    """
+    if not requested_fields:
+        return listing
+    return {key: value for key, value in listing.items() if key == '_id' or key in requested_fields}
+
+def parse_listing_query(limit, cursor, fields):
+    """
+    Validates the raw 'limit', 'cursor' and 'fields' values of a listing query.
+    Listing queries are always paged, by DEFAULT_PAGE_SIZE when no limit is given.
+    Returns (limit, requested_fields); raises ValueError.
+    """
+    return parse_limit(limit, DEFAULT_PAGE_SIZE), parse_fields(fields, LISTING_FIELDS)
+
+def listings_response(listings, requested_fields, limit, next_cursor=None):
+    """
+    Shapes a listing query response from the raw listing documents.
+    """
+    serialized = [project_listing(listing, requested_fields) for listing in serialize_listings(listings)]
+    return page_response("listings", serialized, limit, next_cursor)
+
+def cacheable_page(response):
+    """
+    Whether a listing page is small enough for listing_cache, which bounds its
+    entries by count rather than bytes: pages above DEFAULT_PAGE_SIZE are not cached.
+    """
+    return len(response["listings"]) <= DEFAULT_PAGE_SIZE
+
+def parse_listing_id(listing_id):
+    """
+    Returns the ObjectId of a listing_id parameter; raises ValueError with the
+    client-facing message if it is missing or malformed.
+    """
+    if not listing_id:
+        raise ValueError("Missing 'listing_id'.")
+    try:
+        return ObjectId(listing_id)
+    except (InvalidId, TypeError) as e:
+        raise ValueError("Invalid 'listing_id'.") from e
+
+# What get_listing_validators reads of a listing
+VALIDATOR_PROJECTION = {"updated_at": 1, "counted_at": 1, "views": 1, "shortlists": 1}
+
+def listing_validators(listing_id, listing):
+    """
+    Returns (etag, last_modified) for a listing read with VALIDATOR_PROJECTION,
+    or (None, None) if it does not exist.
+    """
+    if not listing:
+        return None, None
+    stamps = [stamp for stamp in (listing.get('updated_at'), listing.get('counted_at')) if stamp]
+    last_modified = max(stamps) if stamps else None
+    etag = make_etag('listing', listing_id, listing.get('updated_at'), listing.get('counted_at'),
+                     listing.get('views', 0), listing.get('shortlists', 0))
+    return etag, last_modified
+
+def counter_update(field):
+    """
+    Returns the update applied by an unbuffered view/shortlist increment.
+    """
+    return {"$inc": {field: 1}, "$currentDate": {"counted_at": True}}
+
+def tracked_response(label, listing_id):
+    """
+    Acknowledges a tracked view/shortlist. Tracking is the busiest write path,
+    so per-event logs are sampled debug output.
+    """
+    if logger.isEnabledFor(logging.DEBUG) and sampled():
+        logger.debug("%s tracked for listing_id: %s", label.capitalize(), listing_id)
+    return {"success": True}, 200
+
 class CreateListingSchema(Schema):
     agent_id = fields.Str(required=True, validate=lambda x: ObjectId.is_valid(x))
     seller_id = fields.Str(required=True, validate=lambda x: ObjectId.is_valid(x))
@@ -64,7 +201,90 @@ class UpdateListingSchema(Schema):
     # shortlists = fields.Int()
     # Add other fields that can be updated
 
+def prepare_listing(validated_data, now=None):
+    """
+    Fills in the server-maintained fields of a validated new listing:
+    zeroed counters, created_at/updated_at and the search tokens.
+    """
+    now = now or datetime.utcnow()
+    validated_data.setdefault('views', 0)
+    validated_data.setdefault('shortlists', 0)
+    validated_data['created_at'] = now
+    validated_data['updated_at'] = now
+    validated_data['search_tokens'] = listing_search_tokens(validated_data)
+    return validated_data
+
+
 class UsedCarListing:
+    @staticmethod
+    def listings_changed():
+        """
+        Records that a listing was created, changed or deleted: drops cached
+        listing reads and bumps the listings version behind the ETags.
+        A failed bump is logged rather than failing the write that caused it.
+        """
+        listing_cache.invalidate(LISTINGS_NAMESPACE)
+        listing_cache.invalidate(SELLER_METRICS_NAMESPACE)
+        try:
+            bump_version(LISTINGS_VERSION)
+        except Exception as e:
+            logger.exception("Failed to bump listings version: %s", e)
+
+    @staticmethod
+    def observe_listings_version(version):
+        """
+        Drops this process's cached listing reads when `version`, the listings
+        version just read, differs from the one they were cached under, so a
+        write in another worker reaches this one at its next ETag check.
+        """
+        global _cached_listings_version
+        if version != _cached_listings_version:
+            listing_cache.invalidate(LISTINGS_NAMESPACE)
+            listing_cache.invalidate(SELLER_METRICS_NAMESPACE)
+            _cached_listings_version = version
+
+    @staticmethod
+    def counters_flushed(batch, flushed_at):
+        """
+        Flush hook of listing_counters: feeds the metric buckets and, at most
+        every COUNTERS_VERSION_INTERVAL seconds, bumps the counters version,
+        since list responses carry the counts. A failed bump is logged so it
+        never costs the batch its buckets.
+        """
+        global _counters_version_bumped_at
+        UsedCarListing.record_metric_buckets(batch, flushed_at)
+        now = time.monotonic()
+        if _counters_version_bumped_at is not None and now - _counters_version_bumped_at < COUNTERS_VERSION_INTERVAL:
+            return
+        try:
+            bump_version(LISTING_COUNTERS_VERSION)
+            _counters_version_bumped_at = now
+        except Exception as e:
+            logger.exception("Failed to bump listing counters version: %s", e)
+
+    @staticmethod
+    def get_listings_validator(*request_args):
+        """
+        Returns the current ETag of the listing collection views, for the given
+        request arguments, from one read of the version counters. The same read
+        brings this process's listing cache up to date with other workers' writes.
+        """
+        versions = get_versions(LISTINGS_VERSION, LISTING_COUNTERS_VERSION)
+        UsedCarListing.observe_listings_version(versions[LISTINGS_VERSION])
+        return make_etag('listings', versions, request_args)
+
+    @staticmethod
+    def get_listing_validators(listing_id):
+        """
+        Returns (etag, last_modified) for one listing from a projection of its
+        update time and counters, or (None, None) if it does not exist.
+        """
+        try:
+            oid = parse_listing_id(listing_id)
+        except ValueError:
+            return None, None
+        return listing_validators(listing_id, used_car_collection.find_one({"_id": oid}, VALIDATOR_PROJECTION))
+
     @staticmethod
     def create_listing(listing_data):
         """
@@ -79,20 +299,18 @@ class UsedCarListing:
         schema = CreateListingSchema()
         try:
             validated_data = schema.load(listing_data)
-            logger.debug(f"Validated data: {validated_data}")
+            logger.debug("Validated data: %s", validated_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during listing creation: {err.messages}")
+            logger.warning("Validation errors during listing creation: %s", err.messages)
             return {"error": err.messages}, 400  # Bad Request
 
-        # Initialize views and shortlists to 0 if not provided
-        validated_data.setdefault('views', 0)
-        validated_data.setdefault('shortlists', 0)
-        validated_data['created_at'] = datetime.utcnow()
+        prepare_listing(validated_data)
          
         try:
             result = used_car_collection.insert_one(validated_data)
+            UsedCarListing.listings_changed()
             if result.inserted_id:
-                logger.info(f"Listing created successfully with ID: {result.inserted_id}")
+                logger.info("Listing created successfully with ID: %s", result.inserted_id)
                 return {
                     "message": "Listing created successfully.",
                     "listing_id": str(result.inserted_id)
@@ -100,26 +318,144 @@ class UsedCarListing:
             logger.error("Failed to create listing without exception.")
             return {"error": "Failed to create listing."}, 500  # Internal Server Error
         except Exception as e:
-            logger.exception(f"Exception during listing creation: {e}")
+            logger.exception("Exception during listing creation: %s", e)
             return {"error": "An error occurred while creating the listing."}, 500  # Internal Server Error
 
     @staticmethod
-    def get_all_listings():
+    def bulk_create_listings(rows, ordered=False):
+        """
+        Imports many listings at once. `rows` yields (row_number, row_dict, parse_error)
+        as produced by utils.bulk_import.parse_rows. Rows are validated with
+        CreateListingSchema(many=True) and written with insert_many, both in chunks of
+        BULK_IMPORT_CHUNK_SIZE. Unordered imports skip bad rows and keep going; ordered
+        imports stop at the first bad row, keeping the rows before it.
+        Returns a tuple of (response_dict, status_code) with inserted/failed counts and
+        per-row errors.
         """
-        Retrieves all used car listings.
+        schema = CreateListingSchema(many=True)
+        inserted = failed = 0
+        row_errors = []
+
+        def reject(row_number, errors):
+            nonlocal failed
+            failed += 1
+            if len(row_errors) < MAX_REPORTED_ROW_ERRORS:
+                row_errors.append({"row": row_number, "errors": errors})
+
+        try:
+            for chunk in chunked(rows, BULK_IMPORT_CHUNK_SIZE):
+                candidates = []
+                for row_number, row, parse_error in chunk:
+                    if parse_error:
+                        reject(row_number, parse_error)
+                    else:
+                        candidates.append((row_number, row))
+
+                try:
+                    documents = schema.load([row for _, row in candidates])
+                    invalid = {}
+                except ValidationError as err:
+                    documents, invalid = err.valid_data, err.messages
+
+                now = datetime.utcnow()
+                valid = []
+                for index, (row_number, _) in enumerate(candidates):
+                    if index in invalid:
+                        reject(row_number, invalid[index])
+                    else:
+                        valid.append((row_number, prepare_listing(documents[index], now)))
+
+                if ordered and failed:
+                    # Keep only the rows that precede the first rejected one
+                    first_bad = min(error["row"] for error in row_errors)
+                    valid = [(row_number, document) for row_number, document in valid if row_number < first_bad]
+
+                if valid:
+                    try:
+                        result = used_car_collection.insert_many(
+                            [document for _, document in valid], ordered=ordered
+                        )
+                        inserted += len(result.inserted_ids)
+                    except BulkWriteError as bwe:
+                        inserted += bwe.details.get('nInserted', 0)
+                        for write_error in bwe.details.get('writeErrors', []):
+                            reject(valid[write_error['index']][0], write_error.get('errmsg'))
+                        if ordered:
+                            break
+
+                if ordered and failed:
+                    break
+        except Exception as e:
+            if inserted:
+                UsedCarListing.listings_changed()
+            logger.exception("Exception during bulk listing import: %s", e)
+            return {
+                "error": "An error occurred while importing listings.",
+                "inserted": inserted, "failed": failed, "errors": row_errors
+            }, 500  # Internal Server Error
+
+        if inserted:
+            UsedCarListing.listings_changed()
+        logger.info("Bulk import finished: %s inserted, %s failed.", inserted, failed)
+        row_errors.sort(key=lambda error: error["row"])
+        response = {"inserted": inserted, "failed": failed, "errors": row_errors}
+        if failed > len(row_errors):
+            response["errors_truncated"] = True
+        if inserted == 0 and failed:
+            return response, 400  # Bad Request
+        return response, 201 if not failed else 200
+
+    @staticmethod
+    def find_listings(mongo_query, limit=None, cursor=None, fields=None):
+        """
+        Runs a listing query as one keyset page with optional field projection.
+        Reads go to a secondary when one is available, so they may briefly lag writes.
+        `limit`, `cursor` and `fields` are the raw query-string values; without
+        a limit the page holds DEFAULT_PAGE_SIZE listings, and clients follow
+        next_cursor for the rest.
         Returns a tuple of (response_dict, status_code).
         """
         try:
-            listings = used_car_collection.find()
-            serialized = serialize_listings(listings)
-            logger.info("Retrieved all listings successfully.")
-            return {"listings": serialized}, 200
+            limit, requested_fields = parse_listing_query(limit, cursor, fields)
+        except ValueError as e:
+            logger.warning("Invalid pagination parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        projection = build_projection(requested_fields)
+        try:
+            listings, next_cursor = paginate_by_id(used_car_read_collection, mongo_query, limit, cursor, projection)
+        except ValueError as e:
+            logger.warning("Invalid cursor: %s", cursor)
+            return {"error": str(e)}, 400  # Bad Request
+        return listings_response(listings, requested_fields, limit, next_cursor), 200
+
+    @staticmethod
+    def get_all_listings(limit=None, cursor=None, fields=None):
+        """
+        Retrieves a page of used car listings, newest first.
+        Accepts optional 'limit', 'cursor' and 'fields' query parameters.
+        Cached entries are dropped by listing writes, in other workers once
+        they next check the listings version (see observe_listings_version).
+        Returns a tuple of (response_dict, status_code).
+        """
+        try:
+            key = cache_key('get_all_listings', limit, cursor, fields)
+            generation = listing_cache.generation(LISTINGS_NAMESPACE)
+            cached = listing_cache.get(LISTINGS_NAMESPACE, key)
+            if cached is not None:
+                return cached
+            response, status_code = UsedCarListing.find_listings({}, limit, cursor, fields)
+            if status_code == 200 and cacheable_page(response):
+                listing_cache.set(LISTINGS_NAMESPACE, key, (response, status_code), generation=generation)
+                if logger.isEnabledFor(logging.DEBUG) and sampled():
+                    logger.debug("Retrieved listings successfully.")
+            return response, status_code
         except Exception as e:
-            logger.exception(f"Exception during retrieving all listings: {e}")
+            logger.exception("Exception during retrieving all listings: %s", e)
             return {"error": "Failed to retrieve listings."}, 500  # Internal Server Error
 
     @staticmethod
-    def get_listing_by_id(listing_id):
+    def get_listing_by_id(listing_id, version=None):
         """
         Retrieves a listing by its listing_id.
         Returns a tuple of (response_dict, status_code).
@@ -129,21 +465,29 @@ class UsedCarListing:
             return {"error": "Missing 'listing_id' parameter."}, 400  # Bad Request
 
         try:
-            oid = ObjectId(listing_id)
-        except (InvalidId, TypeError) as e:
-            logger.error(f"Invalid listing_id format: {listing_id}. Error: {e}")
-            return {"error": "Invalid 'listing_id'."}, 400  # Bad Request
+            oid = parse_listing_id(listing_id)
+        except ValueError as e:
+            logger.warning("Invalid listing_id %s: %s", listing_id, e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        key = cache_key('get_listing_by_id', str(oid), version)
+        generation = listing_cache.generation(LISTINGS_NAMESPACE)
+        cached = listing_cache.get(LISTINGS_NAMESPACE, key)
+        if cached is not None:
+            return cached
 
         try:
             listing = used_car_collection.find_one({"_id": oid})
             if listing:
                 serialized = serialize_listing(listing)
-                logger.info(f"Retrieved listing with ID: {listing_id}")
+                if logger.isEnabledFor(logging.DEBUG) and sampled():
+                    logger.debug("Retrieved listing with ID: %s", listing_id)
+                listing_cache.set(LISTINGS_NAMESPACE, key, ({"listing": serialized}, 200), generation=generation)
                 return {"listing": serialized}, 200
-            logger.warning(f"Listing not found with ID: {listing_id}")
+            logger.warning("Listing not found with ID: %s", listing_id)
             return {"error": "Listing not found."}, 404  # Not Found
         except Exception as e:
-            logger.exception(f"Exception during retrieving listing by ID: {e}")
+            logger.exception("Exception during retrieving listing by ID: %s", e)
             return {"error": "Failed to retrieve listing."}, 500  # Internal Server Error
 
     @staticmethod
@@ -160,42 +504,56 @@ class UsedCarListing:
         schema = UpdateListingSchema()
         try:
             validated_data = schema.load(update_data)
-            logger.debug(f"Validated update data: {validated_data}")
+            logger.debug("Validated update data: %s", validated_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during listing update: {err.messages}")
+            logger.warning("Validation errors during listing update: %s", err.messages)
             return {"error": err.messages}, 400  # Bad Request
 
         try:
             oid = ObjectId(listing_id)
         except (InvalidId, TypeError) as e:
-            logger.warning(f"Invalid listing_id format: {listing_id}. Error: {e}")
+            logger.warning("Invalid listing_id format: %s. Error: %s", listing_id, e)
             return {"error": "Invalid 'listing_id'."}, 400  # Bad Request
 
         try:
             # Authorization: Ensure the agent owns the listing
             listing = used_car_collection.find_one({"_id": oid})
             if not listing:
-                logger.warning(f"Listing not found with ID: {listing_id}")
+                logger.warning("Listing not found with ID: %s", listing_id)
                 return {"error": "Listing not found."}, 404  # Not Found
 
             # Assuming agent_id is part of the update_data or already part of the listing
             # Modify this logic based on how you manage agent authentication
             agent_id = update_data.get('agent_id', str(listing.get('agent_id')))
             if agent_id and str(listing.get('agent_id')) != agent_id:
-                logger.warning(f"Agent {agent_id} does not own listing {listing_id}")
+                logger.warning("Agent %s does not own listing %s", agent_id, listing_id)
                 return {"error": "You do not have permission to update this listing."}, 403  # Forbidden
 
+            # Only fields that actually change are written, so updated_at moves only on real edits
+            changes = {field: value for field, value in validated_data.items() if listing.get(field) != value}
+            if not changes:
+                logger.warning("No changes made to listing with ID: %s", listing_id)
+                return {"message": "No changes made to the listing."}, 200
+
+            # Keep the search tokens in step with make/model/year
+            if any(field in changes for field in SEARCHABLE_FIELDS):
+                changes['search_tokens'] = listing_search_tokens({**listing, **changes})
+            changes['updated_at'] = datetime.utcnow()
+
             result = used_car_collection.update_one(
                 {"_id": oid},
-                {"$set": validated_data}
+                {"$set": changes}
             )
+            if any(field in changes for field in SHORTLIST_SUMMARY_FIELDS):
+                BuyerListing.listing_updated({**listing, **changes})
+            UsedCarListing.listings_changed()
             if result.modified_count > 0:
-                logger.info(f"Listing with ID {listing_id} updated successfully.")
+                logger.info("Listing with ID %s updated successfully.", listing_id)
                 return {"message": "Listing updated successfully."}, 200
-            logger.warning(f"No changes made to listing with ID: {listing_id}")
+            logger.warning("No changes made to listing with ID: %s", listing_id)
             return {"message": "No changes made to the listing."}, 200
         except Exception as e:
-            logger.exception(f"Exception during listing update: {e}")
+            logger.exception("Exception during listing update: %s", e)
             return {"error": "Failed to update listing."}, 500  # Internal Server Error
 
     @staticmethod
@@ -212,21 +570,21 @@ class UsedCarListing:
         try:
             oid = ObjectId(listing_id)
         except (InvalidId, TypeError) as e:
-            logger.warning(f"Invalid listing_id format: {listing_id}. Error: {e}")
+            logger.warning("Invalid listing_id format: %s. Error: %s", listing_id, e)
             return {"error": "Invalid 'listing_id'."}, 400  # Bad Request
 
         try:
             # Authorization: Ensure the agent owns the listing
             listing = used_car_collection.find_one({"_id": oid})
             if not listing:
-                logger.warning(f"Listing not found for deletion with ID: {listing_id}")
+                logger.warning("Listing not found for deletion with ID: %s", listing_id)
                 return {"error": "Listing not found."}, 404  # Not Found 
 
             # Assuming agent_id is provided as part of the deletion request
             # Modify this logic based on how you manage agent authentication
             agent_id = listing.get('agent_id')
             if not agent_id:
-                logger.warning(f"No agent_id associated with listing {listing_id}")
+                logger.warning("No agent_id associated with listing %s", listing_id)
                 return {"error": "Listing has no associated agent."}, 403  # Forbidden
 
             # If you have agent authentication, compare the authenticated agent_id with listing.agent_id
@@ -234,46 +592,86 @@ class UsedCarListing:
 
             result = used_car_collection.delete_one({"_id": oid})
             if result.deleted_count > 0:
-                logger.info(f"Listing with ID {listing_id} deleted successfully.")
+                BuyerListing.listing_deleted(oid)
+            UsedCarListing.listings_changed()
+            if result.deleted_count > 0:
+                logger.info("Listing with ID %s deleted successfully.", listing_id)
                 return {"message": "Listing deleted successfully."}, 200
-            logger.warning(f"Listing not found for deletion with ID: {listing_id}")
+            logger.warning("Listing not found for deletion with ID: %s", listing_id)
             return {"error": "Listing not found."}, 404  # Not Found
         except Exception as e:
-            logger.exception(f"Exception during listing deletion: {e}")
+            logger.exception("Exception during listing deletion: %s", e)
             return {"error": "Failed to delete listing."}, 500  # Internal Server Error
 
     @staticmethod
-    def search_listings(query):
+    def search_listings(query, limit=None, cursor=None, fields=None, filters=None):
         """
-        Searches listings based on a query string matching make, model, or year.
-        Validates input and performs the search.
+        Searches listings by prefix-matching each query term against the normalized
+        make/model/year tokens, optionally narrowed by the make, model, min_year,
+        max_year, min_price and max_price values in `filters`. With facets=true in
+        `filters`, the response also carries match counts by make, model and year.
+        Accepts the same pagination parameters as get_all_listings.
         Returns a tuple of (response_dict, status_code).
         """
-        if not query:
+        try:
+            clauses = range_filters(filters)
+        except ValueError as e:
+            logger.warning("Invalid search filters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        text_clause = query_filter(query)
+        if text_clause is None and not clauses:
             logger.warning("Search query parameter is missing.")
             return {"error": "Query parameter is required."}, 400  # Bad Request
+        if text_clause is not None:
+            clauses.insert(0, text_clause)
+        mongo_query = clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
         try:
-            listings = used_car_collection.find({
-                "$or": [
-                    {"make": {"$regex": query, "$options": "i"}},
-                    {"model": {"$regex": query, "$options": "i"}},
-                    {"year": {"$regex": query, "$options": "i"}}
-                ]
-            }) 
-            serialized = serialize_listings(listings) 
-            logger.info(f"Search completed for query: {query}")
-            return {"listings": serialized}, 200
+            response, status_code = UsedCarListing.find_listings(mongo_query, limit, cursor, fields)
+            if status_code != 200:
+                return response, status_code
+
+            if str((filters or {}).get('facets', '')).lower() in ('1', 'true', 'yes'):
+                facet_result = next(used_car_read_collection.aggregate(facet_pipeline(mongo_query)), None)
+                response['facets'] = format_facets(facet_result)
+
+            logger.info("Search completed for query: %s", query)
+            return response, status_code
         except Exception as e:
-            logger.exception(f"Exception during searching listings: {e}")
+            logger.exception("Exception during searching listings: %s", e)
             return {"error": "Failed to search listings."}, 500  # Internal Server Error
 
     @staticmethod
-    def search_cars(query):
+    def search_cars(query, limit=None, cursor=None, fields=None, filters=None):
         """
         Wrapper method for controller to search cars.
         """
-        return UsedCarListing.search_listings(query)
+        return UsedCarListing.search_listings(query, limit, cursor, fields, filters)
+
+    @staticmethod
+    def export_listings(updated_since=None):
+        """
+        Exports listings as NDJSON, ordered by update time, for bulk consumers.
+        With `updated_since` (an ISO 8601 query-string value) only listings
+        created or changed at or after that instant are included, so consumers
+        can pull incrementally. The cursor is read in EXPORT_BATCH_SIZE batches
+        and encoded chunk by chunk, so memory does not grow with the inventory.
+        Returns a tuple of (chunk iterator or error dict, status_code).
+        """
+        query = {}
+        if updated_since:
+            try:
+                query["updated_at"] = {"$gte": parse_timestamp(updated_since, 'updated_since')}
+            except ValueError as e:
+                logger.warning("Invalid export parameters: %s", e)
+                return {"error": str(e)}, 400  # Bad Request
+
+        cursor = used_car_read_collection.find(query, {"search_tokens": 0}) \
+            .sort([("updated_at", 1), ("_id", 1)]) \
+            .batch_size(EXPORT_BATCH_SIZE)
+        logger.info("Exporting listings updated since %s", updated_since or 'the beginning')
+        return ndjson_chunks(cursor, serialize_listing), 200
 
     @staticmethod
     def search_listings_with_query(mongo_query):
@@ -284,41 +682,50 @@ class UsedCarListing:
         try:
             listings = used_car_collection.find(mongo_query)
             serialized = serialize_listings(listings)
-            logger.info(f"Search completed for MongoDB query: {mongo_query}")
+            logger.info("Search completed for MongoDB query: %s", mongo_query)
             return {"listings": serialized}, 200
         except Exception as e:
-            logger.exception(f"Exception during advanced searching listings: {e}")
+            logger.exception("Exception during advanced searching listings: %s", e)
             return {"error": "Failed to search listings."}, 500  # Internal Server Error
 
     @staticmethod
-    def track_view(data):
+    def _increment_counter(data, field, label):
         """
-        Increments the view count for a listing.
-        Expects data to contain 'listing_id'.
+        Shared logic for track_view and track_shortlist. With write-behind enabled
+        the increment is buffered in listing_counters and acknowledged immediately;
+        increments for listings that do not exist are dropped by the flush.
         Returns a tuple of (response_dict, status_code).
         """
-        listing_id = data.get('listing_id')
-        if not listing_id:
-            logger.warning("Missing 'listing_id' in request data.")
-            return {"error": "Missing 'listing_id'."}, 400  # Bad Request
-
+        listing_id = (data or {}).get('listing_id')
         try:
-            # Update the used_car_collection by incrementing 'views'
-            result = used_car_collection.update_one(
-                {"_id": ObjectId(listing_id)},
-                {"$inc": {"views": 1}}
-            )
-
-            if result.matched_count == 0:
-                logger.warning(f"Listing with listing_id {listing_id} not found.")
-                return {"error": "Listing not found."}, 404  # Not Found
+            oid = parse_listing_id(listing_id)
+        except ValueError as e:
+            logger.warning("Invalid listing_id %s: %s", listing_id, e)
+            return {"error": str(e)}, 400  # Bad Request
 
-            logger.info(f"View tracked for listing_id: {listing_id}")
-            return {"success": True}, 200
+        try:
+            if COUNTER_WRITE_BEHIND:
+                listing_counters.increment(oid, field)
+            else:
+                result = used_car_collection.update_one({"_id": oid}, counter_update(field))
+                if result.matched_count == 0:
+                    logger.warning("Listing with listing_id %s not found.", listing_id)
+                    return {"error": "Listing not found."}, 404  # Not Found
+                UsedCarListing.counters_flushed({oid: {field: 1}}, datetime.utcnow())
+            return tracked_response(label, listing_id)
 
         except Exception as e:
-            logger.exception(f"Error tracking view for listing_id {listing_id}: {e}")
-            return {"success": False, "error": "Failed to track view."}, 500
+            logger.exception("Error tracking %s for listing_id %s: %s", label, listing_id, e)
+            return {"success": False, "error": f"Failed to track {label}."}, 500
+
+    @staticmethod
+    def track_view(data):
+        """
+        Increments the view count for a listing.
+        Expects data to contain 'listing_id'.
+        Returns a tuple of (response_dict, status_code).
+        """
+        return UsedCarListing._increment_counter(data, 'views', 'view')
 
     @staticmethod
     def track_shortlist(data):
@@ -327,33 +734,103 @@ class UsedCarListing:
         Expects data to contain 'listing_id'.
         Returns a tuple of (response_dict, status_code).
         """
-        listing_id = data.get('listing_id')
-        if not listing_id:
-            logger.warning("Missing 'listing_id' in request data.")
-            return {"error": "Missing 'listing_id'."}, 400  # Bad Request
+        return UsedCarListing._increment_counter(data, 'shortlists', 'shortlist')
 
-        try:
-            # Update the used_car_collection by incrementing 'shortlists'
-            result = used_car_collection.update_one(
-                {"_id": ObjectId(listing_id)},
-                {"$inc": {"shortlists": 1}}
-            )
+    @staticmethod
+    def record_metric_buckets(counts_by_listing, recorded_at):
+        """
+        Adds counter increments to the hourly and daily listing_metrics buckets
+        containing `recorded_at`. Seller ids are resolved with one query per call so
+        seller series can be read from the buckets alone; increments for listings
+        that no longer exist are skipped.
+        """
+        listing_ids = list(counts_by_listing.keys())
+        sellers = {
+            listing['_id']: listing.get('seller_id')
+            for listing in used_car_collection.find({"_id": {"$in": listing_ids}}, {"seller_id": 1})
+        }
+
+        operations = []
+        for listing_id, counts in counts_by_listing.items():
+            if listing_id not in sellers:
+                continue
+            for granularity in GRANULARITIES:
+                bucket = bucket_start(recorded_at, granularity)
+                on_insert = {"seller_id": sellers[listing_id]}
+                if granularity == 'hour':
+                    on_insert["expire_at"] = bucket + timedelta(days=HOURLY_METRICS_RETENTION_DAYS)
+                operations.append(UpdateOne(
+                    {"listing_id": listing_id, "granularity": granularity, "bucket": bucket},
+                    {"$inc": dict(counts), "$setOnInsert": on_insert},
+                    upsert=True
+                ))
+        if operations:
+            listing_metrics_collection.bulk_write(operations, ordered=False)
 
-            if result.matched_count == 0:
-                logger.warning(f"Listing with listing_id {listing_id} not found.")
-                return {"error": "Listing not found."}, 404  # Not Found
+    @staticmethod
+    def get_metrics_series(seller_id=None, listing_id=None, start=None, end=None, granularity=None):
+        """
+        Returns view/shortlist time series for one listing or for all listings of a
+        seller, read from listing_metrics with a single indexed query.
+        `start`, `end` and `granularity` ('hour' or 'day') are raw query-string values;
+        the default is daily buckets over the last 7 days.
+        Returns a tuple of (response_dict, status_code).
+        """
+        if not seller_id and not listing_id:
+            logger.warning("Missing 'seller_id' or 'listing_id' parameter.")
+            return {"error": "Either seller_id or listing_id is required."}, 400  # Bad Request
 
-            logger.info(f"Shortlist tracked for listing_id: {listing_id}")
-            return {"success": True}, 200
+        try:
+            start, end, granularity = parse_series_range(start, end, granularity)
+        except ValueError as e:
+            logger.warning("Invalid metrics series parameters: %s", e)
+            return {"error": str(e)}, 400  # Bad Request
+
+        query = {"granularity": granularity, "bucket": {"$gte": start, "$lte": end}}
+        if listing_id:
+            try:
+                query["listing_id"] = ObjectId(listing_id)
+            except (InvalidId, TypeError):
+                logger.warning("Invalid listing_id format: %s", listing_id)
+                return {"error": "Invalid 'listing_id'."}, 400  # Bad Request
+        else:
+            query["seller_id"] = seller_id
 
+        try:
+            buckets = listing_metrics_read_collection.find(
+                query, {"_id": 0, "listing_id": 1, "bucket": 1, "views": 1, "shortlists": 1}
+            )
+            per_listing, totals = rollup(buckets)
+            logger.info("Metrics series retrieved for %s %s",
+                        'listing' if listing_id else 'seller', listing_id or seller_id)
+            return {
+                "granularity": granularity,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "listings": per_listing,
+                "totals": totals
+            }, 200
         except Exception as e:
-            logger.exception(f"Error tracking shortlist for listing_id {listing_id}: {e}")
-            return {"success": False, "error": "Failed to track shortlist."}, 500
+            logger.exception("Error retrieving metrics series: %s", e)
+            return {"error": "Failed to retrieve metrics series."}, 500
+
+    @staticmethod
+    def live_counts(listing):
+        """
+        Returns the listing's views and shortlists including increments that are
+        still buffered, i.e. an approximation of the counts after the next flush.
+        """
+        pending = listing_counters.pending(listing.get('_id'))
+        return (
+            listing.get("views", 0) + pending.get("views", 0),
+            listing.get("shortlists", 0) + pending.get("shortlists", 0)
+        )
 
     @staticmethod
-    def get_metrics(listing_id):
+    def get_metrics(listing_id, live=False):
         """
         Retrieves metrics for a specific listing.
+        With `live`, buffered increments that have not been flushed are included.
         Returns a tuple of (response_dict, status_code).
         """
         if not listing_id:
@@ -363,72 +840,175 @@ class UsedCarListing:
         try:
             listing = used_car_collection.find_one({"_id": ObjectId(listing_id)})
             if listing:
+                views, shortlists = UsedCarListing.live_counts(listing) if live else (
+                    listing.get("views", 0), listing.get("shortlists", 0)
+                )
                 metrics = {
-                    "views": listing.get("views", 0),
-                    "shortlists": listing.get("shortlists", 0)
+                    "views": views,
+                    "shortlists": shortlists
                 }
-                logger.info(f"Metrics retrieved for listing_id: {listing_id}")
+                logger.info("Metrics retrieved for listing_id: %s", listing_id)
                 return {"metrics": metrics}, 200
             else:
-                logger.warning(f"No listing found for listing_id: {listing_id}")
+                logger.warning("No listing found for listing_id: %s", listing_id)
                 return {"error": "Listing not found."}, 404  # Not Found
         except Exception as e:
-            logger.exception(f"Error retrieving metrics for listing_id {listing_id}: {e}")
+            logger.exception("Error retrieving metrics for listing_id %s: %s", listing_id, e)
             return {"error": "Failed to retrieve metrics."}, 500
 
     @staticmethod
-    def get_metrics_by_seller(seller_id):
+    def get_metrics_by_seller(seller_id, live=False, series=None):
         """
         Retrieves metrics for all listings of a specific seller.
+        With `live`, buffered increments that have not been flushed are included.
+        With `series` (a dict of raw 'start', 'end' and 'granularity' values), each
+        listing also carries its time series and the response the seller's totals.
         Returns a tuple of (response_dict, status_code).
         """
         if not seller_id:
             logger.warning("Missing 'seller_id' parameter.")
             return {"error": "Missing 'seller_id' parameter."}, 400  # Bad Request
 
+        # Live reads merge the unflushed counters and are never cached
+        key = cache_key('get_metrics_by_seller', seller_id, series)
+        if not live:
+            generation = listing_cache.generation(SELLER_METRICS_NAMESPACE)
+            cached = listing_cache.get(SELLER_METRICS_NAMESPACE, key)
+            if cached is not None:
+                return cached
+
         try:
             # Step 1: Retrieve all listings for the seller
             listings_cursor = used_car_collection.find({"seller_id": (seller_id)})
             listings = list(listings_cursor)
 
             if not listings:
-                logger.warning(f"No listings found for seller_id: {seller_id}")
+                logger.warning("No listings found for seller_id: %s", seller_id)
                 return {"error": "No listings found for the provided seller_id."}, 404  # Not Found
 
             # Step 2: Combine listings with their metrics
             combined_listings = []
             for listing in listings:
+                views, shortlists = UsedCarListing.live_counts(listing) if live else (
+                    listing.get("views", 0), listing.get("shortlists", 0)
+                )
                 combined_listing = {
                     "listing_id": str(listing.get("_id", "")),
                     "make": listing.get("make", ""),
                     "model": listing.get("model", ""),
                     "year": listing.get("year", ""),
                     "price": listing.get("price", 0),
-                    "views": listing.get("views", 0),
-                    "shortlists": listing.get("shortlists", 0),
+                    "views": views,
+                    "shortlists": shortlists,
                     "created_at": listing.get("created_at").isoformat() if listing.get("created_at") else "",
                     # Add other fields as necessary
                 }
                 combined_listings.append(combined_listing)
 
-            logger.info(f"Metrics retrieved for seller_id: {seller_id}")
-            return {"listings": combined_listings}, 200
+            response = {"listings": combined_listings}
+            if series is not None:
+                series_response, status_code = UsedCarListing.get_metrics_series(seller_id=seller_id, **series)
+                if status_code != 200:
+                    return series_response, status_code
+                for combined_listing in combined_listings:
+                    combined_listing["series"] = series_response["listings"].get(combined_listing["listing_id"], [])
+                response["totals"] = series_response["totals"]
+                response["granularity"] = series_response["granularity"]
+
+            logger.info("Metrics retrieved for seller_id: %s", seller_id)
+            if not live:
+                listing_cache.set(SELLER_METRICS_NAMESPACE, key, (response, 200),
+                                  ttl=SELLER_METRICS_CACHE_TTL, generation=generation)
+            return response, 200
 
         except Exception as e:
-            logger.exception(f"Error retrieving metrics for seller_id {seller_id}: {e}")
+            logger.exception("Error retrieving metrics for seller_id %s: %s", seller_id, e)
             return {"error": "Failed to retrieve metrics for the seller."}, 500
 
+    @staticmethod
+    def _listings_with_reviews_pipeline(listing_match):
+        """
+        Builds the aggregation behind get_listings_with_reviews. It runs against
+        used_car_listings and yields one document per listing matching
+        `listing_match`, joined to its latest review and its agent by per-listing
+        $lookup subpipelines on indexed fields (reviews.listing_id, users._id).
+        Results stream from the cursor, so no single document holds them all.
+        """
+        return [
+            {"$match": listing_match},
+            {"$project": {field: 1 for field in (
+                'make', 'model', 'year', 'price', 'views', 'shortlists', 'created_at', 'agent_id'
+            )}},
+            {"$lookup": {
+                "from": "reviews",
+                "let": {"listing_key": {"$toString": "$_id"}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$listing_id", "$$listing_key"]}}},
+                    {"$sort": {"_id": -1}},
+                    {"$limit": 1},
+                    {"$project": {"rating": 1, "review": 1}}
+                ],
+                "as": "review"
+            }},
+            {"$lookup": {
+                "from": "users",
+                "let": {"agent_oid": {"$convert": {
+                    "input": "$agent_id", "to": "objectId", "onError": None, "onNull": None
+                }}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$agent_oid"]}}},
+                    {"$project": {"username": 1}}
+                ],
+                "as": "agent"
+            }},
+            {"$set": {
+                "review": {"$arrayElemAt": ["$review", 0]},
+                "agent": {"$arrayElemAt": ["$agent", 0]}
+            }}
+        ]
+
+    @staticmethod
+    def _augmented_listings(listing_match):
+        """
+        Runs the listings-with-reviews aggregation and shapes each streamed row
+        into the response format.
+        """
+        augmented_listings = []
+        for listing in used_car_collection.aggregate(UsedCarListing._listings_with_reviews_pipeline(listing_match)):
+            review = listing.get('review') or {}
+            agent = listing.get('agent') or {}
+            augmented_listings.append({
+                'listing_id': str(listing['_id']),
+                'make': listing.get('make', ''),
+                'model': listing.get('model', ''),
+                'year': listing.get('year', ''),
+                'price': listing.get('price', 0),
+                'views': listing.get('views', 0),
+                'shortlists': listing.get('shortlists', 0),
+                'created_at': listing.get('created_at').isoformat() if listing.get('created_at') else '',
+                'review_id': str(review['_id']) if review.get('_id') else None,
+                'rating': review.get('rating', 0) if review else None,
+                'review': review.get('review', '') if review else None,
+                'agent_id': listing.get('agent_id', ''),
+                'agent_name': agent.get('username')
+            })
+        return augmented_listings
+
     @staticmethod
     def get_listings_with_reviews(user_id):
         """
         Retrieves all listings associated with a user (seller or buyer)
-        and appends the corresponding review details if available.
+        and appends the corresponding review details and agent_name.
 
-        If no listings are found based on the user's role, it searches the
-        reviews collection for reviews authored by the user and retrieves
-        the associated listings.
+        Queries, in order:
+            1. find_one on users for the user's role.
+            2. An aggregation over used_car_listings matching the role's id field,
+               joining each listing's latest review and its agent's username.
+            3. Only if that returns nothing: distinct on reviews for the listing_ids
+               the user reviewed, then the same aggregation over those listings.
 
-        Additionally, fetches the agent's username for the agent_id and includes it in the response.
+        A review without a rating reports a rating of 0; a listing without a review
+        reports None for review_id, rating and review.
 
         Parameters:
             user_id (str): The ObjectId string of the user.
@@ -443,134 +1023,48 @@ class UsedCarListing:
         try:
             # Step 1: Validate and convert user_id to ObjectId
             user_oid = ObjectId(user_id)
-            logger.debug(f"Converted user_id to ObjectId: {user_oid}")
+            logger.debug("Converted user_id to ObjectId: %s", user_oid)
         except (InvalidId, TypeError) as e:
-            logger.error(f"Invalid user_id format: {user_id}. Error: {e}")
+            logger.error("Invalid user_id format: %s. Error: %s", user_id, e)
             return {"error": "Invalid user_id format."}, 400  # Bad Request
 
         try:
-            # Step 2: Fetch the user from the users collection to determine the role
-            user = users_collection.find_one({"_id": user_oid})
+            # Step 2: Fetch the user's role, which decides the listings to join
+            user = users_collection.find_one({"_id": user_oid}, {"role": 1})
             if not user:
-                logger.warning(f"User not found with user_id: {user_id}")
+                logger.warning("User not found with user_id: %s", user_id)
                 return {"error": "User not found."}, 404  # Not Found
 
-            role = user.get('role') 
+            role = user.get('role')
             if not role:
-                logger.warning(f"Role not defined for user_id: {user_id}")
+                logger.warning("Role not defined for user_id: %s", user_id)
                 return {"error": "User role not defined."}, 400  # Bad Request
 
-            logger.debug(f"User role for user_id {user_id}: {role}")
-
-            # Step 3: Determine the field to query based on role
-            if role.lower() == 'seller':
-                query_field = 'seller_id'
-            elif role.lower() == 'buyer':
-                query_field = 'buyer_id'
-            else:
-                logger.warning(f"Invalid role '{role}' for user_id: {user_id}")
+            role_field = {'seller': 'seller_id', 'buyer': 'buyer_id'}.get(str(role).lower())
+            if role_field is None:
+                logger.warning("Invalid role '%s' for user_id: %s", role, user_id)
                 return {"error": f"Invalid user role: {role}."}, 400  # Bad Request
 
-            # Step 4: Query listings based on the determined field
-            listings_cursor = used_car_collection.find({query_field: user_id}) 
-            listings = list(listings_cursor) 
-            logger.debug(f"Number of listings found for user_id {user_id}: {len(listings)}")
-
-            # Step 5: If no listings found, search reviews authored by the user
-            if not listings:
-                logger.info(f"No listings found for user_id {user_id} as {role}. Searching reviews authored by the user.")
-                
-                # Search reviews where reviewer_id matches user_id
-                reviews_cursor = reviews_collection.find({'reviewer_id': user_id})
-                reviews = list(reviews_cursor)
-                logger.debug(f"Number of reviews found authored by user_id {user_id}: {len(reviews)}")
-
-                if not reviews:
-                    logger.info(f"No reviews authored by user_id {user_id}. Returning empty listings.")
-                    return {"message": "No listings found for this user.", "listings": []}, 200  # OK
-
-                # Extract unique listing_ids from the reviews
-                listing_ids = {str(review['listing_id']) for review in reviews if 'listing_id' in review}
-                logger.debug(f"Listing IDs extracted from reviews: {listing_ids}")
-
-                if not listing_ids:
-                    logger.info(f"No listing_ids found in reviews authored by user_id {user_id}.")
-                    return {"message": "No listings found for this user.", "listings": []}, 200  # OK
-
-                # Convert listing_ids to ObjectId
+            # Step 3: Join reviews and agents server-side and stream the rows
+            augmented_listings = UsedCarListing._augmented_listings({role_field: user_id})
+            if not augmented_listings:
+                # Fall back to the listings the user reviewed when they own none
+                listing_ids = reviews_collection.distinct('listing_id', {"reviewer_id": user_id})
                 try:
-                    listing_object_ids = [ObjectId(lid) for lid in listing_ids]
+                    reviewed_ids = [ObjectId(str(listing_id)) for listing_id in listing_ids]
                 except InvalidId as e:
-                    logger.error(f"Invalid listing_id in reviews: {e}")
+                    logger.error("Invalid listing_id in reviews: %s", e)
                     return {"error": "Invalid listing_id found in reviews."}, 400  # Bad Request
+                if reviewed_ids:
+                    augmented_listings = UsedCarListing._augmented_listings({"_id": {"$in": reviewed_ids}})
 
-                # Fetch listings based on the extracted listing_ids
-                listings_cursor = used_car_collection.find({"_id": {"$in": listing_object_ids}})
-                listings = list(listings_cursor)
-                logger.debug(f"Number of listings retrieved from listing_ids in reviews: {len(listings)}")
-
-            if not listings:
-                logger.info(f"No listings found for user_id: {user_id}")
+            if not augmented_listings:
+                logger.info("No listings found for user_id: %s", user_id)
                 return {"message": "No listings found for this user.", "listings": []}, 200  # OK
 
-            # Extract listing_ids for querying reviews
-            listing_ids = [str(listing['_id']) for listing in listings]
-            logger.debug(f"Listing IDs: {listing_ids}")
-
-            # Step 6: Query all reviews where listing_id matches
-            seller_reviews_cursor = reviews_collection.find({
-                'listing_id': {"$in": listing_ids}
-            })
-            seller_reviews = list(seller_reviews_cursor) 
-            logger.debug(f"Number of reviews found: {len(seller_reviews)}")
-
-            # Create a mapping from listing_id to review details
-            review_map = {
-                str(review['listing_id']): {
-                    "review_id": str(review['_id']),
-                    "rating": review.get('rating', 0),
-                    "review": review.get('review', '')
-                }
-                for review in seller_reviews
-            } 
-            logger.debug(f"Review map: {review_map}")
-
-            # Step 7: Append review details and fetch agent_name
-            augmented_listings = []
-            for listing in listings: 
-                listing_id_str = str(listing['_id'])
-                agent_id = listing.get('agent_id', '')
-
-                # Fetch agent_name using agent_id from users_collection
-                agent_name = None
-                if agent_id:
-                    try:
-                        agent = users_collection.find_one({"_id": ObjectId(agent_id)})
-                        agent_name = agent.get('username', None) if agent else None
-                    except InvalidId:
-                        logger.warning(f"Invalid agent_id format: {agent_id}")
-
-                augmented_listing = {
-                    'listing_id': listing_id_str,
-                    'make': listing.get('make', ''),
-                    'model': listing.get('model', ''),
-                    'year': listing.get('year', ''),
-                    'price': listing.get('price', 0),
-                    'views': listing.get('views', 0),
-                    'shortlists': listing.get('shortlists', 0),
-                    'created_at': listing.get('created_at').isoformat() if listing.get('created_at') else '',
-                    'review_id': review_map.get(listing_id_str, {}).get('review_id'),
-                    'rating': review_map.get(listing_id_str, {}).get('rating'),
-                    'review': review_map.get(listing_id_str, {}).get('review'),
-                    'agent_id': agent_id,
-                    'agent_name': agent_name  # Include the fetched agent_name
-                }
-                logger.debug(f"Augmented Listing: {augmented_listing}")
-                augmented_listings.append(augmented_listing)
-
-            logger.info(f"Retrieved {len(augmented_listings)} listings for user_id: {user_id}")
+            logger.info("Retrieved %s listings for user_id: %s", len(augmented_listings), user_id)
             return {"listings": augmented_listings}, 200  # OK
 
         except Exception as e:
-            logger.exception(f"Error retrieving listings with reviews for user_id {user_id}: {e}")
+            logger.exception("Error retrieving listings with reviews for user_id %s: %s", user_id, e)
             return {"error": "Failed to retrieve listings with reviews."}, 500  # Internal Server Error
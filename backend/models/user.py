@@ -5,15 +5,9 @@ from utils.db import db
 from bson import ObjectId
 from bson.errors import InvalidId
 from marshmallow import Schema, fields, ValidationError
+from utils.passwords import password_hasher, needs_rehash, PasswordHasherBusy
 
-# Configure Logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
 users_collection = db['users']
 
@@ -21,7 +15,8 @@ users_collection = db['users']
 def serialize_user(user):
     if not user:
         return None
-    user['_id'] = str(user['_id'])
+    # ObjectId values are encoded by the app's JSON provider
+    user.pop('password', None)
     return user
 
 
@@ -29,6 +24,34 @@ def serialize_users(users):
     return [serialize_user(user) for user in users]
 
 
+def parse_user_ids(user_ids):
+    """
+    Converts user ids to a list of distinct ObjectIds for an $in query,
+    skipping empty ids and logging malformed ones.
+    """
+    object_ids = set()
+    for user_id in user_ids:
+        if not user_id:
+            continue
+        try:
+            object_ids.add(ObjectId(str(user_id)))
+        except InvalidId:
+            logger.warning("Invalid user_id format: %s", user_id)
+    return list(object_ids)
+
+
+def user_response(user_id, user):
+    """
+    Shapes the response of a user lookup by id from the fetched document.
+    Returns a tuple of (response_data, status_code).
+    """
+    if user:
+        logger.info("Retrieved user with ID: %s", user_id)
+        return {"user": serialize_user(user)}, 200
+    logger.warning("User not found with ID: %s", user_id)
+    return {"error": "User not found."}, 404  # Not Found
+
+
 class CreateUserSchema(Schema):
     username = fields.Str(required=True)
     password = fields.Str(required=True)
@@ -62,38 +85,65 @@ class User:
 
             user = users_collection.find_one({"username": username})
             if not user:
-                logger.warning(f"User '{username}' not found.")
+                logger.warning("User '%s' not found.", username)
                 return {"error": "Invalid username or password."}, 401  # Unauthorized
 
             if user.get('suspended'):
-                logger.warning(f"User '{username}' account is suspended.")
+                logger.warning("User '%s' account is suspended.", username)
                 return {"error": "Account is suspended."}, 403  # Forbidden
 
             stored_password = user.get('password')
-            if stored_password != password:
-                logger.warning(f"Incorrect password for user '{username}'.")
+            try:
+                password_valid = password_hasher.verify(password, stored_password)
+            except PasswordHasherBusy:
+                logger.warning("Password verification pool saturated; rejected login for '%s'.", username)
+                return {"error": "Server busy, please retry."}, 503  # Service Unavailable
+            if not password_valid:
+                logger.warning("Incorrect password for user '%s'.", username)
                 return {"error": "Invalid username or password."}, 401  # Unauthorized
 
+            if needs_rehash(stored_password):
+                User._upgrade_password(user['_id'], stored_password, password)
+
             # Fetch profile data
             from models.profile import Profile  # Import here to avoid circular imports
-            profile_result, status_code = Profile.get_profile_by_role(user.get('role'))
+            profile = Profile.get_cached_profile(user.get('role'))
 
-            if status_code != 200:
-                logger.error(f"Profile for role '{user.get('role')}' not found.")
+            if not profile:
+                logger.error("Profile for role '%s' not found.", user.get('role'))
                 return {"error": "Profile data not found."}, 500  # Internal Server Error
 
             login_data = {
                 "user": serialize_user(user),
-                "profile": profile_result['profile']
+                "profile": profile
             }
-            print(login_data)
-            logger.info(f"User '{username}' authenticated successfully.")
+            logger.info("User '%s' authenticated successfully.", username)
             return login_data, 200  # OK
 
         except Exception as e:
-            logger.exception(f"Exception during user authentication: {e}")
+            logger.exception("Exception during user authentication: %s", e)
             return {"error": "Internal server error."}, 500  # Internal Server Error
 
+    @staticmethod
+    def _upgrade_password(user_id, stored_password, password):
+        """
+        Replaces a legacy plaintext or outdated hash with one at the current work factor.
+        The update only applies if the stored value is unchanged, so it cannot
+        overwrite a password changed concurrently. Failures leave the old value in place.
+        """
+        try:
+            hashed = password_hasher.hash(password)
+            result = users_collection.update_one(
+                {"_id": user_id, "password": stored_password},
+                {"$set": {"password": hashed}}
+            )
+            if result.modified_count > 0:
+                logger.info("Upgraded password hash for user ID: %s", user_id)
+        except PasswordHasherBusy:
+            logger.warning("Password hashing pool saturated; deferred hash upgrade for user ID: %s", user_id)
+        except Exception as e:
+            logger.exception("Exception during password hash upgrade: %s", e)
+
     @staticmethod
     def logout_user():
         """
@@ -115,23 +165,27 @@ class User:
         try:
             validated_data = schema.load(user_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during user creation: {err.messages}")
+            logger.warning("Validation errors during user creation: %s", err.messages)
             return {"error": err.messages}, 400  # Bad Request
 
         try:
             existing_user = users_collection.find_one({"username": validated_data['username']})
             if existing_user:
-                logger.warning(f"Username '{validated_data['username']}' already exists.")
+                logger.warning("Username '%s' already exists.", validated_data['username'])
                 return {"error": "Username already exists."}, 400  # Bad Request
 
+            validated_data['password'] = password_hasher.hash(validated_data['password'])
             result = users_collection.insert_one(validated_data)
             if result.inserted_id:
-                logger.info(f"User created successfully with ID: {result.inserted_id}")
+                logger.info("User created successfully with ID: %s", result.inserted_id)
                 return {"message": "User created successfully."}, 201  # Created
             logger.error("Failed to create user without exception.")
             return {"error": "Failed to create user."}, 500  # Internal Server Error
+        except PasswordHasherBusy:
+            logger.warning("Password hashing pool saturated during user creation.")
+            return {"error": "Server busy, please retry."}, 503  # Service Unavailable
         except Exception as e:
-            logger.exception(f"Exception during user creation: {e}")
+            logger.exception("Exception during user creation: %s", e)
             return {"error": "An error occurred while creating the user."}, 500  # Internal Server Error
 
     @staticmethod
@@ -147,7 +201,7 @@ class User:
                 serialized = serialize_user(user)
                 if serialized:
                     return {"user": serialized}, 200
-                logger.warning(f"User not found with username: {username}")
+                logger.warning("User not found with username: %s", username)
                 return {"error": "User not found."}, 404  # Not Found
             else:
                 # If no username is provided, return all users
@@ -155,7 +209,7 @@ class User:
                 serialized = serialize_users(users)
                 return {"users": serialized}, 200
         except Exception as e:
-            logger.exception(f"Exception during fetching user(s): {e}")
+            logger.exception("Exception during fetching user(s): %s", e)
             return {"error": "Failed to fetch user(s)."}, 500  # Internal Server Error
 
     @staticmethod
@@ -181,10 +235,10 @@ class User:
 
             users = users_collection.find(query)
             serialized_users = serialize_users(users)
-            logger.info(f"Filtered users based on criteria: {query}")
+            logger.info("Filtered users based on criteria: %s", query)
             return {"users": serialized_users}, 200
         except Exception as e:
-            logger.exception(f"Exception during filtering users: {e}")
+            logger.exception("Exception during filtering users: %s", e)
             return {"error": "Failed to filter users."}, 500  # Internal Server Error
 
     @staticmethod
@@ -195,22 +249,30 @@ class User:
         """  
         try:
             oid = ObjectId(user_id)
-        except InvalidId:
-            logger.warning(f"Invalid user_id format: {user_id}")
+        except (InvalidId, TypeError):
+            logger.warning("Invalid user_id format: %s", user_id)
             return {"error": "Invalid user_id."}, 400  # Bad Request
 
         try:
-            user = users_collection.find_one({"_id": oid})
-            if user:
-                serialized = serialize_user(user)
-                logger.info(f"Retrieved user with ID: {user_id}")
-                return {"user": serialized}, 200
-            logger.warning(f"User not found with ID: {user_id}")
-            return {"error": "User not found."}, 404  # Not Found
+            return user_response(user_id, users_collection.find_one({"_id": oid}))
         except Exception as e:
-            logger.exception(f"Exception during fetching user by ID: {e}")
+            logger.exception("Exception during fetching user by ID: %s", e)
             return {"error": "Failed to fetch user."}, 500  # Internal Server Error
 
+    @staticmethod
+    def get_usernames_by_ids(user_ids):
+        """
+        Resolves many user ids to usernames with a single $in query.
+        Invalid or unknown ids are left out of the result.
+        Returns a dict mapping the id string to the username.
+        """
+        object_ids = parse_user_ids(user_ids)
+        if not object_ids:
+            return {}
+
+        users = users_collection.find({"_id": {"$in": object_ids}}, {"username": 1})
+        return {str(user['_id']): user.get('username') for user in users}
+
     @staticmethod
     def update_user(username, update_data):
         """
@@ -226,18 +288,23 @@ class User:
         try:
             validated_data = schema.load(update_data)
         except ValidationError as err:
-            logger.warning(f"Validation errors during user update: {err.messages}")
+            logger.warning("Validation errors during user update: %s", err.messages)
             return {"error": err.messages}, 400  # Bad Request
 
         try:
+            if 'password' in validated_data:
+                validated_data['password'] = password_hasher.hash(validated_data['password'])
             result = users_collection.update_one({"username": username}, {"$set": validated_data})
             if result.modified_count > 0:
-                logger.info(f"User '{username}' updated successfully.")
+                logger.info("User '%s' updated successfully.", username)
                 return {"message": "User updated successfully."}, 200
-            logger.warning(f"No changes made to user '{username}'.")
+            logger.warning("No changes made to user '%s'.", username)
             return {"message": "No changes made to the user."}, 200
+        except PasswordHasherBusy:
+            logger.warning("Password hashing pool saturated during update of user '%s'.", username)
+            return {"error": "Server busy, please retry."}, 503  # Service Unavailable
         except Exception as e:
-            logger.exception(f"Exception during user update: {e}")
+            logger.exception("Exception during user update: %s", e)
             return {"error": "Failed to update user."}, 500  # Internal Server Error
 
     @staticmethod
@@ -249,12 +316,12 @@ class User:
         try:
             result = users_collection.update_one({"username": username}, {"$set": {"suspended": True}})
             if result.modified_count > 0:
-                logger.info(f"User '{username}' suspended successfully.")
+                logger.info("User '%s' suspended successfully.", username)
                 return {"message": "User suspended successfully."}, 200
-            logger.warning(f"No changes made to user '{username}' during suspension.")
+            logger.warning("No changes made to user '%s' during suspension.", username)
             return {"message": "No changes made to the user."}, 200
         except Exception as e:
-            logger.exception(f"Exception during suspending user '{username}': {e}")
+            logger.exception("Exception during suspending user '%s': %s", username, e)
             return {"error": "Failed to suspend user."}, 500  # Internal Server Error
 
     @staticmethod
@@ -266,12 +333,12 @@ class User:
         try:
             result = users_collection.update_one({"username": username}, {"$set": {"suspended": False}})
             if result.modified_count > 0:
-                logger.info(f"User '{username}' re-enabled successfully.")
+                logger.info("User '%s' re-enabled successfully.", username)
                 return {"message": "User re-enabled successfully."}, 200
-            logger.warning(f"No changes made to user '{username}' during re-enabling.")
+            logger.warning("No changes made to user '%s' during re-enabling.", username)
             return {"message": "No changes made to the user."}, 200
         except Exception as e:
-            logger.exception(f"Exception during re-enabling user '{username}': {e}")
+            logger.exception("Exception during re-enabling user '%s': %s", username, e)
             return {"error": "Failed to re-enable user."}, 500  # Internal Server Error
 
     @staticmethod
@@ -283,12 +350,12 @@ class User:
         try:
             result = users_collection.update_many({"role": role}, {"$set": {"suspended": True}})
             if result.modified_count > 0:
-                logger.info(f"{result.modified_count} user(s) with role '{role}' suspended successfully.")
+                logger.info("%s user(s) with role '%s' suspended successfully.", result.modified_count, role)
                 return {"message": f"{result.modified_count} user(s) suspended successfully."}, 200
-            logger.warning(f"No users found with role '{role}' to suspend.")
+            logger.warning("No users found with role '%s' to suspend.", role)
             return {"message": "No users found with the specified role."}, 200
         except Exception as e:
-            logger.exception(f"Exception during suspending users by role '{role}': {e}")
+            logger.exception("Exception during suspending users by role '%s': %s", role, e)
             return {"error": "Failed to suspend users by role."}, 500  # Internal Server Error
 
     @staticmethod
@@ -300,12 +367,12 @@ class User:
         try:
             result = users_collection.update_many({"role": role}, {"$set": {"suspended": False}})
             if result.modified_count > 0:
-                logger.info(f"{result.modified_count} user(s) with role '{role}' re-enabled successfully.")
+                logger.info("%s user(s) with role '%s' re-enabled successfully.", result.modified_count, role)
                 return {"message": f"{result.modified_count} user(s) re-enabled successfully."}, 200
-            logger.warning(f"No users found with role '{role}' to re-enable.")
+            logger.warning("No users found with role '%s' to re-enable.", role)
             return {"message": "No users found with the specified role."}, 200
         except Exception as e:
-            logger.exception(f"Exception during re-enabling users by role '{role}': {e}")
+            logger.exception("Exception during re-enabling users by role '%s': %s", role, e)
             return {"error": "Failed to re-enable users by role."}, 500  # Internal Server Error
 
     @staticmethod
@@ -323,10 +390,10 @@ class User:
                 {"email": {"$regex": query, "$options": "i"}}
             ]})
             serialized_users = serialize_users(cursor)
-            logger.info(f"Search completed for users with query: '{query}'")
+            logger.info("Search completed for users with query: '%s'", query)
             return {"users": serialized_users}, 200  # OK
         except Exception as e:
-            logger.exception(f"Exception during searching users with query '{query}': {e}")
+            logger.exception("Exception during searching users with query '%s': %s", query, e)
             return {"error": "Failed to search users."}, 500  # Internal Server Error
 
 
@@ -340,17 +407,13 @@ class User:
             logger.warning("Username parameter is missing.")
             return {"error": "Username parameter is required."}, 400  # Bad Request
         try: 
-            print(f"Trying with {username}")
             user = users_collection.find_one({"username": username})
-            print(user)
             if not user:
-                logger.warning(f"User not found with username: {username}")
+                logger.warning("User not found with username: %s", username)
                 return {"error": "User not found."}, 404  # Not Found
-            print("hello")
             user_id = str(user['_id'])
-            print(user_id)
-            logger.info(f"Retrieved user ID for username '{username}': {user_id}")
+            logger.info("Retrieved user ID for username '%s': %s", username, user_id)
             return {"user_id": user_id}, 200  # OK
         except Exception as e:
-            logger.exception(f"Exception during retrieving user ID for username '{username}': {e}")
+            logger.exception("Exception during retrieving user ID for username '%s': %s", username, e)
             return {"error": "Failed to retrieve user ID."}, 500  # Internal Server Error
\ No newline at end of file
@@ -0,0 +1,997 @@
+import os
+import sys
+import time
+import tracemalloc
+import shutil
+import socket
+import io
+import json
+import subprocess
+import urllib.request
+import logging
+import unittest
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from pymongo import MongoClient, monitoring
+
+# Benchmarks seed their own data, so point the models at a scratch database
+# before utils.db is imported.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+from dotenv import load_dotenv
+load_dotenv()
+os.environ['DB_NAME'] = f"{os.getenv('DB_NAME', 'used_car_system')}_benchmark"
+
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Counts the commands (round trips) sent to MongoDB.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+command_counter = CommandCounter()
+monitoring.register(command_counter)
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from utils.db import db
+from models.used_car_listing import UsedCarListing, listings_response
+from models.review import Review
+from models.buyer_listing import BuyerListing, SHORTLIST_MAX_ENTRIES
+from models.user import User
+from utils.ratings import summarize
+from utils.pagination import encode_cursor
+from utils.migrations import ensure_indexes
+from flask import Flask
+from utils.json_provider import FastJSONProvider
+from utils.bulk_import import parse_rows
+from utils.passwords import password_hasher, hash_password, verify_password, SCRYPT_N, SCRYPT_R, SCRYPT_P
+
+logging.basicConfig(filename='benchmark_log.log',
+                    level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Wall-clock comparisons depend on the machine and its load, so they only fail
+# the run with BENCHMARK_ASSERT_TIMINGS=1; otherwise the timings are just logged.
+ASSERT_TIMINGS = os.getenv('BENCHMARK_ASSERT_TIMINGS', '').lower() in ('1', 'true')
+
+
+def mongo_available():
+    try:
+        MongoClient(os.getenv('MONGO_URI'), serverSelectionTimeoutMS=2000).admin.command('ping')
+        return True
+    except PyMongoError:
+        return False
+
+
+def measure(func, *args, repeat=5):
+    """
+    Runs func `repeat` times and returns (round trips per call, median seconds per call).
+    """
+    timings = []
+    start_count = command_counter.count
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    round_trips = (command_counter.count - start_count) / repeat
+    return round_trips, sorted(timings)[len(timings) // 2]
+
+
+def legacy_listings_with_reviews(user_id):
+    """
+    The query sequence get_listings_with_reviews issued before it moved to aggregations:
+    a user fetch, a listing query, a reviews query and one user lookup per listing.
+    """
+    user = db['users'].find_one({"_id": ObjectId(user_id)})
+    listings = list(db['used_car_listings'].find({"seller_id": user_id}))
+    listing_ids = [str(listing['_id']) for listing in listings]
+    reviews = list(db['reviews'].find({'listing_id': {"$in": listing_ids}}))
+    review_map = {str(review['listing_id']): review for review in reviews}
+    rows = []
+    for listing in listings:
+        agent = db['users'].find_one({"_id": ObjectId(listing['agent_id'])})
+        rows.append((listing, review_map.get(str(listing['_id'])), agent.get('username') if agent else None))
+    return user, rows
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+class TestBenchmarks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed a seller with 1k listings, each handled by one of 20 agents and half of them reviewed.
+        """
+        cls.logger = logging.getLogger('TestBenchmarks')
+
+        cls.listings_per_seller = 1000
+        agent_ids = db['users'].insert_many([
+            {"username": f"bench_agent_{i}_{ObjectId()}", "role": "used_car_agent"} for i in range(20)
+        ]).inserted_ids
+        cls.seller_id = str(db['users'].insert_one(
+            {"username": f"bench_seller_{ObjectId()}", "role": "seller"}
+        ).inserted_id)
+
+        listing_ids = db['used_car_listings'].insert_many([
+            {
+                "make": "Toyota", "model": "Corolla", "year": 2000 + i % 24, "price": 5000 + i,
+                "agent_id": str(agent_ids[i % len(agent_ids)]), "seller_id": cls.seller_id,
+                "views": 0, "shortlists": 0, "created_at": datetime.utcnow()
+            }
+            for i in range(cls.listings_per_seller)
+        ]).inserted_ids
+        db['reviews'].insert_many([
+            {
+                "agent_id": str(agent_ids[i % len(agent_ids)]), "listing_id": str(listing_id),
+                "reviewer_id": cls.seller_id, "rating": 1 + i % 5, "review": "benchmark",
+                "created_at": datetime.utcnow()
+            }
+            for i, listing_id in enumerate(listing_ids) if i % 2 == 0
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def test_listings_with_reviews_round_trips(self):
+        """
+        get_listings_with_reviews must cost a constant number of round trips regardless of listing count.
+        """
+        legacy_trips, legacy_latency = measure(legacy_listings_with_reviews, self.seller_id)
+        trips, latency = measure(UsedCarListing.get_listings_with_reviews, self.seller_id)
+
+        response, status_code = UsedCarListing.get_listings_with_reviews(self.seller_id)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(len(response['listings']), self.listings_per_seller)
+
+        self.logger.info(
+            f"get_listings_with_reviews @ {self.listings_per_seller} listings: "
+            f"before {legacy_trips:.0f} round trips / {legacy_latency * 1000:.1f} ms, "
+            f"after {trips:.0f} round trips / {latency * 1000:.1f} ms"
+        )
+        # One role lookup, the aggregate's first batch of 101 and one getMore for the rest
+        self.assertLessEqual(trips, 3)
+        self.assertLess(trips, legacy_trips)
+
+    def test_export_memory_is_flat(self):
+        """
+        Streaming the NDJSON export must peak well below building the full listing response.
+        """
+        def peak(func):
+            tracemalloc.start()
+            func()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak_bytes
+
+        def export():
+            chunks, status_code = UsedCarListing.export_listings()
+            self.assertEqual(status_code, 200)
+            return sum(len(chunk) for chunk in chunks)
+
+        list_peak = peak(lambda: listings_response(list(db['used_car_listings'].find()), None, None))
+        export_peak = peak(export)
+        self.logger.info(
+            f"listing export @ {self.listings_per_seller} listings: "
+            f"full response peak {list_peak / 1024:.0f} KiB, NDJSON export peak {export_peak / 1024:.0f} KiB"
+        )
+        self.assertLess(export_peak, list_peak)
+
+
+class TestPasswordHashingBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestPasswordHashingBenchmark')
+
+    def test_login_verification_throughput(self):
+        """
+        Login verifications at the configured work factor, inline versus on the bounded pool.
+        Concurrency is capped at what the pool admits, so no login is shed.
+        """
+        stored = hash_password('benchmark-password')
+        logins = password_hasher.max_workers + password_hasher.max_pending
+
+        start = time.perf_counter()
+        for _ in range(logins):
+            self.assertTrue(verify_password('benchmark-password', stored))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=logins) as request_threads:
+            results = list(request_threads.map(
+                lambda _: password_hasher.verify('benchmark-password', stored), range(logins)
+            ))
+        pooled = time.perf_counter() - start
+
+        self.assertTrue(all(results))
+        self.logger.info(
+            f"login verification @ scrypt n={SCRYPT_N} r={SCRYPT_R} p={SCRYPT_P}, "
+            f"{password_hasher.max_workers} workers: "
+            f"inline {logins / serial:.1f} logins/s, pooled {logins / pooled:.1f} logins/s"
+        )
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+class TestBulkImportBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestBulkImportBenchmark')
+        cls.agent_id, cls.seller_id = str(ObjectId()), str(ObjectId())
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def csv_upload(self, count):
+        lines = ["make,model,year,price,agent_id,seller_id"]
+        lines += [f"Toyota,Model {i % 40},{2000 + i % 24},{5000 + i},{self.agent_id},{self.seller_id}"
+                  for i in range(count)]
+        return io.BytesIO(("\n".join(lines) + "\n").encode('utf-8'))
+
+    def test_bulk_import_throughput(self):
+        """
+        100k-row CSV import through bulk_create_listings versus one create_listing per row.
+        """
+        per_row_count, bulk_count = 1000, 100000
+        rows = [{"make": "Honda", "model": "Civic", "year": 2015, "price": 9000.0,
+                 "agent_id": self.agent_id, "seller_id": self.seller_id} for _ in range(per_row_count)]
+        start = time.perf_counter()
+        for row in rows:
+            UsedCarListing.create_listing(row)
+        per_row_rate = per_row_count / (time.perf_counter() - start)
+
+        upload = self.csv_upload(bulk_count)
+        start = time.perf_counter()
+        response, status_code = UsedCarListing.bulk_create_listings(parse_rows(upload, 'csv'))
+        bulk_rate = bulk_count / (time.perf_counter() - start)
+
+        self.assertEqual(status_code, 201)
+        self.assertEqual(response['inserted'], bulk_count)
+        self.logger.info(
+            f"listing import: create_listing {per_row_rate:.0f} rows/s, "
+            f"bulk import @ {bulk_count} rows {bulk_rate:.0f} rows/s ({bulk_rate / per_row_rate:.1f}x)"
+        )
+        if ASSERT_TIMINGS:
+            self.assertGreater(bulk_rate, per_row_rate)
+
+
+def legacy_reviews_and_average(agent_id):
+    """
+    The reads get_reviews_and_average issued before rating summaries: a user
+    existence check, a $group/$avg over the agent's reviews and a reviews query.
+    """
+    db['users'].find_one({"_id": ObjectId(agent_id)})
+    result = list(db['reviews'].aggregate([
+        {"$match": {"agent_id": agent_id}},
+        {"$group": {"_id": "$agent_id", "average_rating": {"$avg": "$rating"}}}
+    ]))
+    reviews = list(db['reviews'].find({"agent_id": agent_id}))
+    return reviews, result[0]['average_rating'] if result else None
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+class TestReviewBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed an agent with 20k reviews written directly, then build its summary.
+        """
+        cls.logger = logging.getLogger('TestReviewBenchmark')
+        cls.review_count = 20000
+        cls.agent_id = str(db['users'].insert_one(
+            {"username": f"bench_agent_{ObjectId()}", "role": "used_car_agent"}
+        ).inserted_id)
+        db['reviews'].insert_many([
+            {"agent_id": cls.agent_id, "listing_id": str(ObjectId()), "reviewer_id": str(ObjectId()),
+             "rating": 1 + i % 5, "review": "benchmark", "created_at": datetime.utcnow()}
+            for i in range(cls.review_count)
+        ])
+        Review.reconcile_rating_summaries([cls.agent_id])
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def test_summary_matches_reviews(self):
+        """
+        Incremental updates and a rebuild must agree with an aggregation over the reviews.
+        """
+        Review.apply_rating_change(self.agent_id, None, 5)
+        Review.apply_rating_change(self.agent_id, 5, 2)
+        summary = summarize(Review.get_rating_summary(self.agent_id))
+        db['reviews'].insert_one({"agent_id": self.agent_id, "rating": 2})
+        Review.reconcile_rating_summaries([self.agent_id])
+
+        self.assertEqual(summarize(Review.get_rating_summary(self.agent_id)), summary)
+        self.assertEqual(summary["review_count"], self.review_count + 1)
+        self.assertEqual(summary["average_rating"], round(legacy_reviews_and_average(self.agent_id)[1], 2))
+        self.assertEqual(summary["rating_histogram"]["2"], self.review_count // 5 + 1)
+
+    def test_rating_read_is_a_point_read(self):
+        """
+        The rating summary costs one round trip however many reviews an agent has.
+        """
+        legacy_trips, legacy_time = measure(
+            lambda: list(db['reviews'].aggregate([
+                {"$match": {"agent_id": self.agent_id}},
+                {"$group": {"_id": "$agent_id", "average_rating": {"$avg": "$rating"}}}
+            ]))
+        )
+        summary_trips, summary_time = measure(Review.get_average_rating, self.agent_id)
+
+        self.logger.info(
+            f"agent rating @ {self.review_count} reviews: $group {legacy_time * 1000:.2f}ms, "
+            f"summary read {summary_time * 1000:.2f}ms ({summary_trips:.0f} round trip)"
+        )
+        self.assertEqual(summary_trips, 1)
+        if ASSERT_TIMINGS:
+            self.assertLess(summary_time, legacy_time)
+
+    def test_review_pages_are_bounded(self):
+        """
+        A page of reviews sorted by rating reads only its own rows, and walking
+        every page yields each review once in rating order.
+        """
+        _, full_time = measure(Review.get_reviews_for_agent, self.agent_id, 'rating')
+        _, page_time = measure(Review.get_review_page, self.agent_id, 'rating', 50)
+
+        ratings, ids, cursor = [], set(), None
+        while True:
+            reviews, cursor = Review.get_review_page(self.agent_id, 'rating', 500, cursor)
+            ratings += [review['rating'] for review in reviews]
+            ids.update(review['_id'] for review in reviews)
+            if cursor is None:
+                break
+
+        self.logger.info(
+            f"agent reviews by rating @ {self.review_count} reviews: all {full_time * 1000:.2f}ms, "
+            f"page of 50 {page_time * 1000:.2f}ms"
+        )
+        self.assertEqual(len(ids), len(ratings))
+        self.assertEqual(ratings, sorted(ratings, reverse=True))
+        if ASSERT_TIMINGS:
+            self.assertLess(page_time, full_time)
+
+        # A cursor carrying anything but a number as the rating never reaches the query
+        for forged in ({"$gt": 0}, "5", True, None):
+            with self.assertRaises(ValueError):
+                Review.get_review_page(self.agent_id, 'rating', 50, encode_cursor({"id": str(ObjectId()), "rating": forged}))
+
+    def test_top_agents_is_a_point_read(self):
+        """
+        Once the leaderboard is built, top agents cost one round trip and never touch reviews.
+        """
+        response, status_code = Review.get_top_agents(5)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(response['agents'][0]['agent_id'], self.agent_id)
+
+        round_trips, elapsed = measure(Review.get_top_agents, 5)
+        self.logger.info(f"top agents: {elapsed * 1000:.2f}ms ({round_trips:.0f} round trip)")
+        self.assertEqual(round_trips, 1)
+
+
+def legacy_rate_and_review_agent(user_id, listing_id, rating):
+    """
+    The write path rate_and_review_agent used before the conditional upsert:
+    user fetch, listing fetch, duplicate check, then insert. The unique index
+    still rejects the duplicates the check misses under concurrency.
+    """
+    db['users'].find_one({"_id": ObjectId(user_id)})
+    listing = db['used_car_listings'].find_one({"_id": ObjectId(listing_id)})
+    key = {"agent_id": listing['agent_id'], "listing_id": listing_id, "reviewer_id": user_id}
+    if db['reviews'].find_one(key):
+        return 400
+    try:
+        db['reviews'].insert_one({**key, "rating": rating, "created_at": datetime.utcnow()})
+    except DuplicateKeyError:
+        return 500
+    Review.apply_rating_change(listing['agent_id'], new_rating=rating)
+    return 201
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+class TestReviewSubmissionConcurrency(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed an agent, a buyer and two sets of listings, one per write path.
+        """
+        cls.logger = logging.getLogger('TestReviewSubmissionConcurrency')
+        ensure_indexes(db)
+        cls.agent_id = str(db['users'].insert_one(
+            {"username": f"bench_agent_{ObjectId()}", "role": "used_car_agent"}
+        ).inserted_id)
+        cls.buyer_id = str(db['users'].insert_one(
+            {"username": f"bench_buyer_{ObjectId()}", "role": "buyer"}
+        ).inserted_id)
+        cls.listings_per_path, cls.submits_per_listing = 200, 8
+        listing_ids = [str(listing_id) for listing_id in db['used_car_listings'].insert_many([
+            {"make": "Toyota", "model": "Corolla", "year": 2015, "price": 9000,
+             "agent_id": cls.agent_id, "seller_id": str(ObjectId()), "created_at": datetime.utcnow()}
+            for _ in range(2 * cls.listings_per_path)
+        ]).inserted_ids]
+        cls.legacy_listings = listing_ids[:cls.listings_per_path]
+        cls.upsert_listings = listing_ids[cls.listings_per_path:]
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def submit_concurrently(self, submit, listing_ids):
+        """
+        Fires `submits_per_listing` simultaneous submissions per listing from 32 threads.
+        Returns (statuses, p99 latency in seconds).
+        """
+        def timed(listing_id):
+            start = time.perf_counter()
+            status_code = submit(listing_id)
+            return status_code, time.perf_counter() - start
+
+        jobs = [listing_id for listing_id in listing_ids for _ in range(self.submits_per_listing)]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(timed, jobs))
+        latencies = sorted(elapsed for _, elapsed in results)
+        return [status_code for status_code, _ in results], latencies[int(len(latencies) * 0.99)]
+
+    def test_parallel_submissions_create_one_review(self):
+        """
+        Parallel submissions of the same review create exactly one and report the
+        rest as duplicates; the p99 against find-then-insert is logged.
+        """
+        legacy_statuses, legacy_p99 = self.submit_concurrently(
+            lambda listing_id: legacy_rate_and_review_agent(self.buyer_id, listing_id, 4), self.legacy_listings
+        )
+        statuses, p99 = self.submit_concurrently(
+            lambda listing_id: Review.rate_and_review_agent('buyer', self.buyer_id, listing_id, {"rating": 4})[1],
+            self.upsert_listings
+        )
+
+        self.logger.info(
+            f"review submission x{self.submits_per_listing} per listing: find-then-insert p99 "
+            f"{legacy_p99 * 1000:.2f}ms ({legacy_statuses.count(500)} duplicate key errors), "
+            f"conditional upsert p99 {p99 * 1000:.2f}ms"
+        )
+        self.assertEqual(statuses.count(201), self.listings_per_path)
+        self.assertEqual(statuses.count(400), self.listings_per_path * (self.submits_per_listing - 1))
+        review_counts = {row['_id']: row['count'] for row in db['reviews'].aggregate([
+            {"$match": {"listing_id": {"$in": self.upsert_listings}}},
+            {"$group": {"_id": "$listing_id", "count": {"$sum": 1}}},
+        ])}
+        self.assertEqual(review_counts, dict.fromkeys(self.upsert_listings, 1))
+        self.assertEqual(
+            Review.get_rating_summary(self.agent_id)['count'], 2 * self.listings_per_path
+        )
+        if ASSERT_TIMINGS:
+            self.assertLess(p99, legacy_p99)
+
+
+def legacy_get_shortlist(user_id, listing_ids):
+    """
+    The reads view_shortlist issued before shortlist entries: the listings of
+    the buyer's shortlist array by $in, then one $in over their agents and sellers.
+    """
+    listings = list(db['used_car_listings'].find({"_id": {"$in": listing_ids}}))
+    usernames = User.get_usernames_by_ids(
+        [listing.get('agent_id') for listing in listings] + [listing.get('seller_id') for listing in listings]
+    )
+    return [(listing, usernames.get(str(listing.get('agent_id')))) for listing in listings]
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+class TestShortlistBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed a buyer with a full shortlist of listings spread over 20 agents.
+        """
+        cls.logger = logging.getLogger('TestShortlistBenchmark')
+        ensure_indexes(db)
+        agent_ids = [str(agent_id) for agent_id in db['users'].insert_many([
+            {"username": f"bench_agent_{i}_{ObjectId()}", "role": "used_car_agent"} for i in range(20)
+        ]).inserted_ids]
+        seller_id = str(db['users'].insert_one({"username": f"bench_seller_{ObjectId()}", "role": "seller"}).inserted_id)
+        cls.listing_ids = db['used_car_listings'].insert_many([
+            {"make": "Toyota", "model": "Corolla", "year": 2000 + i % 24, "price": 5000 + i,
+             "agent_id": agent_ids[i % len(agent_ids)], "seller_id": seller_id, "created_at": datetime.utcnow()}
+            for i in range(SHORTLIST_MAX_ENTRIES)
+        ]).inserted_ids
+        cls.user_id = f"bench_buyer_{ObjectId()}"
+        for listing_id in cls.listing_ids:
+            BuyerListing.save_listing({"user_id": cls.user_id, "listing_id": str(listing_id)})
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def test_shortlist_is_one_read(self):
+        """
+        A full shortlist is one query on the entries, with no listing or user lookups.
+        """
+        legacy_trips, legacy_time = measure(legacy_get_shortlist, self.user_id, self.listing_ids)
+        trips, elapsed = measure(BuyerListing.get_shortlist, self.user_id)
+        response, status_code = BuyerListing.get_shortlist(self.user_id)
+
+        self.logger.info(
+            f"shortlist @ {len(self.listing_ids)} entries: $in + user lookup {legacy_time * 1000:.2f}ms "
+            f"({legacy_trips:.0f} round trips), entries {elapsed * 1000:.2f}ms ({trips:.0f} round trips)"
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(len(response['shortlist']), db['shortlist_entries'].count_documents({"user_id": self.user_id}))
+        # The find's first batch of 101 entries plus one getMore for the rest
+        self.assertLessEqual(trips, 2)
+        self.assertLess(trips, legacy_trips)
+        if ASSERT_TIMINGS:
+            self.assertLess(elapsed, legacy_time)
+
+    def test_cap_pagination_and_write_through(self):
+        """
+        Saves past the cap are refused, pages walk every entry once, and listing
+        edits and deletions reach the entries.
+        """
+        extra = db['used_car_listings'].insert_one({"make": "Kia", "model": "Rio"}).inserted_id
+        response, status_code = BuyerListing.save_listing({"user_id": self.user_id, "listing_id": str(extra)})
+        self.assertEqual(status_code, 400)
+
+        seen, cursor = [], None
+        while True:
+            response, _ = BuyerListing.get_shortlist(self.user_id, 100, cursor)
+            seen += [entry['listingID'] for entry in response['shortlist']]
+            cursor = response['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(str(listing_id) for listing_id in self.listing_ids))
+
+        edited, deleted = str(self.listing_ids[0]), str(self.listing_ids[1])
+        UsedCarListing.update_listing(edited, {"price": 1234})
+        UsedCarListing.delete_listing(deleted)
+        shortlist = {entry['listingID']: entry for entry in BuyerListing.get_shortlist(self.user_id)[0]['shortlist']}
+        self.assertEqual(shortlist[edited]['price'], 1234)
+        self.assertNotIn(deleted, shortlist)
+
+
+def legacy_serialize_listing(listing):
+    """
+    serialize_listing as it was before the JSON provider encoded BSON types itself.
+    """
+    listing['_id'] = str(listing['_id'])
+    listing['agent_id'] = str(listing['agent_id']) if listing.get('agent_id') else None
+    listing['seller_id'] = str(listing['seller_id']) if listing.get('seller_id') else None
+    listing['created_at'] = listing['created_at'].isoformat() if listing.get('created_at') else None
+    listing['views'] = listing.get('views', 0)
+    listing['shortlists'] = listing.get('shortlists', 0)
+    return listing
+
+
+class TestJSONEncodingBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestJSONEncodingBenchmark')
+
+    def raw_listings(self, count=10000):
+        return [
+            {"_id": ObjectId(), "make": "Toyota", "model": f"Model {i % 40}", "year": 2000 + i % 24,
+             "price": 5000.0 + i, "agent_id": ObjectId(), "seller_id": ObjectId(),
+             "views": i, "shortlists": i % 7, "created_at": datetime.utcnow()}
+            for i in range(count)
+        ]
+
+    def test_listing_response_encoding(self):
+        """
+        Encoding a 10k-listing response: per-field serialization plus Flask's default
+        provider versus raw documents through FastJSONProvider.
+        """
+        legacy_app = Flask('legacy')
+        fast_app = Flask('fast')
+        fast_app.json = FastJSONProvider(fast_app)
+
+        def legacy(listings):
+            listings = [legacy_serialize_listing(listing) for listing in listings]
+            with legacy_app.app_context():
+                return legacy_app.json.response({"listings": listings}).get_data()
+
+        def fast(listings):
+            with fast_app.app_context():
+                return fast_app.json.response({"listings": listings}).get_data()
+
+        self.assertEqual(json.loads(legacy(self.raw_listings(1)))['listings'][0].keys(),
+                         json.loads(fast(self.raw_listings(1)))['listings'][0].keys())
+
+        def best_of(encode, runs=5):
+            # Fresh documents per run, since the legacy serializer mutates them
+            inputs = [self.raw_listings() for _ in range(runs)]
+            timings = []
+            for listings in inputs:
+                start = time.perf_counter()
+                encode(listings)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        legacy_time = best_of(legacy)
+        fast_time = best_of(fast)
+        self.logger.info(
+            f"10k listing response: legacy {legacy_time * 1000:.0f} ms, "
+            f"FastJSONProvider {fast_time * 1000:.0f} ms ({legacy_time / fast_time:.1f}x)"
+        )
+        if ASSERT_TIMINGS:
+            self.assertLess(fast_time, legacy_time)
+
+
+
+class TestRequestMetricsOverhead(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestRequestMetricsOverhead')
+
+    def test_middleware_overhead(self):
+        """
+        Per-request cost of the metrics middleware on a route that does no work.
+        """
+        from app import register_request_metrics
+        from utils import metrics
+
+        def build(instrumented):
+            app = Flask('instrumented' if instrumented else 'plain')
+            app.add_url_rule('/ping/<name>', 'ping', lambda name: 'pong')
+            if instrumented:
+                register_request_metrics(app)
+            return app.test_client()
+
+        def best_of(client, requests=2000, runs=3):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                for i in range(requests):
+                    client.get(f'/ping/{i}')
+                timings.append((time.perf_counter() - start) / requests)
+            return min(timings)
+
+        plain = best_of(build(False))
+        instrumented = best_of(build(True))
+        overhead = instrumented - plain
+        self.logger.info(
+            f"Request metrics middleware: {plain * 1e6:.0f} us plain, "
+            f"{instrumented * 1e6:.0f} us instrumented ({overhead * 1e6:.0f} us overhead)"
+        )
+        # Labelled by route template, so 6000 distinct URLs make one series
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/ping/<name>",status="200"} 6000',
+                      metrics.render())
+        if ASSERT_TIMINGS:
+            self.assertLess(instrumented, plain * 1.5)
+
+
+class SlowStream(io.StringIO):
+    """
+    Stream whose writes take as long as a busy terminal or log pipe.
+    """
+    def write(self, text):
+        time.sleep(0.0002)
+        return super().write(text)
+
+
+class TestLoggingBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestLoggingBenchmark')
+
+    def emit(self, handler, records=2000):
+        bench_logger = logging.getLogger(f'benchmark.{id(handler)}')
+        bench_logger.propagate = False
+        bench_logger.setLevel(logging.INFO)
+        bench_logger.addHandler(handler)
+        listing = {"_id": ObjectId(), "make": "Toyota", "price": 5000.0}
+        start = time.perf_counter()
+        for i in range(records):
+            bench_logger.info("Retrieved listing %s", listing["_id"])
+            bench_logger.debug("Serialized listing: %s", listing)
+        elapsed = time.perf_counter() - start
+        bench_logger.removeHandler(handler)
+        return elapsed
+
+    def test_queued_json_logging(self):
+        """
+        Time request threads spend logging: a synchronous stream handler versus
+        the queued JSON handler from utils.logging_config.
+        """
+        from utils.logging_config import build_handler
+
+        sync_handler, _ = build_handler('text', use_queue=False, stream=SlowStream())
+        sync_time = self.emit(sync_handler)
+
+        stream = SlowStream()
+        queued_handler, listener = build_handler('json', use_queue=True, stream=stream)
+        listener.start()
+        queued_time = self.emit(queued_handler)
+        listener.stop()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2000)
+        self.assertEqual(json.loads(lines[0])["level"], "INFO")
+        self.logger.info(
+            f"2000 log calls: synchronous {sync_time * 1000:.0f} ms, "
+            f"queued {queued_time * 1000:.0f} ms ({sync_time / queued_time:.1f}x)"
+        )
+        if ASSERT_TIMINGS:
+            self.assertLess(queued_time, sync_time / 3)
+
+# Run in a fresh interpreter: build the app, then serve one request that needs no database.
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app(init_database=False)
+ready = time.perf_counter()
+response = app.test_client().post('/api/logout')
+served = time.perf_counter()
+import utils.db
+print(json.dumps({
+    "ready": ready - start, "first_request": served - ready, "status": response.status_code,
+    "numpy_loaded": 'numpy' in sys.modules, "client_created": utils.db._client is not None
+}))
+'''
+
+
+class TestStartupBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = logging.getLogger('TestStartupBenchmark')
+
+    def test_cold_start(self):
+        """
+        Import + create_app + first request in a fresh process. Neither a MongoClient
+        nor numpy may be loaded before a request needs them.
+        """
+        runs = []
+        for _ in range(3):
+            output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=os.path.dirname(current_dir),
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        runs.sort(key=lambda run: run['ready'] + run['first_request'])
+        median = runs[len(runs) // 2]
+
+        self.logger.info(
+            f"cold start: app ready in {median['ready'] * 1000:.0f} ms, "
+            f"first request in {median['first_request'] * 1000:.0f} ms"
+        )
+        self.assertEqual(median['status'], 200)
+        self.assertFalse(median['numpy_loaded'])
+        self.assertFalse(median['client_created'])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_gunicorn(test, workers, app='wsgi:app', **env_overrides):
+    """
+    Starts gunicorn serving `app` with `workers` processes and returns
+    (process, base_url) once it answers.
+    """
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_BIND=f"127.0.0.1:{port}",
+               GUNICORN_ACCESS_LOG='/dev/null', **env_overrides)
+    process = subprocess.Popen(['gunicorn', app], cwd=os.path.dirname(current_dir), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/api/view_listings?limit=1', timeout=1).read()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    test.fail("gunicorn did not start")
+
+
+async def _keepalive_client(host, port, paths, offset, deadline):
+    """
+    One HTTP/1.1 keep-alive connection sending GETs round-robin over `paths`
+    until `deadline`. Returns (requests completed, errors).
+    """
+    done = errors = 0
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return 0, 1
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(f"GET {paths[i % len(paths)]} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            if status == 200:
+                done += 1
+            else:
+                errors += 1
+            i += 1
+    except (OSError, asyncio.IncompleteReadError, ValueError):
+        errors += 1
+    finally:
+        writer.close()
+    return done, errors
+
+
+def concurrent_load_test(base_url, paths, concurrency=1000, duration=10.0):
+    """
+    Holds `concurrency` keep-alive connections open from one event loop and
+    sends GETs over `paths` on each for `duration` seconds.
+    Returns (requests per second, error count, connections that completed a request).
+    """
+    host, port = base_url.rsplit('//', 1)[1].split(':')
+
+    async def run():
+        deadline = time.perf_counter() + duration
+        return await asyncio.gather(*(
+            _keepalive_client(host, int(port), paths, offset, deadline) for offset in range(concurrency)
+        ))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return (sum(done for done, _ in results) / elapsed, sum(errors for _, errors in results),
+            sum(1 for done, _ in results if done))
+
+
+def load_test(base_url, paths, concurrency=16, duration=5.0):
+    """
+    Sends GET requests round-robin over `paths` from `concurrency` threads for `duration` seconds.
+    Returns (requests per second, error count).
+    """
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        done = errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(base_url + paths[i % len(paths)], timeout=10) as response:
+                    response.read()
+                done += 1
+            except OSError:
+                errors += 1
+            i += 1
+        return done, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return sum(done for done, _ in results) / elapsed, sum(errors for _, errors in results)
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+@unittest.skipUnless(shutil.which('gunicorn'), "gunicorn is not installed")
+class TestServerScaling(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed 1k listings for the browse and search endpoints to serve.
+        """
+        cls.logger = logging.getLogger('TestServerScaling')
+        from utils.search import listing_search_tokens
+        listings = []
+        for i in range(1000):
+            listing = {"make": ("Toyota", "Honda", "Ford")[i % 3], "model": f"Model {i % 40}",
+                       "year": 2000 + i % 24, "price": 5000 + i, "views": 0, "shortlists": 0,
+                       "created_at": datetime.utcnow()}
+            listing["search_tokens"] = listing_search_tokens(listing)
+            listings.append(listing)
+        db['used_car_listings'].insert_many(listings)
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def serve(self, workers, app='wsgi:app', **env_overrides):
+        """
+        Starts gunicorn with `workers` processes and returns (process, base_url) once it answers.
+        """
+        return serve_gunicorn(self, workers, app, **env_overrides)
+
+    def measure_throughput(self, workers, paths):
+        process, base_url = self.serve(workers)
+        try:
+            return load_test(base_url, paths)
+        finally:
+            # SIGTERM drains in-flight requests before the workers exit
+            process.terminate()
+            process.wait(timeout=60)
+
+    def test_throughput_scales_with_workers(self):
+        """
+        /api/view_listings and /api/search_cars throughput with one worker versus one per core.
+        """
+        paths = ['/api/view_listings?limit=50', '/api/search_cars?query=toyota&limit=50',
+                 '/api/search_cars?query=model%201&limit=50']
+        cores = os.cpu_count() or 1
+
+        single_rps, single_errors = self.measure_throughput(1, paths)
+        multi_rps, multi_errors = self.measure_throughput(cores, paths)
+
+        self.logger.info(
+            f"view_listings/search_cars throughput: 1 worker {single_rps:.0f} req/s, "
+            f"{cores} workers {multi_rps:.0f} req/s ({multi_rps / single_rps:.2f}x)"
+        )
+        self.assertEqual(single_errors + multi_errors, 0)
+        if ASSERT_TIMINGS:
+            if cores < 2:
+                self.skipTest("Scaling across cores needs more than one CPU")
+            self.assertGreater(multi_rps, single_rps * 1.3)
+
+
+
+@unittest.skipUnless(mongo_available(), "MongoDB is not reachable at MONGO_URI")
+@unittest.skipUnless(shutil.which('gunicorn'), "gunicorn is not installed")
+class TestAsyncConcurrency(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Seed 1k listings and a shortlist for the ported read endpoints to serve.
+        """
+        cls.logger = logging.getLogger('TestAsyncConcurrency')
+        result = db['used_car_listings'].insert_many([
+            {"make": "Toyota", "model": f"Model {i % 40}", "year": 2000 + i % 24, "price": 5000 + i,
+             "views": 0, "shortlists": 0, "created_at": datetime.utcnow()}
+            for i in range(1000)
+        ])
+        cls.listing_ids = [str(oid) for oid in result.inserted_ids]
+        for listing_id in cls.listing_ids[:20]:
+            BuyerListing.save_listing({"user_id": "benchmark_buyer", "listing_id": listing_id})
+
+    @classmethod
+    def tearDownClass(cls):
+        db.client.drop_database(db.name)
+
+    def measure(self, app, **env_overrides):
+        # One worker each, response cache off so every request reaches MongoDB, and no
+        # recycling after max_requests, which would drop every open connection
+        process, base_url = serve_gunicorn(self, 1, app, CACHE_BACKEND='none', GUNICORN_MAX_REQUESTS='0',
+                                           **env_overrides)
+        paths = ['/api/view_listings?limit=50', '/api/view_shortlist?user_id=benchmark_buyer'] + [
+            f'/api/view_listing/{listing_id}' for listing_id in self.listing_ids[:50]
+        ]
+        try:
+            return concurrent_load_test(base_url, paths)
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+
+    def test_requests_per_second_at_1k_clients(self):
+        """
+        1000 concurrent keep-alive clients against one gthread worker (Flask on
+        PyMongo) and one asgi worker (async routes on AsyncMongoClient).
+        """
+        sync_rps, sync_errors, sync_served = self.measure('wsgi:app')
+        async_rps, async_errors, async_served = self.measure('asgi:app', GUNICORN_WORKER_CLASS='asgi')
+
+        self.logger.info(
+            f"1000 concurrent clients, 1 worker: gthread {sync_rps:.0f} req/s "
+            f"({sync_errors} errors, {sync_served} clients served), asgi {async_rps:.0f} req/s "
+            f"({async_errors} errors, {async_served} clients served), {async_rps / max(sync_rps, 1):.2f}x"
+        )
+        self.assertEqual(async_errors, 0)
+        self.assertEqual(async_served, 1000)
+
+
+if __name__ == '__main__':
+    with open('benchmark_output.txt', 'w') as f:
+        runner = unittest.TextTestRunner(stream=f, verbosity=2)
+        unittest.main(testRunner=runner, exit=False)
@@ -0,0 +1,386 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+from bson import ObjectId
+from flask import Flask, Response
+from pymongo.errors import BulkWriteError, AutoReconnect
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+# Unit tests for the helpers under utils/; none of them needs a MongoDB server.
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(current_dir))
+
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_limit, parse_page_limit, parse_fields, build_projection,
+    page_response, encode_cursor, decode_cursor, id_cursor_filter, key_cursor_filter, _page_query, _split_page
+)
+from utils.analytics import parse_timestamp
+from utils.cache import LRUCache, NullCache, cache_key
+from utils.conditional import is_fresh, not_modified, add_validators
+from utils.counters import CounterBuffer
+from utils import migrations
+from utils.loan_calculator import LoanCalculator, BatchLoanCalculator
+from utils.search import tokenize, listing_search_tokens, query_filter, range_filters, format_facets
+
+
+class TestPagination(unittest.TestCase):
+    def test_parse_limit(self):
+        self.assertIsNone(parse_limit(None))
+        self.assertEqual(parse_limit('', DEFAULT_PAGE_SIZE), DEFAULT_PAGE_SIZE)
+        self.assertEqual(parse_limit('20'), 20)
+        self.assertEqual(parse_limit(str(MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        for bad in ('abc', '1.5', '0', '-3', str(MAX_PAGE_SIZE + 1)):
+            with self.assertRaises(ValueError):
+                parse_limit(bad)
+
+    def test_parse_page_limit_defaults_only_with_a_cursor(self):
+        self.assertIsNone(parse_page_limit(None, None))
+        self.assertEqual(parse_page_limit(None, 'token'), DEFAULT_PAGE_SIZE)
+        self.assertEqual(parse_page_limit('5', 'token'), 5)
+
+    def test_fields_and_projection(self):
+        self.assertIsNone(parse_fields('', ('make',)))
+        self.assertEqual(parse_fields('make, price', ('make', 'price')), ['make', 'price'])
+        with self.assertRaises(ValueError):
+            parse_fields('make,password', ('make',))
+        self.assertIsNone(build_projection(None))
+        self.assertEqual(build_projection(['make']), {'make': 1, '_id': 1})
+
+    def test_cursor_round_trip(self):
+        position = {"id": str(ObjectId()), "rating": 4.5}
+        token = encode_cursor(position)
+        self.assertNotIn('=', token)
+        self.assertEqual(decode_cursor(token), position)
+
+    def test_malformed_cursors_are_rejected(self):
+        for token in ('not base64!', encode_cursor([1, 2])[:-1], 'W10', ''):
+            with self.assertRaises(ValueError):
+                decode_cursor(token)
+        with self.assertRaises(ValueError):
+            id_cursor_filter(encode_cursor({"id": "not-an-object-id"}))
+        with self.assertRaises(ValueError):
+            key_cursor_filter(encode_cursor({"id": str(ObjectId())}), 'rating')
+
+    def test_key_cursor_accepts_only_numbers(self):
+        last_id = ObjectId()
+        for forged in ({"$gt": 0}, "5", True, None, [1]):
+            with self.assertRaises(ValueError):
+                key_cursor_filter(encode_cursor({"id": str(last_id), "rating": forged}), 'rating')
+        self.assertEqual(key_cursor_filter(encode_cursor({"id": str(last_id), "rating": 4}), 'rating'), {"$or": [
+            {"rating": {"$lt": 4}},
+            {"rating": 4, "_id": {"$lt": last_id}},
+        ]})
+
+    def test_page_query_and_split(self):
+        last_id = ObjectId()
+        token = encode_cursor({"id": str(last_id)})
+        self.assertEqual(_page_query({"make": "Kia"}, None), {"make": "Kia"})
+        self.assertEqual(_page_query({}, token), {"_id": {"$lt": last_id}})
+        self.assertEqual(_page_query({"make": "Kia"}, token), {"$and": [{"make": "Kia"}, {"_id": {"$lt": last_id}}]})
+
+        documents = [{"_id": ObjectId(), "rating": 5 - i} for i in range(4)]
+        page, next_cursor = _split_page(documents, 3, 'rating')
+        self.assertEqual(page, documents[:3])
+        self.assertEqual(decode_cursor(next_cursor), {"id": str(documents[2]['_id']), "rating": 3})
+        self.assertEqual(_split_page(documents, 4), (documents, None))
+
+    def test_page_response(self):
+        self.assertEqual(page_response("listings", [], None), {"listings": []})
+        self.assertEqual(page_response("listings", [], 10, 'next'), {"listings": [], "next_cursor": 'next'})
+
+
+class TestSearch(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize('  Ford F-150 '), ['ford', 'f', '150'])
+        self.assertEqual(tokenize(2015), ['2015'])
+        self.assertEqual(tokenize('---'), [])
+
+    def test_listing_tokens_include_joined_forms(self):
+        self.assertEqual(
+            listing_search_tokens({"make": "Ford", "model": "F-150", "year": 2015, "price": 9000}),
+            ['150', '2015', 'f', 'f150', 'ford']
+        )
+
+    def test_query_filter(self):
+        self.assertIsNone(query_filter(''))
+        self.assertIsNone(query_filter('!!'))
+        self.assertEqual(query_filter('Toy'), {"search_tokens": {"$regex": "^toy"}})
+        self.assertEqual(query_filter('toyota cor'), {"$and": [
+            {"search_tokens": {"$regex": "^toyota"}},
+            {"search_tokens": {"$regex": "^cor"}},
+        ]})
+
+    def test_range_filters(self):
+        self.assertEqual(range_filters(None), [])
+        self.assertEqual(
+            range_filters({"make": "Kia", "min_year": "2010", "max_price": "9999.5", "min_price": ""}),
+            [{"make": "Kia"}, {"year": {"$gte": 2010}}, {"price": {"$lte": 9999.5}}]
+        )
+        for bad in ({"min_year": "2010.5"}, {"max_price": "cheap"}):
+            with self.assertRaises(ValueError):
+                range_filters(bad)
+
+    def test_format_facets(self):
+        facets = format_facets({"make": [{"_id": "Kia", "count": 3}]})
+        self.assertEqual(facets["make"], [{"value": "Kia", "count": 3}])
+        self.assertEqual(facets["year"], [])
+        self.assertEqual(format_facets(None)["model"], [])
+
+
+class FakeCounterCollection:
+    """
+    Stands in for a collection; bulk_write raises `error` if one is set.
+    """
+
+    def __init__(self):
+        self.error = None
+        self.operations = []
+
+    def bulk_write(self, operations, ordered=True):
+        self.operations = operations
+        if self.error is not None:
+            raise self.error
+
+
+class TestCounterBuffer(unittest.TestCase):
+    def setUp(self):
+        self.collection = FakeCounterCollection()
+        self.flushed = []
+        # A long interval keeps the background thread out of the way; the tests flush directly
+        self.buffer = CounterBuffer(self.collection, flush_interval_ms=60000,
+                                    on_flush=lambda batch, flushed_at: self.flushed.append(batch))
+        self.addCleanup(self.stop_buffer)
+
+    def stop_buffer(self):
+        self.collection.error = None
+        self.buffer.stop()
+
+    def test_flush_coalesces_increments(self):
+        self.buffer.increment('a', 'views')
+        self.buffer.increment('a', 'views')
+        self.buffer.increment('b', 'shortlists', 3)
+        self.assertEqual(self.buffer.pending('a'), {'views': 2})
+
+        batch = self.buffer.flush()
+        self.assertEqual({key: dict(counts) for key, counts in batch.items()},
+                         {'a': {'views': 2}, 'b': {'shortlists': 3}})
+        self.assertEqual(len(self.collection.operations), 2)
+        self.assertEqual(self.buffer.pending('a'), {})
+        self.assertEqual(self.flushed, [batch])
+        self.assertEqual(self.buffer.flush(), {})
+
+    def test_bulk_write_error_restores_only_failed_updates(self):
+        for document_id in ('a', 'b', 'c'):
+            self.buffer.increment(document_id, 'views')
+        self.collection.error = BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "failed"}]})
+
+        batch = self.buffer.flush()
+        self.assertEqual(sorted(batch), ['a', 'c'])
+        self.assertEqual(self.flushed, [batch])
+        self.assertEqual(self.buffer.pending('a'), {})
+        self.assertEqual(self.buffer.pending('b'), {'views': 1})
+
+        self.buffer.increment('b', 'views')
+        self.collection.error = None
+        self.assertEqual(dict(self.buffer.flush()['b']), {'views': 2})
+
+    def test_connection_error_restores_everything(self):
+        self.buffer.increment('a', 'views')
+        self.buffer.increment('b', 'views')
+        self.collection.error = AutoReconnect("connection lost")
+
+        self.assertEqual(self.buffer.flush(), {})
+        self.assertEqual(self.flushed, [])
+        self.assertEqual(self.buffer.pending('a'), {'views': 1})
+        self.assertEqual(self.buffer.pending('b'), {'views': 1})
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_and_set(self):
+        cache = LRUCache(max_entries=4, default_ttl=60)
+        self.assertIsNone(cache.get('listings', 'k'))
+        cache.set('listings', 'k', [1])
+        self.assertEqual(cache.get('listings', 'k'), [1])
+        self.assertIsNone(cache.get('reviews', 'k'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(default_ttl=60)
+        cache.set('listings', 'k', 'stale', ttl=-1)
+        self.assertIsNone(cache.get('listings', 'k'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_invalidate_drops_the_namespace_only(self):
+        cache = LRUCache()
+        cache.set('listings', 'k', 'old')
+        cache.set('reviews', 'k', 'kept')
+        cache.invalidate('listings')
+        self.assertIsNone(cache.get('listings', 'k'))
+        self.assertEqual(cache.get('reviews', 'k'), 'kept')
+        cache.set('listings', 'k', 'new')
+        self.assertEqual(cache.get('listings', 'k'), 'new')
+
+    def test_set_across_an_invalidation_is_dropped(self):
+        cache = LRUCache()
+        generation = cache.generation('listings')
+        # A write lands while the value is being computed
+        cache.invalidate('listings')
+        cache.set('listings', 'k', 'computed before the write', generation=generation)
+        self.assertIsNone(cache.get('listings', 'k'))
+
+        generation = cache.generation('listings')
+        cache.set('listings', 'k', 'fresh', generation=generation)
+        self.assertEqual(cache.get('listings', 'k'), 'fresh')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('listings', 'a', 1)
+        cache.set('listings', 'b', 2)
+        cache.get('listings', 'a')
+        cache.set('listings', 'c', 3)
+        self.assertIsNone(cache.get('listings', 'b'))
+        self.assertEqual(cache.get('listings', 'a'), 1)
+        self.assertEqual(cache.get('listings', 'c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_null_cache_stores_nothing(self):
+        cache = NullCache()
+        cache.set('listings', 'k', 1)
+        self.assertIsNone(cache.get('listings', 'k'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_cache_key_ignores_argument_order(self):
+        self.assertEqual(cache_key('find', {"b": 1, "a": 2}), cache_key('find', {"a": 2, "b": 1}))
+        self.assertNotEqual(cache_key('find', 1), cache_key('find', '1'))
+
+
+class TestConditional(unittest.TestCase):
+    LAST_MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+    def test_if_none_match(self):
+        self.assertTrue(is_fresh('"v1"', None, 'v1'))
+        self.assertTrue(is_fresh('"v0", "v1"', None, 'v1'))
+        self.assertTrue(is_fresh('W/"v1"', None, 'v1'))
+        self.assertTrue(is_fresh('*', None, 'v1'))
+        self.assertFalse(is_fresh('"v0"', None, 'v1'))
+        self.assertFalse(is_fresh(None, None, 'v1'))
+
+    def test_if_modified_since(self):
+        self.assertTrue(is_fresh(None, 'Wed, 01 May 2024 12:30:15 GMT', 'v1', self.LAST_MODIFIED))
+        self.assertTrue(is_fresh(None, 'Thu, 02 May 2024 00:00:00 GMT', 'v1', self.LAST_MODIFIED))
+        self.assertFalse(is_fresh(None, 'Wed, 01 May 2024 12:30:14 GMT', 'v1', self.LAST_MODIFIED))
+        self.assertFalse(is_fresh(None, 'not a date', 'v1', self.LAST_MODIFIED))
+        self.assertFalse(is_fresh(None, 'Thu, 02 May 2024 00:00:00 GMT', 'v1', None))
+
+    def test_if_none_match_takes_precedence(self):
+        since = 'Thu, 02 May 2024 00:00:00 GMT'
+        self.assertFalse(is_fresh('"v0"', since, 'v1', self.LAST_MODIFIED))
+        self.assertTrue(is_fresh('"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT', 'v1', self.LAST_MODIFIED))
+
+    def test_not_modified_response(self):
+        app = Flask(__name__)
+        with app.test_request_context(headers={'If-None-Match': '"v1"'}):
+            response = not_modified('v1', self.LAST_MODIFIED)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.headers['ETag'], '"v1"')
+            self.assertEqual(response.headers['Last-Modified'], 'Wed, 01 May 2024 12:30:15 GMT')
+        with app.test_request_context(headers={'If-None-Match': '"v0"'}):
+            self.assertIsNone(not_modified('v1'))
+
+        response = add_validators(Response('{}'), 'v2')
+        self.assertEqual(response.headers['ETag'], '"v2"')
+        self.assertNotIn('Last-Modified', response.headers)
+
+
+class TestBatchLoanCalculator(unittest.TestCase):
+    def test_matches_the_single_calculator(self):
+        result = BatchLoanCalculator(12000, [0, 5], [24, 48], [0, 2000]).calculate()
+        for i, rate in enumerate([0, 5]):
+            for j, term in enumerate([24, 48]):
+                for k, down_payment in enumerate([0, 2000]):
+                    single = LoanCalculator(12000, rate, term, down_payment).calculate()
+                    self.assertEqual(result['monthly_payment'][i][j][k], single['monthly_payment'])
+                    self.assertEqual(result['total_interest'][i][j][k], single['total_interest'])
+
+    def test_zero_rate_schedule_is_straight_line(self):
+        schedule, = BatchLoanCalculator(1200, [0], [3]).amortization_schedules()
+        self.assertEqual(schedule['monthly_payment'], 400.0)
+        self.assertEqual(schedule['interest'], [0.0, 0.0, 0.0])
+        self.assertEqual(schedule['balance'], [800.0, 400.0, 0.0])
+
+    def test_invalid_axes_are_rejected(self):
+        for rates, terms in (([-1], [12]), ([5], [12.5]), ([5], [0]), ([], [12])):
+            with self.assertRaises(ValueError):
+                BatchLoanCalculator(12000, rates, terms)
+
+
+class TestParseTimestamp(unittest.TestCase):
+    def test_offsets_are_converted_to_naive_utc(self):
+        expected = datetime(2024, 5, 1, 10, 0)
+        for value in ('2024-05-01T10:00:00', '2024-05-01T10:00:00Z', '2024-05-01T10:00:00+00:00',
+                      '2024-05-01T12:00:00+02:00', '2024-05-01 10:00:00Z'):
+            self.assertEqual(parse_timestamp(value, 'start'), expected, value)
+        self.assertEqual(parse_timestamp('2024-05-01', 'start'), datetime(2024, 5, 1))
+
+    def test_unencoded_plus_decoded_as_space(self):
+        self.assertEqual(parse_timestamp('2024-05-01T10:00:00 00:00', 'start'), datetime(2024, 5, 1, 10, 0))
+        self.assertEqual(parse_timestamp('2024-05-01 12:30:00 02:00', 'start'), datetime(2024, 5, 1, 10, 30))
+
+    def test_malformed_values_name_the_parameter(self):
+        for value in ('yesterday', '2024-13-01', '', None):
+            with self.assertRaisesRegex(ValueError, '^end must be'):
+                parse_timestamp(value, 'end')
+
+
+@unittest.skipUnless(mongomock, "mongomock is not installed")
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.applied = []
+        patcher = mock.patch.object(migrations, 'MIGRATIONS', [
+            (1, "first", lambda db: self.applied.append(1)),
+            (2, "second", lambda db: self.applied.append(2)),
+        ])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_version_runs_once(self):
+        self.assertEqual(migrations.run_migrations(self.db), 2)
+        self.assertEqual(migrations.run_migrations(self.db), 2)
+        self.assertEqual(self.applied, [1, 2])
+        self.assertEqual(migrations.applied_version(self.db), 2)
+
+    def test_resumes_from_per_version_records(self):
+        self.db[migrations.MIGRATIONS_COLLECTION].insert_one({'_id': 1, 'description': "first"})
+        self.assertEqual(migrations.applied_version(self.db), 1)
+        self.assertEqual(migrations.run_migrations(self.db), 2)
+        self.assertEqual(self.applied, [2])
+
+    def test_claimed_version_is_left_to_its_owner(self):
+        self.assertTrue(migrations._claim_migration(self.db, 0, 1))
+        self.assertFalse(migrations._claim_migration(self.db, 0, 1))
+        self.assertEqual(migrations.run_migrations(self.db), 0)
+        self.assertEqual(self.applied, [])
+
+    def test_failed_migration_releases_its_claim(self):
+        def fail(db):
+            raise RuntimeError("migration failed")
+
+        with mock.patch.object(migrations, 'MIGRATIONS', [(1, "failing", fail)]):
+            with self.assertRaises(RuntimeError):
+                migrations.run_migrations(self.db)
+        self.assertEqual(migrations.applied_version(self.db), 0)
+        self.assertEqual(migrations.run_migrations(self.db), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# backend/utils/analytics.py
+
+from datetime import datetime, timedelta, timezone
+
+# Supported bucket sizes for the listing_metrics time series
+GRANULARITIES = ('hour', 'day')
+DEFAULT_GRANULARITY = 'day'
+DEFAULT_RANGE_DAYS = 7
+
+# Longest range a single series request may cover, per granularity
+MAX_RANGE = {
+    'hour': timedelta(days=31),
+    'day': timedelta(days=366),
+}
+
+
+def bucket_start(timestamp, granularity):
+    """
+    Truncates a timestamp to the start of its hourly or daily bucket.
+    """
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_timestamp(value, name):
+    """
+    Parses an ISO 8601 query-string value into a naive UTC datetime.
+    Accepts a trailing 'Z', and a '+HH:MM' offset whose '+' arrived unencoded
+    and was decoded to a space.
+    Raises ValueError naming the parameter if it is malformed.
+    """
+    try:
+        value = value.strip()
+        if value.endswith(('Z', 'z')):
+            value = value[:-1] + '+00:00'
+        # The first 'T' (or space) separates the date; any later space was a '+'
+        date, separator, time = value.partition('T' if 'T' in value else ' ')
+        value = date + separator + time.replace(' ', '+')
+        timestamp = datetime.fromisoformat(value)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime.") from e
+    # Buckets are stored as naive UTC, like every other timestamp in the models
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def parse_series_range(start=None, end=None, granularity=None):
+    """
+    Validates the raw 'start', 'end' and 'granularity' query-string values.
+    Defaults to daily buckets over the last DEFAULT_RANGE_DAYS days.
+    Raises ValueError on unknown granularities, malformed dates or oversized ranges.
+    Returns a tuple of (start, end, granularity) with start aligned to its bucket boundary.
+    """
+    granularity = granularity or DEFAULT_GRANULARITY
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}.")
+
+    end = parse_timestamp(end, 'end') if end else datetime.utcnow()
+    start = parse_timestamp(start, 'start') if start else end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise ValueError("start must not be after end.")
+    if end - start > MAX_RANGE[granularity]:
+        raise ValueError(f"Range too large for {granularity} buckets.")
+    return bucket_start(start, granularity), end, granularity
+
+
+def rollup(buckets):
+    """
+    Groups listing_metrics bucket documents into per-listing series and one
+    combined series summed across listings, both ordered by bucket.
+    Returns a tuple of ({listing_id: [point, ...]}, [point, ...]).
+    """
+    per_listing = {}
+    combined = {}
+    for bucket in buckets:
+        point = {
+            "bucket": bucket['bucket'].isoformat(),
+            "views": bucket.get('views', 0),
+            "shortlists": bucket.get('shortlists', 0)
+        }
+        per_listing.setdefault(str(bucket['listing_id']), []).append(point)
+
+        total = combined.setdefault(point['bucket'], {"bucket": point['bucket'], "views": 0, "shortlists": 0})
+        total['views'] += point['views']
+        total['shortlists'] += point['shortlists']
+
+    for series in per_listing.values():
+        series.sort(key=lambda point: point['bucket'])
+    return per_listing, [combined[key] for key in sorted(combined)]
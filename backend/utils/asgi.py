@@ -0,0 +1,82 @@
+# backend/utils/asgi.py
+
+import functools
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import http_date, quote_etag
+from utils import metrics
+from utils.conditional import is_fresh
+from utils.json_provider import dumps_bytes
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded like the Flask app's FastJSONProvider, so ObjectId,
+    datetime and Decimal128 values render identically on both stacks.
+    """
+    media_type = 'application/json'
+
+    def render(self, content):
+        return dumps_bytes(content)
+
+
+def _validator_headers(etag, last_modified=None):
+    headers = {'ETag': quote_etag(etag)}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def json_response(payload, status_code, etag=None, last_modified=None):
+    """
+    Builds the JSON response for a model result; validators are only attached
+    to successful responses.
+    """
+    headers = _validator_headers(etag, last_modified) if etag is not None and status_code == 200 else None
+    return FastJSONResponse(payload, status_code=status_code, headers=headers)
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Starlette counterpart of utils.conditional.not_modified.
+    Returns a 304 response carrying the validators if the client's copy is current,
+    otherwise None.
+    """
+    if not is_fresh(request.headers.get('if-none-match'), request.headers.get('if-modified-since'),
+                    etag, last_modified):
+        return None
+    return Response(status_code=304, headers=_validator_headers(etag, last_modified))
+
+
+async def json_body(request):
+    """
+    Returns the parsed JSON request body, or None if it is missing or malformed
+    (the models answer None with their usual 400).
+    """
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def api_route(path, endpoint, methods):
+    """
+    Builds a Starlette route whose requests are recorded in the request metrics
+    under `path`, like the Flask app's routes.
+    """
+    if not metrics.METRICS_ENABLED:
+        return Route(path, endpoint, methods=methods)
+
+    @functools.wraps(endpoint)
+    async def instrumented(request):
+        stats = metrics.start_request(path)
+        status_code, size = 500, None
+        try:
+            response = await endpoint(request)
+            status_code = response.status_code
+            size = len(response.body) if hasattr(response, 'body') else None
+            return response
+        finally:
+            metrics.finish_request(stats, request.method, status_code, size)
+
+    return Route(path, instrumented, methods=methods)
@@ -0,0 +1,82 @@
+# backend/utils/async_db.py
+
+import asyncio
+import os
+import weakref
+from pymongo import AsyncMongoClient
+from utils import metrics
+from utils.db import client_options, read_preference
+
+# One AsyncMongoClient per process and event loop; a client is bound to the loop
+# it first runs on, so a new loop (or a forked worker) gets a fresh one. Keyed on
+# the loop itself so a closed loop's entry goes with it and a later loop that
+# reuses its address cannot pick up its client.
+_clients = weakref.WeakKeyDictionary()
+os.register_at_fork(after_in_child=_clients.clear)
+
+
+def get_async_client():
+    """
+    Returns the AsyncMongoClient of the running event loop, creating it on first
+    use with the same pool settings and command listeners as the sync client.
+    Must be called from a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        options = client_options()
+        options.setdefault('event_listeners', metrics.event_listeners())
+        client = _clients[loop] = AsyncMongoClient(os.getenv('MONGO_URI'), connect=False, **options)
+    return client
+
+
+async def close_async_clients():
+    """
+    Closes the clients created by this process for the running event loop.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+class AsyncLazyDatabase:
+    """
+    Async counterpart of utils.db.LazyDatabase: db[name] returns a handle whose
+    attributes resolve, per call, to the collection on the running loop's client.
+    """
+
+    def __init__(self, name, **options):
+        self._name = name
+        self._options = options
+
+    def resolve(self):
+        return get_async_client().get_database(self._name, **self._options)
+
+    def __getitem__(self, name):
+        return AsyncLazyCollection(self, name)
+
+
+class AsyncLazyCollection:
+    """
+    Stands in for a pymongo AsyncCollection; resolved on every attribute access
+    because the underlying client depends on the running event loop.
+    """
+
+    def __init__(self, database, name):
+        self._database = database
+        self._name = name
+
+    def resolve(self):
+        return self._database.resolve()[self._name]
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+
+# Same split as utils.db: writes and read-your-writes on the primary,
+# search and analytics reads on MONGO_READ_PREFERENCE.
+async_db = AsyncLazyDatabase(os.getenv('DB_NAME'))
+async_read_db = AsyncLazyDatabase(
+    os.getenv('DB_NAME'),
+    read_preference=read_preference(os.getenv('MONGO_READ_PREFERENCE', 'secondaryPreferred'))
+)
@@ -0,0 +1,75 @@
+# backend/utils/bulk_import.py
+
+import csv
+import io
+import json
+from itertools import islice
+
+# Accepted upload content types, mapped to the parser used for them
+BULK_FORMATS = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/x-jsonlines': 'jsonl',
+}
+
+
+def detect_format(mimetype, requested=None):
+    """
+    Picks the upload format from an explicit 'format' parameter ('csv' or 'jsonl')
+    or, failing that, from the request content type.
+    Returns 'csv', 'jsonl' or None if neither identifies a supported format.
+    """
+    if requested:
+        requested = requested.lower()
+        return requested if requested in ('csv', 'jsonl') else None
+    return BULK_FORMATS.get((mimetype or '').lower())
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    for row_number, row in enumerate(reader, start=1):
+        if None in row or None in row.values():
+            yield row_number, None, "Row does not have the same number of columns as the header."
+            continue
+        yield row_number, row, None
+
+
+def _jsonl_rows(text):
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, None, "Row is not valid JSON."
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Row must be a JSON object."
+            continue
+        yield row_number, row, None
+
+
+def parse_rows(stream, fmt, encoding='utf-8'):
+    """
+    Lazily parses an uploaded CSV (with a header row) or JSON-lines byte stream.
+    Yields (row_number, row_dict, parse_error) per data row, numbered from 1;
+    row_dict is None when parse_error is set.
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='' if fmt == 'csv' else None)
+    return _csv_rows(text) if fmt == 'csv' else _jsonl_rows(text)
+
+
+def chunked(iterable, size):
+    """
+    Yields lists of up to `size` consecutive items.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,176 @@
+# backend/utils/cache.py
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Every cache created through make_cache, by name, for the stats endpoint
+CACHES = {}
+
+
+def cache_key(*parts):
+    """
+    Builds a cache key from the parts of a query shape (method name and arguments).
+    """
+    return json.dumps(parts, default=str, sort_keys=True, separators=(',', ':'))
+
+
+class CacheBackend:
+    """
+    Interface for response caches. A backend stores values under string keys
+    grouped into namespaces; invalidating a namespace drops every key in it.
+    Shared backends (e.g. a Redis or memcached client) implement the same four
+    methods so the models do not change when one is plugged in.
+    """
+
+    def generation(self, namespace):
+        """
+        Returns a token for the current state of `namespace`. Callers read it
+        before computing a value and pass it to set(), so a value computed
+        across an invalidation is never served.
+        """
+        raise NotImplementedError
+
+    def get(self, namespace, key):
+        """
+        Returns the cached value, or None on a miss.
+        """
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl=None, generation=None):
+        """
+        Stores a value, optionally for at most `ttl` seconds. With a `generation`
+        from generation(), the value is dropped if `namespace` was invalidated since.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, namespace):
+        """
+        Drops every value stored in `namespace`.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        Returns a dict of counters for monitoring.
+        """
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """
+    Backend that never stores anything; used when caching is disabled.
+    """
+
+    def __init__(self):
+        self.misses = 0
+
+    def generation(self, namespace):
+        return None
+
+    def get(self, namespace, key):
+        self.misses += 1
+        return None
+
+    def set(self, namespace, key, value, ttl=None, generation=None):
+        pass
+
+    def invalidate(self, namespace):
+        pass
+
+    def stats(self):
+        return {"backend": "none", "hits": 0, "misses": self.misses, "evictions": 0,
+                "invalidations": 0, "size": 0}
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process least-recently-used cache holding at most `max_entries` values,
+    each for at most `default_ttl` seconds unless set() passes its own ttl.
+    Invalidating a namespace bumps its generation, so older keys are simply
+    never read again and age out of the LRU order; a value whose read started
+    before the bump is discarded by set(). Invalidation is local to this
+    process; other workers see changes once their entries expire.
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _full_key(self, namespace, key):
+        return namespace, self._generations.get(namespace, 0), key
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get(self, namespace, key):
+        with self._lock:
+            full_key = self._full_key(namespace, key)
+            entry = self._entries.get(full_key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[full_key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, namespace, key, value, ttl=None, generation=None):
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            full_key = self._full_key(namespace, key)
+            if generation is not None and generation != full_key[1]:
+                # Stored under the old generation it could never be read again
+                return
+            self._entries[full_key] = (expires_at, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "lru", "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "invalidations": self.invalidations,
+                    "size": len(self._entries), "max_entries": self.max_entries}
+
+
+def make_cache(name, max_entries=1024, default_ttl=60):
+    """
+    Creates the cache backend selected by CACHE_BACKEND ('lru' by default, or
+    'none' to disable caching) and registers it under `name` for stats().
+    CACHE_MAX_ENTRIES and CACHE_TTL_SECONDS override the given sizes.
+    """
+    backend = os.getenv('CACHE_BACKEND', 'lru').lower()
+    if backend == 'none':
+        cache = NullCache()
+    elif backend == 'lru':
+        cache = LRUCache(
+            max_entries=int(os.getenv('CACHE_MAX_ENTRIES', str(max_entries))),
+            default_ttl=float(os.getenv('CACHE_TTL_SECONDS', str(default_ttl)))
+        )
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND '{backend}'.")
+    CACHES[name] = cache
+    return cache
+
+
+def stats():
+    """
+    Returns the counters of every registered cache, keyed by cache name.
+    """
+    return {name: cache.stats() for name, cache in CACHES.items()}
@@ -0,0 +1,42 @@
+# backend/utils/conditional.py
+
+from flask import Response, request
+from werkzeug.http import parse_date, parse_etags
+
+
+def is_fresh(if_none_match, if_modified_since, etag, last_modified=None):
+    """
+    Checks a request's raw If-None-Match (or, without it, If-Modified-Since)
+    header against the current validators of a resource. If-None-Match uses the
+    weak comparison, so a W/ tag added by a proxy still matches.
+    Returns True if the client's copy is current.
+    """
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    since = parse_date(if_modified_since) if if_modified_since else None
+    if last_modified is None or since is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Checks the current Flask request's conditional headers against the current
+    validators of a resource.
+    Returns a 304 response carrying the validators if the client's copy is current,
+    otherwise None.
+    """
+    if not is_fresh(request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'),
+                    etag, last_modified):
+        return None
+    return add_validators(Response(status=304), etag, last_modified)
+
+
+def add_validators(response, etag, last_modified=None):
+    """
+    Sets a strong ETag and, if given, Last-Modified on a response.
+    """
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
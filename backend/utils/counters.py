@@ -0,0 +1,145 @@
+# backend/utils/counters.py
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for document counters. Increments are coalesced per
+    document id in memory and written with a single unordered bulk_write every
+    `flush_interval_ms`, or sooner once `max_events` increments are pending.
+    Pending increments are flushed at interpreter exit as well.
+    """
+
+    def __init__(self, collection, flush_interval_ms=1000, max_events=500, on_flush=None, touch_field=None):
+        """
+        :param collection: (Collection) The collection holding the counter fields.
+        :param flush_interval_ms: (int) Maximum time an increment stays buffered.
+        :param max_events: (int) Number of pending increments that triggers an early flush.
+        :param on_flush: (callable) Optional hook called as on_flush(batch, flushed_at)
+                         after every successful flush, e.g. to feed analytics.
+        :param touch_field: (str) Optional date field set to the server time on every
+                            document a flush updates.
+        """
+        self.collection = collection
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_events = max_events
+        self.on_flush = on_flush
+        self.touch_field = touch_field
+        self._reset()
+        # Reset in a forked child before anything can touch the inherited lock
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.stop)
+
+    def _reset(self):
+        """
+        Initializes the per-process state. Called again in a forked child, which
+        inherits the parent's pending counts (the parent flushes those) and its
+        lock, possibly held by the parent's flush thread, but not the thread.
+        """
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+        self._events = 0
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def increment(self, document_id, field, amount=1):
+        """
+        Buffers an increment of `field` on the document with `document_id`.
+        """
+        with self._lock:
+            self._ensure_started()
+            self._pending[document_id][field] += amount
+            self._events += 1
+            if self._events >= self.max_events:
+                self._wake.set()
+
+    def pending(self, document_id):
+        """
+        Returns the increments buffered for a document that have not been written yet.
+        """
+        with self._lock:
+            return dict(self._pending.get(document_id, {}))
+
+    def _swap(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(Counter)
+            self._events = 0
+        return batch
+
+    def _restore(self, batch):
+        with self._lock:
+            for document_id, counts in batch.items():
+                self._pending[document_id].update(counts)
+                self._events += sum(counts.values())
+
+    def flush(self):
+        """
+        Writes every buffered increment with one bulk_write. Increments whose
+        update failed are put back so the next flush retries them.
+        Returns the batch that was written, as {document_id: {field: amount}}.
+        """
+        batch = self._swap()
+        if not batch:
+            return {}
+
+        update_extra = {"$currentDate": {self.touch_field: True}} if self.touch_field else {}
+        document_ids = list(batch)
+        operations = [
+            UpdateOne({"_id": document_id}, {"$inc": dict(batch[document_id]), **update_extra})
+            for document_id in document_ids
+        ]
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # The write is unordered, so every operation without a write error
+            # was applied; only the failed ones go back for the next flush
+            failed_ids = [document_ids[error['index']] for error in e.details.get('writeErrors', [])]
+            logger.error("Failed to flush %s of %s counter updates: %s", len(failed_ids), len(operations), e)
+            self._restore({document_id: batch.pop(document_id) for document_id in failed_ids})
+            if not batch:
+                return {}
+        except PyMongoError as e:
+            logger.error("Failed to flush %s counter updates: %s", len(operations), e)
+            self._restore(batch)
+            return {}
+        logger.debug("Flushed counter updates for %s documents.", len(batch))
+
+        if self.on_flush is not None:
+            try:
+                self.on_flush(batch, datetime.utcnow())
+            except Exception as e:
+                logger.exception("Counter flush hook failed: %s", e)
+        return batch
+
+    def stop(self):
+        """
+        Stops the flush thread and writes whatever is still buffered.
+        """
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
@@ -1,13 +1,152 @@
 # backend/utils/db.py
+import logging
+import threading
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from pymongo.read_preferences import ReadPreference
 from dotenv import load_dotenv
+from utils import metrics
 import os
 
 load_dotenv()
 
-client = MongoClient(os.getenv('MONGO_URI'))
-db = client[os.getenv('DB_NAME')]
+logger = logging.getLogger(__name__)
+
+# Environment variables mapped onto MongoClient pool options; unset ones keep the
+# driver default (or whatever the connection string specifies).
+CLIENT_OPTIONS = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', int),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGO_COMPRESSORS': ('compressors', str),  # e.g. "zstd,snappy,zlib"
+}
+
+# Read preference for search and analytics reads, which tolerate slightly stale data
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
+
+
+def client_options():
+    """
+    Collects the pool settings configured through the environment.
+    Returns a dict of MongoClient keyword arguments.
+    """
+    options = {}
+    for variable, (option, cast) in CLIENT_OPTIONS.items():
+        value = os.getenv(variable)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+def create_client(uri=None, **overrides):
+    """
+    Builds a MongoClient with the configured pool settings. The client connects
+    lazily, so it is safe to create before a pre-fork server forks its workers.
+    Commands are reported to the request metrics unless METRICS_ENABLED=false.
+    """
+    options = client_options()
+    options.update(overrides)
+    options.setdefault('connect', False)
+    options.setdefault('event_listeners', metrics.event_listeners())
+    return MongoClient(uri or os.getenv('MONGO_URI'), **options)
+
+
+def read_preference(name):
+    """
+    Resolves a read preference mode name such as 'secondaryPreferred'.
+    Raises ValueError on unknown names.
+    """
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference '{name}'.")
+    return READ_PREFERENCES[name]
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the process-wide MongoClient, creating it on first use. A forked
+    child gets a fresh client instead of the one inherited from its parent.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = create_client()
+                _client_pid = os.getpid()
+    return _client
+
+
+class LazyDatabase:
+    """
+    Stands in for a pymongo Database and resolves it through get_client() on
+    first use, so importing a model module neither creates a client nor binds
+    its collections to one. db[name] returns a LazyCollection.
+    """
+
+    def __init__(self, name, **options):
+        self._name = name
+        self._options = options
+
+    def resolve(self):
+        return get_client().get_database(self._name, **self._options)
+
+    def __getitem__(self, name):
+        return LazyCollection(self, name)
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+
+class LazyCollection:
+    """
+    Stands in for a pymongo Collection until first use; the resolved collection
+    is cached per process.
+    """
+
+    def __init__(self, database, name):
+        self._database = database
+        self._name = name
+        self._collection = None
+        self._pid = None
+
+    def resolve(self):
+        if self._collection is None or self._pid != os.getpid():
+            self._collection = self._database.resolve()[self._name]
+            self._pid = os.getpid()
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+
+# Writes and reads that must see them go through `db` (primary);
+# search and analytics reads go through `read_db`, routed to secondaries when available.
+db = LazyDatabase(os.getenv('DB_NAME'))
+read_db = LazyDatabase(
+    os.getenv('DB_NAME'),
+    read_preference=read_preference(os.getenv('MONGO_READ_PREFERENCE', 'secondaryPreferred'))
+)
 
 def init_db():
-    # Initialize collections if needed
-    pass
+    """
+    Ensures the index set the models rely on and applies pending migrations.
+    Returns the migration summary, or None if the database is unreachable.
+    """
+    from utils.migrations import migrate
+    try:
+        return migrate(db)
+    except PyMongoError as e:
+        logger.error("Database initialization failed: %s", e)
+        return None
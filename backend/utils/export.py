@@ -0,0 +1,46 @@
+# backend/utils/export.py
+
+import zlib
+from utils.json_provider import dumps_bytes
+
+# Documents fetched per getMore while exporting
+EXPORT_BATCH_SIZE = 1000
+# Bytes of NDJSON collected before a chunk is handed to the server
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def ndjson_chunks(documents, serialize, chunk_bytes=EXPORT_CHUNK_BYTES):
+    """
+    Encodes documents as newline-delimited JSON, one line per document, and
+    yields them in chunks of roughly `chunk_bytes` so memory stays bounded by
+    the chunk size and the cursor batch rather than by the result set.
+    """
+    buffer = bytearray()
+    try:
+        for document in documents:
+            buffer += dumps_bytes(serialize(document))
+            buffer += b"\n"
+            if len(buffer) >= chunk_bytes:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        # Release the server-side cursor even if the client disconnects mid-stream
+        close = getattr(documents, 'close', None)
+        if close is not None:
+            close()
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compresses a stream of byte chunks into a single gzip stream on the fly.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
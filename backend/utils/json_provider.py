@@ -0,0 +1,74 @@
+# backend/utils/json_provider.py
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+
+def encode_default(obj):
+    """
+    Encodes the BSON and stdlib types documents come back from MongoDB with:
+    ObjectId as its hex string, datetimes as ISO 8601 and decimals as exact strings.
+    Raises TypeError for anything else, as json.dumps expects.
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, indent=False):
+    """
+    Serializes `obj` to UTF-8 JSON bytes, with orjson when it is installed.
+    Falls back to the stdlib encoder for values orjson rejects (e.g. integers
+    beyond 64 bits), so both paths accept the same input.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=encode_default, option=option)
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(obj, default=encode_default, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, default=encode_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider that encodes ObjectId, datetime and Decimal values
+    natively, so model serializers can hand raw MongoDB documents to jsonify.
+    Responses are written as bytes straight from orjson when it is available.
+    Key order is preserved rather than sorted.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            dumps_bytes(obj, indent=self._app.debug) + b"\n", mimetype=self.mimetype
+        )
@@ -1,6 +1,7 @@
 # utils/view/listings.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from models.used_car_listing import UsedCarListing
+from utils.conditional import not_modified, add_validators
 
 listings_bp = Blueprint('listings', __name__, url_prefix='/api/view')
 
@@ -12,8 +13,19 @@ class ListingsController:
         listings_bp.add_url_rule('/listings', view_func=self.view_listings, methods=['GET'])
 
     def view_listings(self):
-        listings = UsedCarListing.get_all_listings()
-        return jsonify(listings), 200
+        limit = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
+        # The version read behind the ETag also drops cached pages another worker's write made stale
+        etag = UsedCarListing.get_listings_validator(limit, cursor, fields)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        response, status_code = UsedCarListing.get_all_listings(limit=limit, cursor=cursor, fields=fields)
+        result = jsonify(response)
+        if status_code == 200:
+            add_validators(result, etag)
+        return result, status_code
 
 # Instantiate the controller
 listings_controller = ListingsController()
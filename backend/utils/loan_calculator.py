@@ -1,5 +1,24 @@
 # backend/utils/loan_calculator.py
 
+# Longest loan term accepted, in months (50 years). Keeps amortization
+# schedules bounded and (1 + r) ** term finite.
+MAX_TERM_MONTHS = 600
+
+_numpy = None
+
+
+def _np():
+    """
+    Returns the numpy module, importing it on first use so that only the batch
+    endpoint, not application startup, pays for loading it.
+    """
+    global _numpy
+    if _numpy is None:
+        import numpy
+        _numpy = numpy
+    return _numpy
+
+
 class LoanCalculator:
     """
     A class to calculate loan details such as monthly payments, total payments, and total interest.
@@ -32,6 +51,10 @@ class LoanCalculator:
             raise ValueError("Interest rate cannot be negative.")
         if self.loan_term_months <= 0:
             raise ValueError("Loan term must be greater than 0.")
+        if self.loan_term_months > MAX_TERM_MONTHS:
+            raise ValueError(f"Loan term cannot exceed {MAX_TERM_MONTHS} months.")
+        if self.loan_term_months % 1 != 0:
+            raise ValueError("Loan term must be a whole number of months.")
         if self.down_payment < 0:
             raise ValueError("Down payment cannot be negative.")
         if self.down_payment > self.principal:
@@ -64,3 +87,142 @@ class LoanCalculator:
             "total_payment": round(total_payment, 2),
             "total_interest": round(total_interest, 2)
         }
+
+
+class BatchLoanCalculator:
+    """
+    Calculates loan details for every combination of interest rate, loan term and
+    down payment in one vectorized pass, e.g. to render a rate x term comparison table.
+    """
+
+    # Upper bounds that keep a single request's memory and response size in check
+    MAX_SCENARIOS = 10000
+    MAX_SCHEDULE_SCENARIOS = 50
+
+    def __init__(self, principal, annual_interest_rates, loan_terms_months, down_payments=(0,)):
+        """
+        Initializes the BatchLoanCalculator with the loan parameter axes.
+
+        :param principal: (float) The total loan amount.
+        :param annual_interest_rates: (list of float) Annual interest rates (in percentage).
+        :param loan_terms_months: (list of int) Loan terms in months.
+        :param down_payments: (list of float) Down payment amounts. Defaults to [0].
+        """
+        np = _np()
+        self.principal = float(principal)
+        self.annual_interest_rates = np.asarray(annual_interest_rates, dtype=float)
+        # Parsed as float so fractional terms are rejected rather than truncated
+        self.loan_terms_months = np.asarray(loan_terms_months, dtype=float)
+        self.down_payments = np.asarray(down_payments, dtype=float)
+
+        # Perform validation upon initialization
+        self.validate_inputs()
+        self.loan_terms_months = self.loan_terms_months.astype(int)
+
+    def validate_inputs(self):
+        """
+        Validates every axis with the same rules as LoanCalculator.validate_inputs.
+        """
+        np = _np()
+        if self.principal <= 0:
+            raise ValueError("Principal must be greater than 0.")
+        for name, axis in (("interest rates", self.annual_interest_rates),
+                           ("loan terms", self.loan_terms_months),
+                           ("down payments", self.down_payments)):
+            if axis.ndim != 1 or axis.size == 0:
+                raise ValueError(f"At least one value is required for {name}.")
+        if (self.annual_interest_rates < 0).any():
+            raise ValueError("Interest rate cannot be negative.")
+        if (self.loan_terms_months <= 0).any():
+            raise ValueError("Loan term must be greater than 0.")
+        if (self.loan_terms_months > MAX_TERM_MONTHS).any():
+            raise ValueError(f"Loan term cannot exceed {MAX_TERM_MONTHS} months.")
+        if (self.loan_terms_months != np.floor(self.loan_terms_months)).any():
+            raise ValueError("Loan term must be a whole number of months.")
+        if (self.down_payments < 0).any():
+            raise ValueError("Down payment cannot be negative.")
+        if (self.down_payments > self.principal).any():
+            raise ValueError("Down payment cannot exceed principal.")
+        scenarios = self.annual_interest_rates.size * self.loan_terms_months.size * self.down_payments.size
+        if scenarios > self.MAX_SCENARIOS:
+            raise ValueError(f"Too many scenarios requested (maximum {self.MAX_SCENARIOS}).")
+
+    def _grid(self):
+        """
+        Broadcasts the axes to a (rates, terms, down payments) grid.
+        Returns a tuple of (monthly_rate, terms, adjusted_principal, monthly_payment).
+        """
+        np = _np()
+        monthly_rate = (self.annual_interest_rates / 100 / 12)[:, None, None]
+        terms = self.loan_terms_months[None, :, None]
+        adjusted_principal = (self.principal - self.down_payments)[None, None, :]
+
+        growth = (1 + monthly_rate) ** terms
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amortized = adjusted_principal * (monthly_rate * growth) / (growth - 1)
+        # Zero-rate rows fall back to straight-line repayment
+        monthly_payment = np.where(monthly_rate == 0, adjusted_principal / terms, amortized)
+        return monthly_rate, terms, adjusted_principal, monthly_payment
+
+    def calculate(self):
+        """
+        Calculates the payment grid. Every result is a nested list indexed as
+        [rate][term][down_payment], rounded like LoanCalculator.calculate.
+
+        :return: (dict) The input axes plus 'monthly_payment', 'total_payment' and 'total_interest'.
+        """
+        np = _np()
+        _, terms, adjusted_principal, monthly_payment = self._grid()
+        total_payment = monthly_payment * terms
+        total_interest = total_payment - adjusted_principal
+
+        return {
+            "annual_interest_rates": self.annual_interest_rates.tolist(),
+            "loan_terms_months": self.loan_terms_months.tolist(),
+            "down_payments": self.down_payments.tolist(),
+            "monthly_payment": np.round(monthly_payment, 2).tolist(),
+            "total_payment": np.round(total_payment, 2).tolist(),
+            "total_interest": np.round(total_interest, 2).tolist()
+        }
+
+    def amortization_schedules(self):
+        """
+        Builds the month-by-month schedule of every scenario. Balances use the
+        closed form B_k = P(1+r)^k - M((1+r)^k - 1)/r, so each scenario is one
+        vectorized expression over its months instead of a Python loop.
+
+        :return: (list) One dict per scenario with its parameters and column arrays
+                 'month', 'interest', 'principal' and 'balance'.
+        """
+        np = _np()
+        scenarios = self.annual_interest_rates.size * self.loan_terms_months.size * self.down_payments.size
+        if scenarios > self.MAX_SCHEDULE_SCENARIOS:
+            raise ValueError(f"Too many schedules requested (maximum {self.MAX_SCHEDULE_SCENARIOS}).")
+
+        monthly_rate, _, _, monthly_payment = self._grid()
+        schedules = []
+        for i, annual_rate in enumerate(self.annual_interest_rates):
+            rate = monthly_rate[i, 0, 0]
+            for j, term in enumerate(self.loan_terms_months):
+                months = np.arange(0, term + 1)
+                for k, down_payment in enumerate(self.down_payments):
+                    principal = self.principal - down_payment
+                    payment = monthly_payment[i, j, k]
+                    if rate == 0:
+                        balance = principal - payment * months
+                    else:
+                        growth = (1 + rate) ** months
+                        balance = principal * growth - payment * (growth - 1) / rate
+                    balance = np.maximum(balance, 0)
+                    interest = balance[:-1] * rate
+                    schedules.append({
+                        "annual_interest_rate": float(annual_rate),
+                        "loan_term_months": int(term),
+                        "down_payment": float(down_payment),
+                        "monthly_payment": round(float(payment), 2),
+                        "month": months[1:].tolist(),
+                        "interest": np.round(interest, 2).tolist(),
+                        "principal": np.round(payment - interest, 2).tolist(),
+                        "balance": np.round(balance[1:], 2).tolist()
+                    })
+        return schedules
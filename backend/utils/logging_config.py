@@ -0,0 +1,129 @@
+# backend/utils/logging_config.py
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_configured_pid = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line: timestamp, level, logger,
+    message, any `extra=` fields and the formatted exception if there is one.
+    """
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queues records with their message arguments merged but formatting (and any
+    traceback rendering) left to the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def sampled(rate=None):
+    """
+    Decides whether a per-row or per-item log call should be emitted, so hot
+    loops log a LOG_SAMPLE_RATE fraction of their rows. Guard the call with
+    logger.isEnabledFor() first so disabled levels cost nothing:
+
+        if logger.isEnabledFor(logging.DEBUG) and sampled():
+            logger.debug("Serialized listing %s", listing['_id'])
+    """
+    if rate is None:
+        rate = float(os.getenv('LOG_SAMPLE_RATE', '0.01'))
+    return rate >= 1 or random.random() < rate
+
+
+def build_handler(fmt='json', use_queue=True, stream=None):
+    """
+    Builds the handler records are emitted through: a stream handler with the
+    JSON or text formatter, behind a QueueHandler when `use_queue` is set.
+    Returns (handler, listener); listener is None without a queue and must
+    otherwise be started by the caller.
+    """
+    stream_handler = logging.StreamHandler(stream or sys.stderr)
+    stream_handler.setFormatter(JSONFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+    if not use_queue:
+        return stream_handler, None
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    return _DeferredQueueHandler(log_queue), listener
+
+
+def configure_logging(level=None, fmt=None, use_queue=None):
+    """
+    Installs the application's single root handler. Modules only call
+    logging.getLogger(__name__) and log with %-style arguments, which are
+    formatted only if a record is actually emitted.
+
+    LOG_LEVEL sets the level (INFO by default). LOG_FORMAT selects 'json'
+    (default) or 'text' output on stderr. With LOG_ASYNC=true (default) records
+    are handed to a QueueHandler and written by a background listener thread,
+    so request threads never block on the stream. Calling it again in the same
+    process is a no-op; a forked child sets up its own listener.
+    """
+    global _listener, _configured_pid
+    if _configured_pid == os.getpid():
+        return
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'json')).lower()
+    if use_queue is None:
+        use_queue = os.getenv('LOG_ASYNC', 'true').lower() == 'true'
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.setLevel(level)
+
+    handler, _listener = build_handler(fmt, use_queue)
+    root.addHandler(handler)
+    if _listener is not None:
+        _listener.start()
+        atexit.register(stop_logging)
+    _configured_pid = os.getpid()
+
+
+def stop_logging():
+    """
+    Flushes queued records and stops the background listener, if one is running.
+    """
+    global _listener
+    if _listener is not None and _configured_pid == os.getpid():
+        _listener.stop()
+    _listener = None
@@ -0,0 +1,231 @@
+# backend/utils/metrics.py
+
+import contextvars
+import os
+import threading
+import time
+from pymongo import monitoring
+
+# Default histogram buckets, in seconds for latencies and bytes for sizes
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request metrics and the Mongo command listener are on unless METRICS_ENABLED=false
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with a fixed set of label names.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}"
+
+
+class Histogram:
+    """
+    Histogram with fixed upper bounds and a fixed set of label names, exposed
+    with cumulative _bucket, _sum and _count series.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        for label_values, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, label_values, [('le', _format_number(float(bound)))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, label_values, [('le', '+Inf')])
+            yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_number(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """
+    Holds the metrics of this process and renders them in the Prometheus text
+    exposition format.
+    """
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_latency = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, by route.',
+    labels=('method', 'route', 'status'))
+response_size = registry.histogram(
+    'http_response_size_bytes', 'Size of response bodies with a known length, by route.',
+    labels=('method', 'route'), buckets=SIZE_BUCKETS)
+request_mongo_commands = registry.histogram(
+    'http_request_mongo_commands', 'MongoDB commands issued while handling a request, by route.',
+    labels=('method', 'route'), buckets=COUNT_BUCKETS)
+request_mongo_seconds = registry.histogram(
+    'http_request_mongo_duration_seconds', 'Time spent in MongoDB commands per request, by route.',
+    labels=('method', 'route'))
+mongo_commands = registry.counter(
+    'mongo_commands_total', 'MongoDB commands completed, by route and command.',
+    labels=('route', 'command', 'outcome'))
+mongo_command_latency = registry.histogram(
+    'mongo_command_duration_seconds', 'MongoDB command round-trip time, by command.',
+    labels=('command',))
+
+
+class RequestStats:
+    """
+    Mongo activity of the request being handled in the current context.
+    """
+    __slots__ = ('route', 'commands', 'mongo_seconds', 'started_at')
+
+    def __init__(self, route):
+        self.route = route
+        self.commands = 0
+        self.mongo_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+
+_current_request = contextvars.ContextVar('metrics_request', default=None)
+
+
+def start_request(route):
+    """
+    Begins collecting Mongo activity for a request in the current context.
+    Returns the RequestStats to pass to finish_request().
+    """
+    stats = RequestStats(route)
+    _current_request.set(stats)
+    return stats
+
+
+def finish_request(stats, method, status, size=None):
+    """
+    Records latency, response size and Mongo activity of a finished request.
+    """
+    _current_request.set(None)
+    request_latency.observe(time.perf_counter() - stats.started_at, method, stats.route, str(status))
+    if size is not None:
+        response_size.observe(size, method, stats.route)
+    request_mongo_commands.observe(stats.commands, method, stats.route)
+    request_mongo_seconds.observe(stats.mongo_seconds, method, stats.route)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Counts and times MongoDB commands, attributing them to the request being
+    handled in the calling context ('none' for commands issued outside one,
+    e.g. by background counter flushes).
+    """
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        stats = _current_request.get()
+        if stats is not None:
+            stats.commands += 1
+            stats.mongo_seconds += seconds
+        mongo_commands.inc(stats.route if stats is not None else 'none', event.command_name, outcome)
+        mongo_command_latency.observe(seconds, event.command_name)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, 'success')
+
+    def failed(self, event):
+        self._record(event, 'failure')
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+def event_listeners():
+    """
+    Returns the command listeners to attach to new MongoClients.
+    """
+    return [mongo_command_metrics] if METRICS_ENABLED else []
+
+
+def render():
+    """
+    Returns every metric of this process in the Prometheus text format.
+    """
+    return registry.render()
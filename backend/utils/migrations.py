@@ -0,0 +1,345 @@
+# backend/utils/migrations.py
+
+import logging
+import os
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+
+# _id of the schema_migrations document holding the applied version and the
+# migration currently claimed by a process; the other documents are per-version records
+MIGRATION_STATE_ID = 'state'
+
+# A claim older than this is assumed to belong to a process that died mid-migration
+MIGRATION_CLAIM_TIMEOUT_SECONDS = int(os.getenv('MIGRATION_CLAIM_TIMEOUT_SECONDS', '3600'))
+
+# Index set relied upon by the model layer, keyed by collection name.
+# Every entry is applied with create_indexes() on startup, which is a no-op
+# for indexes that already exist with the same specification.
+INDEXES = {
+    'users': [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+        IndexModel([('role', ASCENDING)], name='role'),
+    ],
+    'profiles': [
+        IndexModel([('role', ASCENDING)], name='role_unique', unique=True),
+    ],
+    'used_car_listings': [
+        IndexModel([('seller_id', ASCENDING)], name='seller_id'),
+        IndexModel([('agent_id', ASCENDING)], name='agent_id'),
+        IndexModel([('buyer_id', ASCENDING)], name='buyer_id', sparse=True),
+        IndexModel([('search_tokens', ASCENDING)], name='search_tokens'),
+        IndexModel([('year', ASCENDING), ('price', ASCENDING)], name='year_price'),
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)], name='updated_at_id'),
+    ],
+    'reviews': [
+        IndexModel([('agent_id', ASCENDING)], name='agent_id'),
+        # Keyset pages of an agent's reviews, newest or highest rated first
+        IndexModel([('agent_id', ASCENDING), ('_id', DESCENDING)], name='agent_id_id'),
+        IndexModel([('agent_id', ASCENDING), ('rating', DESCENDING), ('_id', DESCENDING)],
+                   name='agent_id_rating_id'),
+        IndexModel([('listing_id', ASCENDING)], name='listing_id'),
+        IndexModel([('reviewer_id', ASCENDING)], name='reviewer_id'),
+        # Sample data reviews carry no listing/reviewer, so uniqueness is only
+        # enforced on reviews submitted through rate_and_review_agent.
+        IndexModel(
+            [('agent_id', ASCENDING), ('listing_id', ASCENDING), ('reviewer_id', ASCENDING)],
+            name='agent_listing_reviewer_unique',
+            unique=True,
+            partialFilterExpression={
+                'listing_id': {'$exists': True},
+                'reviewer_id': {'$exists': True}
+            }
+        ),
+    ],
+    'listing_metrics': [
+        IndexModel(
+            [('listing_id', ASCENDING), ('granularity', ASCENDING), ('bucket', ASCENDING)],
+            name='listing_granularity_bucket_unique',
+            unique=True
+        ),
+        IndexModel(
+            [('seller_id', ASCENDING), ('granularity', ASCENDING), ('bucket', ASCENDING)],
+            name='seller_granularity_bucket'
+        ),
+        # Hourly buckets carry expire_at; daily buckets have none and are kept
+        IndexModel([('expire_at', ASCENDING)], name='expire_at_ttl', expireAfterSeconds=0),
+    ],
+    'shortlist_entries': [
+        IndexModel([('user_id', ASCENDING), ('listing_id', ASCENDING)], name='user_listing_unique', unique=True),
+        # A user's shortlist page, newest first
+        IndexModel([('user_id', ASCENDING), ('_id', DESCENDING)], name='user_id_id'),
+        # Write-through of listing edits and deletions
+        IndexModel([('listing_id', ASCENDING)], name='listing_id'),
+    ],
+}
+
+# Query shapes issued by the models: (collection, filter fields, match type, source).
+# 'eq' shapes can be served by an index whose leading key is one of the fields,
+# 'regex' shapes are unanchored case-insensitive regexes and always scan.
+QUERY_SHAPES = [
+    ('users', ('username',), 'eq', 'User.authenticate_user / get_user_by_username / update_user'),
+    ('users', ('role',), 'eq', 'User.suspend_users_by_role / reenable_users_by_role'),
+    ('users', ('username', 'email'), 'regex', 'User.filter_users / search_users'),
+    ('profiles', ('role',), 'eq', 'Profile.get_profile_by_role / update_profile'),
+    ('profiles', ('role', 'rights'), 'regex', 'Profile.search_profiles'),
+    ('used_car_listings', ('seller_id',), 'eq', 'UsedCarListing.get_metrics_by_seller / get_listings_with_reviews'),
+    ('used_car_listings', ('buyer_id',), 'eq', 'UsedCarListing.get_listings_with_reviews'),
+    ('used_car_listings', ('search_tokens',), 'eq', 'UsedCarListing.search_listings (anchored prefix)'),
+    ('used_car_listings', ('year', 'price'), 'eq', 'UsedCarListing.search_listings (range filters)'),
+    ('used_car_listings', ('updated_at',), 'eq', 'UsedCarListing.export_listings (updated_since)'),
+    ('reviews', ('agent_id',), 'eq', 'Review.get_reviews_for_agent / get_review_page / reconcile_rating_summaries'),
+    ('reviews', ('listing_id',), 'eq', 'UsedCarListing.get_listings_with_reviews'),
+    ('reviews', ('reviewer_id',), 'eq', 'UsedCarListing.get_listings_with_reviews'),
+    ('reviews', ('agent_id', 'listing_id', 'reviewer_id'), 'eq', 'Review.rate_and_review_agent'),
+    ('listing_metrics', ('listing_id', 'granularity', 'bucket'), 'eq', 'UsedCarListing.get_metrics_series / record_metric_buckets'),
+    ('listing_metrics', ('seller_id', 'granularity', 'bucket'), 'eq', 'UsedCarListing.get_metrics_series'),
+    ('shortlist_entries', ('user_id', 'listing_id'), 'eq', 'BuyerListing.save_listing / remove_from_shortlist'),
+    ('shortlist_entries', ('user_id',), 'eq', 'BuyerListing.get_shortlist / search_shortlist'),
+    ('shortlist_entries', ('listing_id',), 'eq', 'BuyerListing.listing_updated / listing_deleted'),
+]
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _backfill_search_tokens(db):
+    """
+    Computes 'search_tokens' for listings created before the token field existed.
+    """
+    from utils.search import SEARCHABLE_FIELDS, listing_search_tokens
+    collection = db['used_car_listings']
+    projection = {field: 1 for field in SEARCHABLE_FIELDS}
+    operations = []
+    for listing in collection.find({"search_tokens": {"$exists": False}}, projection):
+        operations.append(UpdateOne(
+            {"_id": listing['_id']},
+            {"$set": {"search_tokens": listing_search_tokens(listing)}}
+        ))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+
+def _backfill_updated_at(db):
+    """
+    Gives listings created before 'updated_at' existed their creation time, so
+    incremental exports see them. Runs as a single server-side update.
+    """
+    db['used_car_listings'].update_many(
+        {"updated_at": {"$exists": False}},
+        [{"$set": {"updated_at": {"$ifNull": ["$created_at", "$$NOW"]}}}]
+    )
+
+
+def _build_rating_summaries(db):
+    """
+    Computes the per-agent rating summaries from the existing reviews.
+    """
+    from utils.ratings import reconcile_rating_summaries
+    reconcile_rating_summaries(db)
+
+
+def _backfill_shortlist_entries(db):
+    """
+    Copies the legacy one-document-per-buyer shortlist arrays into
+    shortlist_entries with their listing summaries, in saved order so the
+    newest-first pages match. Listings that no longer exist are skipped, as
+    the old reads did. Re-running only fills in missing entries; the legacy
+    buyer_shortlists documents are left in place.
+    """
+    from models.buyer_listing import SUMMARY_PROJECTION, listing_summary
+    entries = db['shortlist_entries']
+    operations = []
+
+    def flush():
+        if operations:
+            entries.bulk_write(operations, ordered=False)
+            operations.clear()
+
+    for shortlist in db['buyer_shortlists'].find({}, {"user_id": 1, "shortlist": 1}):
+        listing_ids = []
+        for listing_id in shortlist.get('shortlist', []):
+            try:
+                listing_ids.append(ObjectId(listing_id))
+            except (InvalidId, TypeError):
+                logger.warning("Skipping invalid shortlisted listing_id: %s", listing_id)
+        listings = {
+            listing['_id']: listing
+            for listing in db['used_car_listings'].find({"_id": {"$in": listing_ids}}, SUMMARY_PROJECTION)
+        }
+        user_ids = set()
+        for listing in listings.values():
+            for user_id in (listing.get('agent_id'), listing.get('seller_id')):
+                try:
+                    user_ids.add(ObjectId(str(user_id)))
+                except (InvalidId, TypeError):
+                    continue
+        usernames = {
+            str(user['_id']): user.get('username')
+            for user in db['users'].find({"_id": {"$in": list(user_ids)}}, {"username": 1})
+        }
+        for listing_id in dict.fromkeys(listing_ids):
+            if listing_id not in listings:
+                continue
+            operations.append(UpdateOne(
+                {"user_id": shortlist['user_id'], "listing_id": listing_id},
+                {"$setOnInsert": {**listing_summary(listings[listing_id], usernames),
+                                  "saved_at": datetime.utcnow()}},
+                upsert=True
+            ))
+            if len(operations) >= BACKFILL_BATCH_SIZE:
+                flush()
+    flush()
+
+
+# Versioned data migrations, applied once each in ascending order.
+# Each entry is (version, description, callable taking the database handle).
+MIGRATIONS = [
+    (1, "Backfill listing search tokens", _backfill_search_tokens),
+    (2, "Backfill listing updated_at", _backfill_updated_at),
+    (3, "Build agent rating summaries", _build_rating_summaries),
+    (4, "Backfill shortlist entries", _backfill_shortlist_entries),
+]
+
+
+def ensure_indexes(db):
+    """
+    Creates every declared index. Failures on one collection (for example a
+    unique index over existing duplicates) are logged and do not stop the rest.
+    """
+    for collection_name, indexes in INDEXES.items():
+        try:
+            created = db[collection_name].create_indexes(indexes)
+            logger.info("Ensured indexes on '%s': %s", collection_name, created)
+        except OperationFailure as e:
+            logger.error("Failed to create indexes on '%s': %s", collection_name, e)
+
+
+def applied_version(db):
+    """
+    Returns the migration version the database is at, or 0.
+    """
+    state = db[MIGRATIONS_COLLECTION].find_one({'_id': MIGRATION_STATE_ID})
+    if state:
+        return state['version']
+    # Databases migrated before the state document existed only have per-version records
+    latest = db[MIGRATIONS_COLLECTION].find_one({'_id': {'$type': 'number'}}, sort=[('_id', DESCENDING)])
+    return latest['_id'] if latest else 0
+
+
+def _claim_migration(db, current, version):
+    """
+    Atomically marks `version` as running, provided the database is still at
+    `current` and no other process holds a live claim. The first claim creates
+    the state document.
+    Returns True if this process now owns the migration.
+    """
+    now = datetime.utcnow()
+    try:
+        db[MIGRATIONS_COLLECTION].update_one(
+            {
+                '_id': MIGRATION_STATE_ID,
+                'version': current,
+                '$or': [
+                    {'running': None},
+                    {'claimed_at': {'$lt': now - timedelta(seconds=MIGRATION_CLAIM_TIMEOUT_SECONDS)}}
+                ]
+            },
+            {'$set': {'running': version, 'claimed_at': now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The state document exists but did not match: another process moved
+        # the version on or is applying this migration right now
+        return False
+    return True
+
+
+def run_migrations(db):
+    """
+    Applies every migration newer than the recorded version, recording each
+    one as it completes so an interrupted run resumes where it stopped.
+    Each version is claimed with a compare-and-set on the state document
+    before it runs, so processes starting together never apply one twice;
+    a process that loses the claim stops and leaves the rest to the winner.
+    Returns the version the database is at afterwards.
+    """
+    migrations = db[MIGRATIONS_COLLECTION]
+    current = applied_version(db)
+    for version, description, apply in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        if not _claim_migration(db, current, version):
+            logger.info("Migration %s is being applied by another process.", version)
+            break
+        logger.info("Applying migration %s: %s", version, description)
+        try:
+            apply(db)
+        except Exception:
+            migrations.update_one({'_id': MIGRATION_STATE_ID, 'running': version}, {'$set': {'running': None}})
+            raise
+        migrations.update_one(
+            {'_id': version},
+            {'$set': {'description': description, 'applied_at': datetime.utcnow()}},
+            upsert=True
+        )
+        migrations.update_one(
+            {'_id': MIGRATION_STATE_ID, 'running': version},
+            {'$set': {'version': version, 'running': None}}
+        )
+        current = version
+    return current
+
+
+def _index_leading_keys(db, collection_name):
+    """
+    Returns the set of leading index keys that exist on a collection.
+    """
+    info = db[collection_name].index_information()
+    return {list(spec['key'])[0][0] for spec in info.values()}
+
+
+def unindexed_query_shapes(db):
+    """
+    Compares QUERY_SHAPES against the indexes present on the server.
+    Returns a list of dicts describing the shapes that will collection scan.
+    """
+    unindexed = []
+    leading_keys = {}
+    for collection_name, shape_fields, match_type, source in QUERY_SHAPES:
+        if collection_name not in leading_keys:
+            leading_keys[collection_name] = _index_leading_keys(db, collection_name)
+        if match_type == 'eq' and leading_keys[collection_name].intersection(shape_fields):
+            continue
+        unindexed.append({
+            "collection": collection_name,
+            "fields": list(shape_fields),
+            "match": match_type,
+            "source": source
+        })
+    return unindexed
+
+
+def migrate(db):
+    """
+    Brings the database up to date: ensures the declared indexes, applies
+    pending migrations and logs every query shape that remains unindexed.
+    Returns a summary dict.
+    """
+    ensure_indexes(db)
+    version = run_migrations(db)
+    unindexed = unindexed_query_shapes(db)
+    for shape in unindexed:
+        logger.warning(
+            "Unindexed query shape on '%s' (%s on %s) used by %s",
+            shape['collection'], shape['match'], ', '.join(shape['fields']), shape['source']
+        )
+    return {"version": version, "unindexed": unindexed}
@@ -0,0 +1,194 @@
+# backend/utils/pagination.py
+
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def parse_limit(limit, default=None):
+    """
+    Parses a page size from a query-string value.
+    Returns `default` when no limit was given (None leaves pagination off).
+    Raises ValueError on non-numeric or out-of-range values.
+    """
+    if limit is None or limit == '':
+        return default
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError) as e:
+        raise ValueError("limit must be an integer.") from e
+    if limit <= 0 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return limit
+
+
+def parse_page_limit(limit, cursor):
+    """
+    Parses the page size of a keyset-paginated listing: a cursor without a
+    limit pages by DEFAULT_PAGE_SIZE, and neither returns the whole listing (None).
+    Raises ValueError like parse_limit.
+    """
+    return parse_limit(limit, DEFAULT_PAGE_SIZE if cursor else None)
+
+
+def page_response(name, documents, limit, next_cursor=None):
+    """
+    Shapes a listing response as {name: documents}, plus the next_cursor when
+    the listing was paginated (`limit` is not None).
+    """
+    response = {name: documents}
+    if limit is not None:
+        response['next_cursor'] = next_cursor
+    return response
+
+
+def parse_fields(fields, allowed):
+    """
+    Parses a comma-separated 'fields' value into a list of field names.
+    Returns None when no projection was requested.
+    Raises ValueError if any field is not in `allowed`.
+    """
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+    return requested
+
+
+def build_projection(fields):
+    """
+    Returns a MongoDB projection for the requested fields, or None for all fields.
+    """
+    if not fields:
+        return None
+    projection = {field: 1 for field in fields}
+    projection['_id'] = 1
+    return projection
+
+
+def encode_cursor(position):
+    """
+    Encodes a keyset position (a dict of JSON-serializable values) as an opaque token.
+    """
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decodes a token produced by encode_cursor.
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor.")
+    return position
+
+
+def id_cursor_filter(token):
+    """
+    Returns the filter selecting documents after an `_id` keyset cursor.
+    Pages are ordered newest first, so 'after' means a smaller ObjectId.
+    """
+    position = decode_cursor(token)
+    try:
+        last_id = ObjectId(position.get('id'))
+    except (InvalidId, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    return {"_id": {"$lt": last_id}}
+
+
+def key_cursor_filter(token, sort_field):
+    """
+    Returns the filter selecting documents after a (`sort_field`, `_id`) keyset
+    cursor, for pages ordered by both descending. `sort_field` must be numeric.
+    """
+    position = decode_cursor(token)
+    try:
+        last_id = ObjectId(position.get('id'))
+    except (InvalidId, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    value = position.get(sort_field)
+    # Only numeric sort keys are paged by value; anything else could be an operator document
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError("Invalid cursor.")
+    return {"$or": [
+        {sort_field: {"$lt": value}},
+        {sort_field: value, "_id": {"$lt": last_id}},
+    ]}
+
+
+def paginate_by_id(collection, mongo_query, limit, cursor=None, projection=None):
+    """
+    Runs a keyset-paginated find ordered by `_id` descending. ObjectIds embed
+    their creation time, so pages come back newest first and every page is a
+    bounded range scan on the `_id` index.
+    Returns a tuple of (documents, next_cursor); next_cursor is None on the last page.
+    """
+    documents = list(
+        collection.find(_page_query(mongo_query, cursor), projection).sort("_id", -1).limit(limit + 1)
+    )
+    return _split_page(documents, limit)
+
+
+async def paginate_by_id_async(collection, mongo_query, limit, cursor=None, projection=None):
+    """
+    paginate_by_id for an AsyncCollection.
+    """
+    documents = await (
+        collection.find(_page_query(mongo_query, cursor), projection).sort("_id", -1).limit(limit + 1)
+    ).to_list()
+    return _split_page(documents, limit)
+
+
+def paginate_by_key(collection, mongo_query, sort_field, limit, cursor=None, projection=None):
+    """
+    Runs a keyset-paginated find ordered by `sort_field` descending, ties broken
+    by `_id` descending. Needs an index on the query fields followed by
+    (`sort_field`, `_id`) for each page to be a bounded range scan.
+    Returns a tuple of (documents, next_cursor); next_cursor is None on the last page.
+    """
+    documents = list(
+        collection.find(_page_query(mongo_query, cursor, sort_field), projection)
+        .sort([(sort_field, -1), ("_id", -1)]).limit(limit + 1)
+    )
+    return _split_page(documents, limit, sort_field)
+
+
+async def paginate_by_key_async(collection, mongo_query, sort_field, limit, cursor=None, projection=None):
+    """
+    paginate_by_key for an AsyncCollection.
+    """
+    documents = await (
+        collection.find(_page_query(mongo_query, cursor, sort_field), projection)
+        .sort([(sort_field, -1), ("_id", -1)]).limit(limit + 1)
+    ).to_list()
+    return _split_page(documents, limit, sort_field)
+
+
+def _page_query(mongo_query, cursor, sort_field=None):
+    if not cursor:
+        return mongo_query
+    after = key_cursor_filter(cursor, sort_field) if sort_field else id_cursor_filter(cursor)
+    return {"$and": [mongo_query, after]} if mongo_query else after
+
+
+def _split_page(documents, limit, sort_field=None):
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        position = {"id": str(documents[-1]['_id'])}
+        if sort_field:
+            position[sort_field] = documents[-1].get(sort_field)
+        next_cursor = encode_cursor(position)
+    return documents, next_cursor
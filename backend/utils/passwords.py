@@ -0,0 +1,141 @@
+# backend/utils/passwords.py
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt work factor for new hashes; raising it upgrades existing hashes on next login
+SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', '1'))
+SALT_BYTES = 16
+KEY_BYTES = 64
+HASH_PREFIX = 'scrypt'
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when every hashing slot is taken and none frees up in time.
+    """
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+        dklen=KEY_BYTES, maxmem=256 * n * r + 1024 * 1024
+    )
+
+
+def hash_password(password):
+    """
+    Hashes a password with scrypt and a random salt.
+    Returns a string of the form 'scrypt$n$r$p$salt$hash' (salt and hash base64-encoded).
+    """
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return '$'.join([
+        HASH_PREFIX, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode('ascii'), base64.b64encode(key).decode('ascii')
+    ])
+
+
+def is_hashed(stored):
+    """
+    Returns True if a stored password is an scrypt hash rather than legacy plaintext.
+    """
+    return isinstance(stored, str) and stored.startswith(HASH_PREFIX + '$') and stored.count('$') == 5
+
+
+def verify_password(password, stored):
+    """
+    Checks a password against a stored scrypt hash, or against a legacy
+    plaintext value for records created before hashing was introduced.
+    Comparisons are constant-time. Returns True on a match.
+    """
+    if not password or not stored:
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode('utf-8'), str(stored).encode('utf-8'))
+
+    _, n, r, p, salt, key = stored.split('$')
+    try:
+        candidate = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(candidate, base64.b64decode(key))
+
+
+def needs_rehash(stored):
+    """
+    Returns True if a stored password is plaintext or was hashed with other parameters.
+    """
+    if not is_hashed(stored):
+        return True
+    _, n, r, p, _, _ = stored.split('$')
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+class PasswordHasher:
+    """
+    Runs hashing and verification on a bounded thread pool. At most `max_workers`
+    hashes run at once and at most `max_pending` more may wait; callers beyond that
+    wait up to `wait_timeout` seconds for a slot and then get PasswordHasherBusy,
+    so a login storm is shed instead of tying up every request thread on scrypt.
+    """
+
+    def __init__(self, max_workers, max_pending, wait_timeout):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.wait_timeout = wait_timeout
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self._init_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Executor threads do not survive a fork, so each process builds its own
+        if self._pid != os.getpid():
+            with self._init_lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password-hash'
+                    )
+                    self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+                    self._pid = os.getpid()
+
+    def _run(self, func, *args):
+        self._ensure_started()
+        slots = self._slots
+        if not slots.acquire(timeout=self.wait_timeout):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """
+        Hashes a password on the pool. Raises PasswordHasherBusy when saturated.
+        """
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        """
+        Verifies a password on the pool. Raises PasswordHasherBusy when saturated.
+        """
+        return self._run(verify_password, password, stored)
+
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+
+password_hasher = PasswordHasher(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', str(PASSWORD_HASH_WORKERS * 4))),
+    wait_timeout=float(os.getenv('PASSWORD_HASH_WAIT_TIMEOUT', '2'))
+)
@@ -101,30 +101,30 @@ def populate_users(n_total=100, n_sellers=20):
     
     return sellers, buyers, agents
 
-def populate_used_car_listings(n=100, seller_ids=[]):
+def populate_used_car_listings(n=100, seller_ids=[], agent_ids=[]):
     """
-    Create `n` used car listings, assigning each listing to a seller from `seller_ids`.
+    Create `n` used car listings in one bulk import, assigning each listing to a
+    seller from `seller_ids` and an agent from `agent_ids`.
     """
-    if not seller_ids:
-        print("No seller IDs provided. Cannot create listings without sellers.")
+    if not seller_ids or not agent_ids:
+        print("No seller or agent IDs provided. Cannot create listings without them.")
         return
     
     makes = ['Toyota', 'Honda', 'Ford', 'Chevrolet', 'BMW', 'Mercedes', 'Audi', 'Nissan', 'Hyundai', 'Kia']
     models = ['Corolla', 'Civic', 'F-150', 'Impala', '3 Series', 'C-Class', 'A4', 'Altima', 'Elantra', 'Sorento']
     
-    for _ in range(n):
-        listing = {
+    rows = (
+        (row_number, {
             "make": random.choice(makes),
             "model": random.choice(models),
             "year": random.randint(2000, 2023),
             "price": random.randint(5000, 50000),
             "seller_id": random.choice(seller_ids),  # Assign to a pre-existing seller
-            "views": 0,
-            "shortlists": 0,
-            "suspended": False,
-            "created_at": fake.date_time_this_decade()
-        }
-        UsedCarListing.create_listing(listing)
+            "agent_id": random.choice(agent_ids)
+        }, None)
+        for row_number in range(1, n + 1)
+    )
+    UsedCarListing.bulk_create_listings(rows)
 
 def populate_reviews(sellers, buyers, agents, n=50):
     """
@@ -158,7 +158,7 @@ def main():
     
     # Create Used Car Listings
     print("Populating used car listings...")
-    populate_used_car_listings(n=100, seller_ids=sellers)
+    populate_used_car_listings(n=100, seller_ids=sellers, agent_ids=agents)
     
     # Create Reviews
     print("Populating reviews...")
@@ -0,0 +1,207 @@
+# backend/utils/ratings.py
+
+import logging
+import os
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+logger = logging.getLogger(__name__)
+
+# One document per reviewed agent:
+# {_id: agent_id, count, sum, histogram: {"1": n, ..., "5": n}, updated_at}
+RATING_SUMMARIES_COLLECTION = 'agent_rating_summaries'
+
+STARS = ('1', '2', '3', '4', '5')
+
+# Precomputed rankings, one document per leaderboard:
+# {_id: 'agents', entries: [{rank, agent_id, username, score, ...}], refreshed_at}
+LEADERBOARDS_COLLECTION = 'leaderboards'
+AGENT_LEADERBOARD_ID = 'agents'
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', '100'))
+# Reviews' worth of weight given to the mean rating of all agents; by default
+# the mean number of reviews per agent
+LEADERBOARD_PRIOR_WEIGHT = os.getenv('LEADERBOARD_PRIOR_WEIGHT')
+
+
+def rating_bucket(rating):
+    """
+    Returns the histogram key of a rating: the nearest whole star, rounding
+    halves to even like the server-side $round used by the rebuild.
+    """
+    return str(int(round(rating)))
+
+
+def rating_update(old_rating=None, new_rating=None):
+    """
+    Builds the atomic update moving one review's contribution from
+    `old_rating` to `new_rating` (None meaning no review before or after).
+    Returns None when the summary would not change.
+    """
+    increments = {}
+
+    def add(field, amount):
+        increments[field] = increments.get(field, 0) + amount
+
+    if old_rating is not None:
+        add("count", -1)
+        add("sum", -old_rating)
+        add(f"histogram.{rating_bucket(old_rating)}", -1)
+    if new_rating is not None:
+        add("count", 1)
+        add("sum", new_rating)
+        add(f"histogram.{rating_bucket(new_rating)}", 1)
+
+    increments = {field: amount for field, amount in increments.items() if amount}
+    if not increments:
+        return None
+    return {"$inc": increments, "$currentDate": {"updated_at": True}}
+
+
+def summarize(summary):
+    """
+    Turns a summary document (or None) into the public rating fields.
+    """
+    count = summary.get('count', 0) if summary else 0
+    histogram = (summary or {}).get('histogram', {})
+    return {
+        "average_rating": round(summary['sum'] / count, 2) if count else None,
+        "review_count": count,
+        "rating_histogram": {star: histogram.get(star, 0) for star in STARS},
+    }
+
+
+def rebuild_pipeline(reconciled_at, agent_ids=None):
+    """
+    Aggregation recomputing summaries from the reviews collection and merging
+    them over the stored ones, stamped with `reconciled_at`.
+    """
+    pipeline = []
+    if agent_ids is not None:
+        pipeline.append({"$match": {"agent_id": {"$in": list(agent_ids)}}})
+    pipeline += [
+        {"$match": {"rating": {"$type": "number"}}},
+        {"$group": {
+            "_id": "$agent_id",
+            "count": {"$sum": 1},
+            "sum": {"$sum": "$rating"},
+            **{f"star_{star}": {"$sum": {"$cond": [{"$eq": [{"$round": ["$rating", 0]}, int(star)]}, 1, 0]}}
+               for star in STARS},
+        }},
+        {"$project": {
+            "count": 1,
+            "sum": 1,
+            "histogram": {star: f"$star_{star}" for star in STARS},
+            "updated_at": reconciled_at,
+            "reconciled_at": reconciled_at,
+        }},
+        {"$merge": {"into": RATING_SUMMARIES_COLLECTION, "on": "_id", "whenMatched": "replace",
+                    "whenNotMatched": "insert"}},
+    ]
+    return pipeline
+
+
+def reconcile_rating_summaries(database, agent_ids=None):
+    """
+    Rebuilds agent rating summaries from the reviews themselves, repairing any
+    drift left by failed incremental updates. A full run (no `agent_ids`) also
+    drops summaries of agents that no longer have reviews. Increments that race
+    with a rebuild may be overwritten; the next run picks them up again.
+    Returns the number of summaries left for the reconciled agents.
+    """
+    reconciled_at = datetime.utcnow().replace(microsecond=0)
+    database['reviews'].aggregate(rebuild_pipeline(reconciled_at, agent_ids))
+
+    summaries = database[RATING_SUMMARIES_COLLECTION]
+    scope = {"_id": {"$in": list(agent_ids)}} if agent_ids is not None else {}
+    # Summaries this run did not rewrite belong to agents without reviews; ones
+    # created by an increment after the run started have no reconciled_at yet
+    stale = summaries.delete_many({**scope, "reconciled_at": {"$lt": reconciled_at}})
+    remaining = summaries.count_documents(scope)
+    logger.info("Reconciled %s agent rating summaries (%s stale removed).", remaining, stale.deleted_count)
+    return remaining
+
+
+def leaderboard_pipeline(prior_mean, prior_weight, size):
+    """
+    Aggregation ranking the rating summaries by Bayesian average: each agent's
+    reviews plus `prior_weight` virtual reviews at `prior_mean`, so a handful of
+    perfect ratings does not outrank a long record of good ones.
+    """
+    return [
+        {"$match": {"count": {"$gt": 0}}},
+        {"$project": {
+            "count": 1,
+            "sum": 1,
+            "score": {"$divide": [
+                {"$add": [prior_weight * prior_mean, "$sum"]},
+                {"$add": [prior_weight, "$count"]}
+            ]},
+        }},
+        {"$sort": {"score": -1, "count": -1, "_id": 1}},
+        {"$limit": size},
+    ]
+
+
+def _agent_usernames(database, agent_ids):
+    object_ids = []
+    for agent_id in agent_ids:
+        try:
+            object_ids.append(ObjectId(agent_id))
+        except (InvalidId, TypeError):
+            continue
+    users = database['users'].find({"_id": {"$in": object_ids}}, {"username": 1})
+    return {str(user['_id']): user.get('username') for user in users}
+
+
+def refresh_agent_leaderboard(database, size=LEADERBOARD_SIZE):
+    """
+    Recomputes the top `size` agents by Bayesian average rating from the rating
+    summaries (never from the reviews themselves) and replaces the stored
+    leaderboard in one write, so readers see either the old or the new ranking.
+    Returns the new leaderboard document.
+    """
+    summaries = database[RATING_SUMMARIES_COLLECTION]
+    totals = list(summaries.aggregate([
+        {"$match": {"count": {"$gt": 0}}},
+        {"$group": {"_id": None, "agents": {"$sum": 1}, "count": {"$sum": "$count"}, "sum": {"$sum": "$sum"}}},
+    ]))
+
+    entries, prior_mean, prior_weight = [], None, None
+    if totals:
+        prior_mean = totals[0]['sum'] / totals[0]['count']
+        prior_weight = (float(LEADERBOARD_PRIOR_WEIGHT) if LEADERBOARD_PRIOR_WEIGHT
+                        else totals[0]['count'] / totals[0]['agents'])
+        ranked = list(summaries.aggregate(leaderboard_pipeline(prior_mean, prior_weight, size)))
+        usernames = _agent_usernames(database, [summary['_id'] for summary in ranked])
+        entries = [
+            {
+                "rank": rank,
+                "agent_id": summary['_id'],
+                "username": usernames.get(summary['_id']),
+                "score": round(summary['score'], 2),
+                "average_rating": round(summary['sum'] / summary['count'], 2),
+                "review_count": summary['count'],
+            }
+            for rank, summary in enumerate(ranked, start=1)
+        ]
+
+    leaderboard = {
+        "_id": AGENT_LEADERBOARD_ID,
+        "entries": entries,
+        "prior_mean": prior_mean,
+        "prior_weight": prior_weight,
+        "refreshed_at": datetime.utcnow(),
+    }
+    database[LEADERBOARDS_COLLECTION].replace_one({"_id": AGENT_LEADERBOARD_ID}, leaderboard, upsert=True)
+    logger.info("Refreshed agent leaderboard with %s agents.", len(entries))
+    return leaderboard
+
+
+if __name__ == '__main__':
+    # Periodic job, e.g. from cron: python -m utils.ratings (from the backend directory)
+    from utils.db import db
+    from utils.logging_config import configure_logging
+    configure_logging(use_queue=False)
+    reconcile_rating_summaries(db)
+    refresh_agent_leaderboard(db)
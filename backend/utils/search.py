@@ -0,0 +1,117 @@
+# backend/utils/search.py
+
+import re
+
+# Query-string parameters understood by UsedCarListing.search_listings besides 'query'
+SEARCH_FILTER_PARAMS = ('make', 'model', 'min_year', 'max_year', 'min_price', 'max_price', 'facets')
+
+# Listing fields that are tokenized into 'search_tokens'
+SEARCHABLE_FIELDS = ('make', 'model', 'year')
+
+# Fields facet counts are reported for, and the maximum buckets per facet
+FACET_FIELDS = ('make', 'model', 'year')
+MAX_FACET_BUCKETS = 50
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z]+')
+
+
+def tokenize(text):
+    """
+    Lowercases a value and splits it on anything that is not a letter or digit.
+    Returns a list of non-empty tokens.
+    """
+    if text is None:
+        return []
+    return [token for token in _TOKEN_SPLIT.split(str(text).lower()) if token]
+
+
+def listing_search_tokens(listing):
+    """
+    Builds the normalized token set stored on a listing as 'search_tokens'.
+    Multi-word values also contribute their joined form, so 'F-150' matches both 'f' and 'f150'.
+    Returns a sorted list of unique tokens.
+    """
+    tokens = set()
+    for field in SEARCHABLE_FIELDS:
+        field_tokens = tokenize(listing.get(field))
+        tokens.update(field_tokens)
+        if len(field_tokens) > 1:
+            tokens.add(''.join(field_tokens))
+    return sorted(tokens)
+
+
+def query_filter(query):
+    """
+    Builds the filter for a free-text query. Every query term must be a prefix
+    of some listing token; anchored, case-sensitive regexes over the lowercased
+    tokens are served as range scans on the 'search_tokens' multikey index.
+    Returns None if the query contains no searchable terms.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    clauses = [{"search_tokens": {"$regex": f"^{re.escape(term)}"}} for term in terms]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _parse_number(value, name, cast):
+    if value is None or value == '':
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"{name} must be a number.") from e
+
+
+def range_filters(filters):
+    """
+    Builds the structured part of a search filter from the raw query-string values
+    in `filters` (make/model exact matches and numeric year/price ranges).
+    Raises ValueError on non-numeric bounds.
+    Returns a list of filter clauses.
+    """
+    filters = filters or {}
+    clauses = []
+    for field in ('make', 'model'):
+        if filters.get(field):
+            clauses.append({field: filters[field]})
+
+    for field, cast in (('year', int), ('price', float)):
+        low = _parse_number(filters.get(f'min_{field}'), f'min_{field}', cast)
+        high = _parse_number(filters.get(f'max_{field}'), f'max_{field}', cast)
+        bounds = {}
+        if low is not None:
+            bounds["$gte"] = low
+        if high is not None:
+            bounds["$lte"] = high
+        if bounds:
+            clauses.append({field: bounds})
+    return clauses
+
+
+def facet_pipeline(mongo_query):
+    """
+    Returns an aggregation pipeline counting matches per make, model and year in one pass.
+    """
+    return [
+        {"$match": mongo_query},
+        {"$facet": {
+            field: [
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": MAX_FACET_BUCKETS}
+            ]
+            for field in FACET_FIELDS
+        }}
+    ]
+
+
+def format_facets(result):
+    """
+    Converts a $facet result document into {field: [{"value": ..., "count": ...}]}.
+    """
+    result = result or {}
+    return {
+        field: [{"value": bucket['_id'], "count": bucket['count']} for bucket in result.get(field, [])]
+        for field in FACET_FIELDS
+    }
@@ -0,0 +1,49 @@
+# backend/utils/versions.py
+
+import hashlib
+import json
+from utils.db import db
+
+# One document per versioned resource: {_id: name, version: int, updated_at: datetime}
+versions_collection = db['collection_versions']
+
+
+def bump_version(name):
+    """
+    Records a write to the resource `name` by incrementing its version.
+    """
+    versions_collection.update_one(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$currentDate": {"updated_at": True}},
+        upsert=True
+    )
+
+
+def get_versions(*names):
+    """
+    Reads the current version of each named resource with a single query.
+    Resources that were never written are at version 0.
+    Returns a dict mapping the name to its version.
+    """
+    versions = {name: 0 for name in names}
+    for document in versions_collection.find({"_id": {"$in": list(names)}}, {"version": 1}):
+        versions[document['_id']] = document.get('version', 0)
+    return versions
+
+
+async def get_versions_async(collection, *names):
+    """
+    get_versions through an AsyncCollection handle on collection_versions.
+    """
+    versions = {name: 0 for name in names}
+    async for document in collection.find({"_id": {"$in": list(names)}}, {"version": 1}):
+        versions[document['_id']] = document.get('version', 0)
+    return versions
+
+
+def make_etag(*parts):
+    """
+    Derives an opaque strong validator from the values a representation depends on.
+    """
+    raw = json.dumps(parts, default=str, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
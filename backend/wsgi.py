@@ -0,0 +1,8 @@
+# backend/wsgi.py
+"""
+WSGI entry point for production servers, e.g. `gunicorn wsgi:app` from the
+backend directory (settings are read from gunicorn.conf.py).
+"""
+from app import create_app
+
+app = create_app()
@@ -39,6 +39,7 @@ import {
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import config from '../config';
+import { getAllListings } from '../services/api';
 import HomeIcon from '@mui/icons-material/Home';
 import AddIcon from '@mui/icons-material/Add';
 import EditIcon from '@mui/icons-material/Edit';
@@ -196,7 +197,7 @@ const AgentDashboard = () => {
       const endpoint = `${config.API_BASE_URL}/view_listings`;
       const params = { agent_id: userID }; // Pass userID as agent identifier
   
-      const response = await axios.get(endpoint, { params });
+      const response = await getAllListings(endpoint, params);
       if (response.status === 200) {
         // Frontend filter to ensure only agent's listings are displayed
         const agentListings = response.data.listings.filter(
@@ -40,6 +40,7 @@ import {
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import config from '../config';
+import { getAllListings } from '../services/api';
 import HomeIcon from '@mui/icons-material/Home';
 import AddIcon from '@mui/icons-material/Add';
 import RateReviewIcon from '@mui/icons-material/RateReview';
@@ -310,7 +311,7 @@ const BuyerDashboard = () => {
     try {
       const endpoint = `${config.API_BASE_URL}/view_listings`;
 
-      const response = await axios.get(endpoint);
+      const response = await getAllListings(endpoint);
 
       if (response.status === 200) {
         const listingsData = response.data.listings;
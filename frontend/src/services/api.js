@@ -26,4 +26,18 @@ export const updateProfile = (role, updateData) => api.put(`/user_admin/update_p
 
 export const suspendProfile = (role) => api.patch(`/user_admin/suspend_profile/${role}`);
 
+// Listing reads come back in pages of at most 500 listings. Follows next_cursor
+// to the last page and returns its response with every page's listings.
+export const getAllListings = async (url, params = {}) => {
+  const listings = [];
+  let cursor = null;
+  let response;
+  do {
+    response = await axios.get(url, { params: { ...params, limit: 500, ...(cursor ? { cursor } : {}) } });
+    listings.push(...response.data.listings);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return { ...response, data: { ...response.data, listings } };
+};
+
 // Export other API functions as needed